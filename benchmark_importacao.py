@@ -0,0 +1,332 @@
+import pandas as pd
+import numpy as np
+import mysql.connector
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import contextlib
+from itertools import product
+from dotenv import load_dotenv
+
+from popdados import OlimpiadasCSVToMySQL
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+# Tamanho aproximado do olimpiadasfiltrado.csv completo (escala 1x)
+LINHAS_BASE = 271_116
+
+# Modos medidos por padrão (nome no benchmark -> modo do popdados.py + opções)
+MODOS = {
+    'vetorizado': {'modo': 'vetorizado'},
+    'streaming': {'modo': 'streaming'},
+    'pipeline': {'modo': 'pipeline'},
+    'paralelo': {'modo': 'paralelo'},
+    'load-data': {'modo': 'load-data'},
+    'linha-ids': {'modo': 'linha', 'ids_no_cliente': True},
+    'linha': {'modo': 'linha'},
+}
+
+# Métodos do importador cronometrados como etapas
+ETAPAS = [
+    '_carregar_dados', '_carregar_csv', '_ler_csv_em_blocos', '_normalizar_dataframe',
+    '_montar_tabelas', '_gravar_tabelas', '_gravar_pendentes', '_normalizar_staging',
+    'finalizar_schema',
+]
+
+
+def gerar_csv_sintetico(caminho, escala=1.0, semente=42, linhas_por_bloco=1_000_000):
+    """
+    Gera um CSV no layout do olimpiadasfiltrado.csv com `escala` vezes o
+    número de linhas do arquivo real. As taxas de repetição imitam os dados
+    reais: cerca de 2 linhas por atleta, ~230 países, ~66 esportes com ~765
+    modalidades, 85% das participações sem medalha e medidas faltando
+    """
+    rng = np.random.default_rng(semente)
+    total = int(LINHAS_BASE * escala)
+
+    # Edições de verão e de inverno, como no arquivo original
+    verao = [ano for ano in range(1896, 2017, 4) if ano not in (1916, 1940, 1944)]
+    inverno = [ano for ano in range(1924, 1993, 4) if ano not in (1940, 1944)] + list(range(1994, 2015, 4))
+    edicoes = pd.DataFrame(
+        [(ano, 'Summer', f'Cidade Verão {ano}') for ano in verao] +
+        [(ano, 'Winter', f'Cidade Inverno {ano}') for ano in inverno],
+        columns=['ano', 'temporada', 'cidade']
+    )
+
+    siglas = np.array([''.join(letras) for letras in product('ABCDEFGHIJKLMNOPQRSTUVWXYZ', repeat=3)][:230])
+    equipes = np.array([f'País {sigla}' for sigla in siglas])
+
+    esportes = np.array([f'Esporte {i}' for i in range(66)])
+    esporte_da_modalidade = rng.integers(0, len(esportes), 765)
+    modalidades = np.array([f'{esportes[e]} - Modalidade {i}' for i, e in enumerate(esporte_da_modalidade)])
+
+    # Atletas: país com distribuição desigual (poucos países com muitos atletas)
+    n_atletas = max(1, total // 2)
+    peso_paises = 1 / np.arange(1, len(siglas) + 1)
+    pais_do_atleta = rng.choice(len(siglas), n_atletas, p=peso_paises / peso_paises.sum())
+    sexo_do_atleta = rng.choice(np.array(['M', 'F']), n_atletas, p=[0.72, 0.28])
+    altura_do_atleta = np.round(rng.normal(176, 10, n_atletas))
+    peso_do_atleta = np.round(rng.normal(71, 14, n_atletas).clip(30, 200), 1)
+    idade_do_atleta = rng.integers(14, 45, n_atletas)
+
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        for inicio in range(0, total, linhas_por_bloco):
+            n = min(linhas_por_bloco, total - inicio)
+
+            atleta = rng.integers(0, n_atletas, n)
+            edicao = rng.integers(0, len(edicoes), n)
+            modalidade = rng.integers(0, len(modalidades), n)
+
+            bloco = pd.DataFrame({
+                'nome': np.char.add('Atleta ', atleta.astype(str)),
+                'equipe': equipes[pais_do_atleta[atleta]],
+                'sigla': siglas[pais_do_atleta[atleta]],
+                'ano': edicoes['ano'].to_numpy()[edicao],
+                'temporada': edicoes['temporada'].to_numpy()[edicao],
+                'cidade': edicoes['cidade'].to_numpy()[edicao],
+                'esporte': esportes[esporte_da_modalidade[modalidade]],
+                'evento': modalidades[modalidade],
+                'medalha': rng.choice(np.array(['NA', 'Gold', 'Silver', 'Bronze']), n, p=[0.85, 0.05, 0.05, 0.05]),
+                'peso': np.where(rng.random(n) < 0.2, np.nan, peso_do_atleta[atleta]),
+                'altura': np.where(rng.random(n) < 0.2, np.nan, altura_do_atleta[atleta]),
+                'idade': np.where(rng.random(n) < 0.03, np.nan, idade_do_atleta[atleta]),
+                'sexo': sexo_do_atleta[atleta],
+            })
+            bloco.to_csv(arquivo, index=False, header=(inicio == 0))
+
+    print(f"✓ CSV sintético gerado: {caminho} ({total} linhas, escala {escala}x)")
+    return total
+
+
+def _cronometrar(db, tempos):
+    """Envolve os métodos de ETAPAS da instância para somar o tempo gasto em cada um"""
+    for nome in ETAPAS:
+        original = getattr(db, nome, None)
+        if original is None:
+            continue
+
+        def medido(*args, _original=original, _nome=nome, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                tempos[_nome] = tempos.get(_nome, 0.0) + time.perf_counter() - inicio
+
+        # Geradores só trabalham quando consumidos: mede a iteração inteira
+        if nome == '_ler_csv_em_blocos':
+            def medido(*args, _original=original, _nome=nome, **kwargs):
+                gerador = _original(*args, **kwargs)
+                while True:
+                    inicio = time.perf_counter()
+                    try:
+                        item = next(gerador)
+                    except StopIteration:
+                        return
+                    finally:
+                        tempos[_nome] = tempos.get(_nome, 0.0) + time.perf_counter() - inicio
+                    yield item
+
+        setattr(db, nome, medido)
+
+
+def _questions(connection):
+    """Comandos recebidos pelo servidor nesta sessão (outras conexões ao MySQL não entram)"""
+    cursor = connection.cursor()
+    cursor.execute("SHOW SESSION STATUS LIKE 'Questions'")
+    valor = int(cursor.fetchone()[1])
+    cursor.close()
+    return valor
+
+
+def _contar_outras_conexoes(contagem):
+    """
+    Soma em contagem['comandos'] os comandos de cada conexão que o importador
+    fecha neste processo, como a da thread escritora do modo pipeline. As
+    conexões dos processos filhos do modo paralelo não são vistas daqui
+    """
+    original = OlimpiadasCSVToMySQL.desconectar
+
+    def desconectar(db):
+        if db.connection and db.connection.is_connected():
+            contagem['comandos'] += _questions(db.connection)
+        return original(db)
+
+    OlimpiadasCSVToMySQL.desconectar = desconectar
+
+
+def _falhas(saida):
+    """Linhas de erro (✗ ou ❌) impressas pelo importador"""
+    return [linha.strip() for linha in saida.splitlines() if linha.strip().startswith(('✗', '❌'))]
+
+
+def executar_modo(config, csv_path, nome_modo, carga_em_massa=False):
+    """
+    Recria o banco de benchmark e importa o CSV com um modo. Roda em um
+    processo próprio (ver main), para que o pico de RSS seja só deste modo
+    """
+    opcoes = MODOS[nome_modo]
+    db = OlimpiadasCSVToMySQL(**config)
+    db.cache_dados = False
+    tempos = {}
+    outras = {'comandos': 0}
+    saida = io.StringIO()
+
+    # Os processar_csv_* imprimem o erro e retornam: a saída é guardada para conferir abaixo
+    with contextlib.redirect_stdout(saida):
+        if not db.conectar():
+            raise mysql.connector.Error(msg="não foi possível conectar ao MySQL")
+
+        inicio = time.perf_counter()
+        db.drop_database()
+        db.criar_database()
+        db.criar_schema(carga_em_massa=carga_em_massa)
+        tempos['schema'] = time.perf_counter() - inicio
+
+        _cronometrar(db, tempos)
+        _contar_outras_conexoes(outras)
+        comandos_antes = _questions(db.connection)
+        inicio = time.perf_counter()
+
+        if opcoes['modo'] == 'vetorizado':
+            db.processar_csv_vetorizado(csv_path)
+        elif opcoes['modo'] == 'streaming':
+            db.processar_csv_streaming(csv_path)
+        elif opcoes['modo'] == 'pipeline':
+            db.processar_csv_pipeline(csv_path)
+        elif opcoes['modo'] == 'paralelo':
+            db.processar_csv_paralelo(csv_path)
+        elif opcoes['modo'] == 'load-data':
+            db.processar_csv_load_data(csv_path)
+        else:
+            db.processar_csv_unico(csv_path, ids_no_cliente=opcoes.get('ids_no_cliente', False))
+
+        if carga_em_massa:
+            db.finalizar_schema()
+
+        duracao = time.perf_counter() - inicio
+        comandos = _questions(db.connection) - comandos_antes + outras['comandos']
+
+        cursor = db.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM Compete")
+        participacoes = cursor.fetchone()[0]
+        cursor.close()
+        db.desconectar()
+
+    falhas = _falhas(saida.getvalue())
+    if falhas:
+        raise RuntimeError(falhas[0])
+    if participacoes == 0:
+        raise RuntimeError("nenhuma participação importada")
+
+    # ru_maxrss vem em KB no Linux; os filhos cobrem os processos do modo paralelo
+    rss_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                 resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    return {
+        'modo': nome_modo,
+        'carga_em_massa': carga_em_massa,
+        'segundos': round(duracao, 3),
+        'participacoes': participacoes,
+        # No paralelo os INSERTs saem dos processos filhos, fora da contagem
+        'comandos': None if opcoes['modo'] == 'paralelo' else comandos,
+        'pico_rss_mb': round(rss_kb / 1024, 1),
+        'etapas': {etapa: round(segundos, 3) for etapa, segundos in tempos.items()},
+    }
+
+
+def imprimir_relatorio(resultados, linhas_csv):
+    """Tabela resumida com linhas/s, comandos e memória de cada modo"""
+    print(f"\n{'='*86}")
+    print(f"{'Modo':<22}{'Tempo (s)':>11}{'Linhas/s':>12}{'Comandos':>12}{'Pico RSS (MB)':>15}{'Compete':>14}")
+    print(f"{'='*86}")
+    for r in resultados:
+        if 'erro' in r:
+            print(f"{r['modo']:<22}  ✗ {r['erro'][:60]}")
+            continue
+        nome = r['modo'] + (' +massa' if r['carga_em_massa'] else '')
+        linhas_s = linhas_csv / r['segundos'] if r['segundos'] else 0
+        comandos = '—' if r['comandos'] is None else r['comandos']
+        print(f"{nome:<22}{r['segundos']:>11.2f}{linhas_s:>12.0f}{comandos:>12}"
+              f"{r['pico_rss_mb']:>15.1f}{r['participacoes']:>14}")
+        etapas = ', '.join(f"{etapa.strip('_')}={segundos:.2f}s" for etapa, segundos in r['etapas'].items())
+        print(f"{'':<4}{etapas}")
+    print(f"{'='*86}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da importação - Sistema Olimpíadas")
+    parser.add_argument('--escalas', type=float, nargs='+', default=[1],
+                        help="múltiplos do tamanho do CSV real (ex.: 1 10 100)")
+    parser.add_argument('--modos', nargs='+', choices=list(MODOS), default=list(MODOS))
+    parser.add_argument('--carga-em-massa', action='store_true',
+                        help="mede também cada modo com as restrições adiadas")
+    parser.add_argument('--pasta', default='benchmark_dados', help="onde guardar os CSVs sintéticos")
+    parser.add_argument('--saida', help="arquivo JSON com os resultados")
+    parser.add_argument('--executar', nargs=4, metavar=('CSV', 'MODO', 'MASSA', 'SAIDA'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # O banco de benchmark é separado para não apagar o banco da aplicação
+    config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'database': os.getenv('DB_NAME_BENCH', 'olimpiadas_bench'),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', '')
+    }
+
+    # Processo filho: mede um único modo e grava o resultado em JSON
+    if args.executar:
+        csv_path, nome_modo, massa, saida = args.executar
+        resultado = executar_modo(config, csv_path, nome_modo, carga_em_massa=(massa == '1'))
+        with open(saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo)
+        return
+
+    os.makedirs(args.pasta, exist_ok=True)
+    todos = []
+
+    for escala in args.escalas:
+        csv_path = os.path.join(args.pasta, f'olimpiadas_sintetico_{escala:g}x.csv')
+        if os.path.exists(csv_path):
+            with open(csv_path, encoding='utf-8') as arquivo:
+                linhas_csv = sum(1 for _ in arquivo) - 1
+        else:
+            linhas_csv = gerar_csv_sintetico(csv_path, escala)
+
+        print(f"\n📊 Escala {escala:g}x ({linhas_csv} linhas)")
+        resultados = []
+        for nome_modo in args.modos:
+            for massa in ([False, True] if args.carga_em_massa else [False]):
+                if massa and MODOS[nome_modo]['modo'] == 'linha':
+                    continue
+                print(f"   ⏱  {nome_modo}{' +massa' if massa else ''}...")
+                saida = os.path.join(args.pasta, 'resultado.json')
+                processo = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--executar',
+                     csv_path, nome_modo, '1' if massa else '0', saida],
+                    capture_output=True, text=True
+                )
+                if processo.returncode != 0:
+                    erro = (processo.stderr.strip().splitlines() or ['erro desconhecido'])[-1]
+                    resultados.append({'modo': nome_modo, 'erro': erro})
+                    continue
+                with open(saida, encoding='utf-8') as arquivo:
+                    resultados.append(json.load(arquivo))
+
+        imprimir_relatorio(resultados, linhas_csv)
+        todos.append({'escala': escala, 'linhas': linhas_csv, 'resultados': resultados})
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(todos, arquivo, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
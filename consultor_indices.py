@@ -0,0 +1,150 @@
+import ast
+import os
+import re
+import json
+import argparse
+from mysql.connector import Error
+from dotenv import load_dotenv
+from db import get_connection
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Coluna comparada com %s -> consulta que devolve um valor representativo para o
+# EXPLAIN (o mais frequente, para o plano refletir o caso mais pesado)
+VALORES_EXEMPLO = {
+    'esporte': "SELECT esporte FROM Evento GROUP BY esporte ORDER BY COUNT(*) DESC LIMIT 1",
+    'ano_olimpiada': "SELECT ano_olimpiada FROM Evento GROUP BY ano_olimpiada ORDER BY COUNT(*) DESC LIMIT 1",
+    'sigla_pais': "SELECT sigla_pais FROM Atleta GROUP BY sigla_pais ORDER BY COUNT(*) DESC LIMIT 1",
+    'id_atleta': "SELECT id_atleta FROM Compete GROUP BY id_atleta ORDER BY COUNT(*) DESC LIMIT 1",
+}
+VALORES_EXEMPLO['ano'] = VALORES_EXEMPLO['ano_olimpiada']
+VALORES_EXEMPLO['sigla'] = VALORES_EXEMPLO['sigla_pais']
+
+PARAMETRO = re.compile(r'(?:\w+\.)?(\w+)\s*(?:=|<>|!=)\s*%s')
+
+
+def arquivos_das_paginas():
+    """Página inicial e tudo em pages/"""
+    arquivos = [os.path.join(RAIZ, '1_Dashboard.py')]
+    pasta = os.path.join(RAIZ, 'pages')
+    arquivos += [os.path.join(pasta, a) for a in sorted(os.listdir(pasta)) if a.endswith('.py')]
+    return arquivos
+
+
+def coletar_consultas(arquivos):
+    """
+    Strings literais que começam com SELECT ou WITH, como (arquivo, linha, sql).
+    Consultas montadas com f-string (ex.: SELECT * FROM {tabela}) ficam de fora
+    """
+    consultas, vistas = [], set()
+    for arquivo in arquivos:
+        with open(arquivo, encoding='utf-8') as f:
+            arvore = ast.parse(f.read())
+        em_fstring = {id(parte) for no in ast.walk(arvore) if isinstance(no, ast.JoinedStr)
+                      for parte in no.values}
+        for no in ast.walk(arvore):
+            if not isinstance(no, ast.Constant) or not isinstance(no.value, str) or id(no) in em_fstring:
+                continue
+            sql = no.value.strip().rstrip(';').strip()
+            if not re.match(r'(SELECT|WITH)\b', sql, re.IGNORECASE) or sql in vistas:
+                continue
+            vistas.add(sql)
+            consultas.append((os.path.relpath(arquivo, RAIZ), no.lineno, sql))
+    return sorted(consultas)
+
+
+def parametros_de_exemplo(cursor, sql, cache):
+    """Um valor por %s, escolhido pela coluna com que ele é comparado"""
+    colunas = PARAMETRO.findall(sql)
+    if len(colunas) != sql.count('%s'):
+        return None
+    valores = []
+    for coluna in colunas:
+        if coluna not in VALORES_EXEMPLO:
+            return None
+        if coluna not in cache:
+            cursor.execute(VALORES_EXEMPLO[coluna])
+            linha = cursor.fetchone()
+            cache[coluna] = linha[0] if linha else None
+        valores.append(cache[coluna])
+    return valores
+
+
+def problemas_do_plano(no, min_linhas, contexto=None, achados=None):
+    """Percorre o EXPLAIN FORMAT=JSON atrás de full scans, filesorts e tabelas temporárias"""
+    if achados is None:
+        achados = []
+    if isinstance(no, dict):
+        tabela = no.get('table_name')
+        if tabela and no.get('access_type') == 'ALL':
+            linhas = no.get('rows_examined_per_scan', 0)
+            if linhas >= min_linhas:
+                achados.append(f"full scan em {tabela} (~{linhas} linhas)")
+        if no.get('using_filesort'):
+            achados.append(f"filesort ({contexto or tabela or 'consulta'})")
+        if no.get('using_temporary_table'):
+            achados.append(f"tabela temporária ({contexto or tabela or 'consulta'})")
+        for chave, valor in no.items():
+            problemas_do_plano(valor, min_linhas, chave if isinstance(valor, (dict, list)) else contexto, achados)
+    elif isinstance(no, list):
+        for item in no:
+            problemas_do_plano(item, min_linhas, contexto, achados)
+    return achados
+
+
+def analisar(conexao, consultas, min_linhas=1000, mostrar_plano=False):
+    """Roda EXPLAIN FORMAT=JSON em cada consulta e imprime o que merece índice"""
+    cursor = conexao.cursor()
+    cache = {}
+    sinalizadas = 0
+
+    for arquivo, linha, sql in consultas:
+        resumo = ' '.join(sql.split())[:90]
+        print(f"\n📄 {arquivo}:{linha}  {resumo}")
+
+        params = parametros_de_exemplo(cursor, sql, cache) if '%s' in sql else None
+        if '%s' in sql and params is None:
+            print("   ⚠ Parâmetro sem valor de exemplo conhecido; consulta não analisada")
+            continue
+
+        try:
+            cursor.execute("EXPLAIN FORMAT=JSON " + sql, params)
+            plano = json.loads(cursor.fetchone()[0])
+        except Error as e:
+            print(f"   ✗ Erro no EXPLAIN: {e}")
+            continue
+
+        achados = problemas_do_plano(plano, min_linhas)
+        if achados:
+            sinalizadas += 1
+            for achado in dict.fromkeys(achados):
+                print(f"   ✗ {achado}")
+        else:
+            print("   ✓ Sem full scan, filesort ou tabela temporária")
+        if mostrar_plano:
+            print(json.dumps(plano, indent=2, ensure_ascii=False))
+
+    cursor.close()
+    print(f"\n📊 {sinalizadas} de {len(consultas)} consultas com possíveis problemas de índice")
+    return sinalizadas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consultor de índices das páginas - Sistema Olimpíadas")
+    parser.add_argument('arquivos', nargs='*', help="páginas a analisar (padrão: todas)")
+    parser.add_argument('--min-linhas', type=int, default=1000,
+                        help="ignora full scans em tabelas menores que isto (ex.: Pais, Olimpiada)")
+    parser.add_argument('--mostrar-plano', action='store_true', help="imprime o plano JSON completo")
+    args = parser.parse_args()
+
+    consultas = coletar_consultas(args.arquivos or arquivos_das_paginas())
+    try:
+        conexao = get_connection()
+    except Error as e:
+        print(f"✗ Erro ao conectar ao MySQL: {e}")
+    else:
+        analisar(conexao, consultas, min_linhas=args.min_linhas, mostrar_plano=args.mostrar_plano)
+        conexao.close()
@@ -1,10 +1,381 @@
 import mysql.connector
+from mysql.connector import pooling, Error
+from mysql.connector.errors import PoolError, DatabaseError, IntegrityError
 import os
+import re
+import time
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente (lidas aqui, na importação)
+load_dotenv()
+
+# "mysql" (padrão) ou "sqlite": um arquivo local, sem servidor (DB_SQLITE_PATH)
+BACKEND = os.getenv("DB_BACKEND", "mysql").strip().lower()
+CAMINHO_SQLITE = os.getenv("DB_SQLITE_PATH", "olimpiadas.sqlite3")
+
+# Pool único por processo: o Streamlit importa este módulo uma vez e todas as
+# páginas e sessões pegam conexões emprestadas dele.
+# O mysql.connector aceita no máximo 32 conexões por pool
+TAMANHO_POOL = max(1, min(32, int(os.getenv("DB_POOL_SIZE", "5"))))
+# Segundos esperando uma conexão livre antes de desistir
+ESPERA_POOL = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+_pool = None
+_trava = threading.Lock()
+# Os contadores são alterados pelas threads de sessão do Streamlit e pelo
+# __del__ (que o coletor pode disparar com a trava já tomada: por isso RLock)
+_trava_contadores = threading.RLock()
+
+contadores = {
+    'emprestimos': 0,   # get_connection atendidos
+    'devolucoes': 0,    # conexões devolvidas ao pool
+    'esperas': 0,       # vezes em que o pool estava cheio e foi preciso esperar
+    'reconexoes': 0,    # conexões refeitas na validação (ex.: MySQL reiniciado)
+    'vazamentos': 0,    # conexões não fechadas, recuperadas quando a página terminou
+    'falhas': 0,        # get_connection que terminaram em erro
+}
+
+
+def _contar(nome):
+    with _trava_contadores:
+        contadores[nome] += 1
+
+
+class ConexaoDoPool:
+    """
+    Conexão emprestada do pool. close() devolve ao pool em vez de fechar o
+    socket; se a página terminar (ou der erro) sem fechar, a conexão é
+    devolvida quando o objeto é descartado e contada como vazamento
+    """
+
+    def __init__(self, conexao):
+        self._conexao = conexao
+
+    def close(self):
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+            _contar('devolucoes')
+
+    def __del__(self):
+        if self._conexao is not None:
+            _contar('vazamentos')
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.close()
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+
+def _criar_pool():
+    global _pool
+    with _trava:
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name="olimpiadas",
+                pool_size=TAMANHO_POOL,
+                pool_reset_session=True,
+                host=os.getenv("DB_HOST"),
+                user=os.getenv("DB_USER"),
+                password=os.getenv("DB_PASSWORD"),
+                database=os.getenv("DB_NAME")
+            )
+    return _pool
+
 
 def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
+    """
+    Empresta uma conexão do pool, esperando até ESPERA_POOL segundos se todas
+    estiverem em uso. A conexão é validada com ping antes de ser entregue e
+    refeita se o servidor tiver caído nesse meio tempo. Use close() (ou with)
+    para devolvê-la. Com DB_BACKEND=sqlite não há pool: abrir o arquivo é
+    barato, então cada página abre a sua conexão
+    """
+    if BACKEND == 'sqlite':
+        conexao = conectar_sqlite()
+        _contar('emprestimos')
+        return ConexaoDoPool(conexao)
+
+    try:
+        pool = _pool or _criar_pool()
+
+        limite = time.monotonic() + ESPERA_POOL
+        esperou = False
+        while True:
+            try:
+                conexao = pool.get_connection()
+                break
+            except PoolError:
+                if time.monotonic() >= limite:
+                    raise
+                if not esperou:
+                    _contar('esperas')
+                    esperou = True
+                time.sleep(0.05)
+
+        try:
+            conexao.ping(reconnect=False)
+        except Error:
+            _contar('reconexoes')
+            try:
+                conexao.ping(reconnect=True, attempts=3, delay=1)
+            except Error:
+                conexao.close()
+                raise
+
+        _contar('emprestimos')
+        return ConexaoDoPool(conexao)
+
+    except Error:
+        _contar('falhas')
+        raise
+
+
+def estatisticas_pool():
+    """Tamanho, conexões em uso e livres, e os contadores de uso do pool"""
+    with _trava_contadores:
+        copia = dict(contadores)
+    em_uso = copia['emprestimos'] - copia['devolucoes']
+    return {
+        'tamanho': TAMANHO_POOL,
+        'em_uso': em_uso,
+        'livres': max(0, TAMANHO_POOL - em_uso) if _pool else 0,
+        **copia,
+    }
+
+
+def tem_tabela(conn, tabela):
+    """Se `tabela` existe no banco atual (ex.: a CompeteFato, que é opcional)"""
+    cursor = conn.cursor()
+    if isinstance(cursor, CursorSQLite):
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s", (tabela,))
+    else:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+            (tabela,)
+        )
+    existe = cursor.fetchone()[0] > 0
+    cursor.close()
+    return existe
+
+
+# ==================== BACKEND SQLITE ====================
+# O SQL do projeto é escrito para o MySQL; estas são as poucas construções
+# dele que aparecem nas páginas, no popdados.py e no resumos.py
+TRADUCOES_SQLITE = [
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\bAS\s+SIGNED\)', re.I), 'AS INTEGER)'),
+    (re.compile(r'\bINSERT\s+IGNORE\b', re.I), 'INSERT OR IGNORE'),
+    # "ON DUPLICATE KEY UPDATE col = col" é o INSERT IGNORE dos INSERTs de carga
+    (re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\s+(\w+)\s*=\s*\1\s*$', re.I), 'ON CONFLICT DO NOTHING'),
+    # O "id = LAST_INSERT_ID(id)" do modo linha só devolve o id de uma linha repetida;
+    # Atleta não tem chave única além do id, então no SQLite basta o lastrowid do INSERT
+    (re.compile(r'\s*\bON\s+DUPLICATE\s+KEY\s+UPDATE\s+(\w+)\s*=\s*LAST_INSERT_ID\(\1\)\s*$', re.I), ''),
+    (re.compile(r'\b\w+(\s+UNSIGNED)?\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b', re.I), 'INTEGER PRIMARY KEY'),
+    (re.compile(r'\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b', re.I), ''),
+    (re.compile(r'\b(\w+)\s+ENUM\s*(\([^)]*\))', re.I), r'\1 TEXT CHECK (\1 IN \2)'),
+    (re.compile(r'\)\s*ENGINE\s*=.*$', re.I | re.S), ')'),
+]
+
+INDICE_EM_LINHA = re.compile(r'^\s*(UNIQUE\s+KEY|INDEX|KEY)\s+(\w+)\s*(\([^)]*\))\s*,?\s*$', re.I)
+# Cláusulas de ALTER TABLE das migrações que o SQLite faz com outro comando (ou não precisa)
+ADD_INDICE = re.compile(r'^ADD\s+(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*(\(.*\))$', re.I | re.S)
+DROP_INDICE = re.compile(r'^DROP\s+(?:INDEX|KEY)\s+(\w+)$', re.I)
+DDL_ONLINE = re.compile(r'^(ALGORITHM|LOCK)\s*=', re.I)
+
+
+def dividir_definicoes(texto):
+    """
+    Divide uma lista SQL nas vírgulas que estão fora de parênteses e de aspas:
+    as definições de um CREATE TABLE ou as cláusulas de um ALTER TABLE
+    """
+    partes, atual, nivel, aspas = [], [], 0, None
+    for caractere in texto:
+        if aspas:
+            if caractere == aspas:
+                aspas = None
+        elif caractere in "'\"`":
+            aspas = caractere
+        elif caractere == '(':
+            nivel += 1
+        elif caractere == ')':
+            nivel -= 1
+        elif caractere == ',' and nivel == 0:
+            partes.append(''.join(atual).strip())
+            atual = []
+            continue
+        atual.append(caractere)
+    if ''.join(atual).strip():
+        partes.append(''.join(atual).strip())
+    return partes
+
+
+def _traduzir_alter(tabela, clausulas):
+    """
+    Um ALTER TABLE do MySQL vira vários comandos: o SQLite só aceita uma
+    cláusula por ALTER e cria/remove índices com CREATE/DROP INDEX
+    """
+    comandos = []
+    for clausula in dividir_definicoes(clausulas):
+        indice = ADD_INDICE.match(clausula)
+        remocao = DROP_INDICE.match(clausula)
+        if DDL_ONLINE.match(clausula):
+            continue
+        elif indice:
+            unico = 'UNIQUE ' if indice.group(1) else ''
+            comandos.append(f"CREATE {unico}INDEX IF NOT EXISTS {indice.group(2)} ON {tabela} {indice.group(3)}")
+        elif remocao:
+            comandos.append(f"DROP INDEX IF EXISTS {remocao.group(1)}")
+        else:
+            comandos.append(f"ALTER TABLE {tabela} {clausula}")
+    return comandos
+
+
+def traduzir_sql(sql):
+    """
+    Converte um comando MySQL do projeto para SQLite. Devolve uma lista de
+    comandos: índices declarados dentro de um CREATE TABLE viram CREATE INDEX
+    separados, que o SQLite não aceita na definição da tabela, e um ALTER TABLE
+    vira um comando por cláusula. Ajustes de sessão (SET SESSION) não têm
+    equivalente e viram lista vazia
+    """
+    # Comentários antes do comando, como nos arquivos de migração
+    sql = re.sub(r'^(\s*--[^\n]*\n)+', '', sql)
+    if re.match(r'\s*SET\s+SESSION\b', sql, re.I):
+        return []
+    for padrao, troca in TRADUCOES_SQLITE:
+        sql = padrao.sub(troca, sql.strip())
+
+    alteracao = re.match(r'ALTER\s+TABLE\s+(\w+)\s+(.*)$', sql, re.I | re.S)
+    if alteracao:
+        return _traduzir_alter(alteracao.group(1), alteracao.group(2))
+
+    criacao = re.match(r'CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?(\w+)', sql, re.I)
+    if not criacao:
+        return [sql]
+
+    tabela, linhas, indices = criacao.group(2), [], []
+    for linha in sql.split('\n'):
+        indice = INDICE_EM_LINHA.match(linha)
+        if indice and indice.group(1).upper().startswith('UNIQUE'):
+            linhas.append(f"    UNIQUE {indice.group(3)},")
+        elif indice:
+            indices.append(f"CREATE INDEX IF NOT EXISTS {indice.group(2)} ON {tabela} {indice.group(3)}")
+        else:
+            linhas.append(linha)
+    # Sem a vírgula que sobrou antes do ")" final
+    tabela_sql = re.sub(r',\s*\)$', '\n)', '\n'.join(linhas).rstrip())
+    return [tabela_sql] + indices
+
+
+def _erro_mysql(erro):
+    """Erros do sqlite3 como os do mysql.connector, para os `except Error` do projeto"""
+    classe = IntegrityError if isinstance(erro, sqlite3.IntegrityError) else DatabaseError
+    return classe(msg=str(erro))
+
+
+class CursorSQLite:
+    """Cursor com a interface do mysql.connector usada no projeto, traduzindo o SQL"""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dicionario = dictionary
+
+    def execute(self, sql, params=None):
+        try:
+            comandos = traduzir_sql(sql)
+            # Os parâmetros são do último comando (os anteriores são índices ou partes de um ALTER)
+            for numero, comando in enumerate(comandos, start=1):
+                self._cursor.execute(comando, tuple(params or ()) if numero == len(comandos) else ())
+        except sqlite3.Error as e:
+            raise _erro_mysql(e) from e
+
+    def executemany(self, sql, linhas):
+        try:
+            self._cursor.executemany(traduzir_sql(sql)[0], linhas)
+        except sqlite3.Error as e:
+            raise _erro_mysql(e) from e
+
+    def _linha(self, linha):
+        if linha is None or not self._dicionario:
+            return linha
+        return dict(zip(self.column_names, linha))
+
+    def fetchone(self):
+        return self._linha(self._cursor.fetchone())
+
+    def fetchmany(self, tamanho=1):
+        return [self._linha(linha) for linha in self._cursor.fetchmany(tamanho)]
+
+    def fetchall(self):
+        return [self._linha(linha) for linha in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def column_names(self):
+        return tuple(coluna[0] for coluna in self._cursor.description or ())
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexaoSQLite:
+    """Conexão SQLite com a interface do mysql.connector usada pelas páginas e scripts"""
+
+    backend = 'sqlite'
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        # Streamlit roda cada sessão numa thread; a conexão é de uma página só
+        self._conexao = sqlite3.connect(caminho, timeout=10, check_same_thread=False)
+        # WAL: leitores não bloqueiam o escritor nem o contrário
+        self._conexao.execute("PRAGMA journal_mode = WAL")
+        self._conexao.execute("PRAGMA synchronous = NORMAL")
+        self._conexao.execute("PRAGMA foreign_keys = ON")
+
+    def cursor(self, dictionary=False, **_):
+        return CursorSQLite(self._conexao.cursor(), dictionary=dictionary)
+
+    def commit(self):
+        self._conexao.commit()
+
+    def rollback(self):
+        self._conexao.rollback()
+
+    def is_connected(self):
+        return True
+
+    def ping(self, **_):
+        pass
+
+    def close(self):
+        self._conexao.close()
+
+
+def conectar_sqlite(caminho=None):
+    try:
+        return ConexaoSQLite(caminho or CAMINHO_SQLITE)
+    except sqlite3.Error as e:
+        _contar('falhas')
+        raise _erro_mysql(e) from e
@@ -0,0 +1,3 @@
+-- Lista de atletas ordenada por nome (páginas Atletas e Admin) sem filesort.
+-- ALGORITHM=INPLACE, LOCK=NONE: o índice é criado com a tabela disponível para leitura e escrita.
+ALTER TABLE Atleta ADD INDEX idx_atleta_nome (nome), ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,14 @@
+-- Índices de cobertura para as consultas das páginas (filtro por esporte, ano, país e medalha).
+-- O InnoDB guarda a chave primária em todo índice secundário, então (id_evento, medalha)
+-- também entrega id_atleta sem voltar à tabela. Cada um começa pela coluna da chave
+-- estrangeira e substitui o índice implícito que o MySQL tinha criado para ela.
+-- Filtros por Evento.esporte já usam unique_evento (esporte, modalidade, ano_olimpiada).
+
+-- Esportes/Países/Olimpíadas: Evento -> Compete filtrando medalha sem ler a linha de Compete
+ALTER TABLE Compete ADD INDEX idx_compete_evento_medalha (id_evento, medalha), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- Olimpíadas: eventos de uma edição, agrupados por esporte e modalidade
+ALTER TABLE Evento ADD INDEX idx_evento_ano_esporte (ano_olimpiada, esporte, modalidade), ALGORITHM=INPLACE, LOCK=NONE;
+
+-- Países e distribuição por sexo/idade: atletas de um país sem ler a linha inteira
+ALTER TABLE Atleta ADD INDEX idx_atleta_pais_sexo_idade (sigla_pais, sexo, idade), ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,20 @@
+-- Código canônico da medalha e flag eh_medalha em Compete, como colunas geradas VIRTUAL:
+-- o MySQL calcula as duas a partir de `medalha`, então nenhum INSERT precisa mudar e as
+-- variantes em inglês (Gold/Silver) e 'NA' caem no mesmo código das em português.
+-- 0 = sem medalha, 1 = ouro, 2 = prata, 3 = bronze (nomes na tabela Medalha, do resumos.py).
+-- Colunas VIRTUAL são adicionadas com ALGORITHM=INSTANT, só no dicionário de dados.
+ALTER TABLE Compete
+    ADD COLUMN cod_medalha TINYINT UNSIGNED AS (CASE medalha
+        WHEN 'Ouro' THEN 1 WHEN 'Gold' THEN 1
+        WHEN 'Prata' THEN 2 WHEN 'Silver' THEN 2
+        WHEN 'Bronze' THEN 3
+        ELSE 0 END) VIRTUAL NOT NULL,
+    ADD COLUMN eh_medalha BOOLEAN AS (cod_medalha > 0) VIRTUAL NOT NULL,
+    ALGORITHM=INSTANT;
+
+-- Substitui idx_compete_evento_medalha (0002): mesmo prefixo id_evento para a FK, com o
+-- filtro de medalha e o agrupamento por tipo em inteiros de 1 byte guardados no índice
+ALTER TABLE Compete
+    ADD INDEX idx_compete_evento_cod (id_evento, eh_medalha, cod_medalha),
+    DROP INDEX idx_compete_evento_medalha,
+    ALGORITHM=INPLACE, LOCK=NONE;
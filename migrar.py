@@ -0,0 +1,194 @@
+import mysql.connector
+from mysql.connector import Error
+import os
+import re
+import time
+import hashlib
+import argparse
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+PASTA_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migracoes')
+
+# Arquivos no formato 0001_descricao.sql, aplicados em ordem numérica
+ARQUIVO_MIGRACAO = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+
+def listar_migracoes(pasta=PASTA_MIGRACOES):
+    """Migrações da pasta como (versão, nome, sql, checksum), em ordem"""
+    migracoes = []
+    for arquivo in sorted(os.listdir(pasta)):
+        encontrado = ARQUIVO_MIGRACAO.match(arquivo)
+        if not encontrado:
+            continue
+        with open(os.path.join(pasta, arquivo), encoding='utf-8') as f:
+            sql = f.read()
+        checksum = hashlib.sha256(sql.encode('utf-8')).hexdigest()
+        migracoes.append((int(encontrado.group(1)), encontrado.group(2), sql, checksum))
+    return migracoes
+
+
+def separar_comandos(sql):
+    """Divide o arquivo em comandos: cada um termina com ';' no fim da linha"""
+    comandos, atual = [], []
+    for linha in sql.splitlines():
+        if linha.strip().startswith('--') and not atual:
+            continue
+        atual.append(linha)
+        if linha.rstrip().endswith(';'):
+            comandos.append('\n'.join(atual).rstrip().rstrip(';'))
+            atual = []
+    if ''.join(atual).strip():
+        comandos.append('\n'.join(atual))
+    return comandos
+
+
+def criar_tabela_versao(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INT PRIMARY KEY,
+            nome VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            duracao_ms INT NOT NULL DEFAULT 0,
+            aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def criar_tabela_passos(cursor):
+    # Comandos já executados de uma migração interrompida (o DDL do MySQL faz commit
+    # implícito, então eles não são desfeitos pelo rollback)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version_passo (
+            versao INT PRIMARY KEY,
+            checksum CHAR(64) NOT NULL,
+            comandos INT NOT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def comandos_executados(cursor, versao, checksum):
+    """Quantos comandos da migração já rodaram numa tentativa anterior"""
+    criar_tabela_passos(cursor)
+    cursor.execute("SELECT checksum, comandos FROM schema_version_passo WHERE versao = %s", (versao,))
+    passo = cursor.fetchone()
+    if passo is None:
+        return 0
+    if passo[0] != checksum:
+        print(f"⚠ Migração {versao:04d} mudou desde a tentativa interrompida; executando desde o início")
+        return 0
+    return passo[1]
+
+
+def versoes_aplicadas(cursor):
+    """versão -> checksum das migrações já registradas em schema_version"""
+    criar_tabela_versao(cursor)
+    cursor.execute("SELECT versao, checksum FROM schema_version")
+    return dict(cursor.fetchall())
+
+
+def pendentes(cursor, pasta=PASTA_MIGRACOES):
+    """Migrações ainda não aplicadas; avisa das aplicadas que mudaram depois"""
+    aplicadas = versoes_aplicadas(cursor)
+    faltando = []
+    for versao, nome, sql, checksum in listar_migracoes(pasta):
+        if versao not in aplicadas:
+            faltando.append((versao, nome, sql, checksum))
+        elif aplicadas[versao] != checksum:
+            print(f"⚠ Migração {versao:04d}_{nome} foi alterada depois de aplicada; crie uma nova migração")
+    return faltando
+
+
+def aplicar_migracoes(conexao, ate=None, lock_wait_timeout=5, pasta=PASTA_MIGRACOES):
+    """
+    Aplica em ordem as migrações pendentes (até a versão `ate`, se informada).
+    Cada uma é registrada em schema_version logo depois de terminar, então
+    uma falha no meio do caminho deixa as anteriores registradas e pode ser
+    retomada. Dentro de uma migração, cada comando é registrado em
+    schema_version_passo assim que termina: como o DDL já foi confirmado, a
+    nova tentativa continua do comando que falhou. O lock_wait_timeout curto faz um ALTER que não consegue o
+    metadata lock desistir em vez de enfileirar as consultas das páginas atrás dele.
+    Devolve quantas foram aplicadas, ou None se alguma falhou
+    """
+    try:
+        cursor = conexao.cursor()
+        cursor.execute("SET SESSION lock_wait_timeout = %s", (lock_wait_timeout,))
+        
+        aplicadas = 0
+        for versao, nome, sql, checksum in pendentes(cursor, pasta):
+            if ate is not None and versao > ate:
+                break
+            print(f"🔧 Aplicando migração {versao:04d}_{nome}...")
+            inicio = time.perf_counter()
+            comandos = separar_comandos(sql)
+            feitos = comandos_executados(cursor, versao, checksum)
+            if feitos:
+                print(f"   ↩️  Retomando após {feitos} de {len(comandos)} comandos já executados")
+            for numero, comando in enumerate(comandos[feitos:], start=feitos + 1):
+                cursor.execute(comando)
+                cursor.execute(
+                    "REPLACE INTO schema_version_passo (versao, checksum, comandos) VALUES (%s, %s, %s)",
+                    (versao, checksum, numero)
+                )
+                conexao.commit()
+            duracao_ms = int((time.perf_counter() - inicio) * 1000)
+            cursor.execute(
+                "INSERT INTO schema_version (versao, nome, checksum, duracao_ms) VALUES (%s, %s, %s, %s)",
+                (versao, nome, checksum, duracao_ms)
+            )
+            cursor.execute("DELETE FROM schema_version_passo WHERE versao = %s", (versao,))
+            conexao.commit()
+            aplicadas += 1
+            print(f"   ✓ {duracao_ms} ms")
+        
+        cursor.close()
+        if aplicadas:
+            print(f"✓ {aplicadas} migrações aplicadas!")
+        else:
+            print("✓ Schema já está na versão mais recente")
+        return aplicadas
+        
+    except Error as e:
+        print(f"✗ Erro ao aplicar migração: {e}")
+        conexao.rollback()
+        return None
+
+
+def mostrar_status(conexao, pasta=PASTA_MIGRACOES):
+    cursor = conexao.cursor()
+    aplicadas = versoes_aplicadas(cursor)
+    for versao, nome, sql, checksum in listar_migracoes(pasta):
+        if versao in aplicadas:
+            situacao = '✓ aplicada'
+        else:
+            feitos = comandos_executados(cursor, versao, checksum)
+            situacao = f"⚠ interrompida após {feitos} de {len(separar_comandos(sql))} comandos" if feitos else '… pendente'
+        print(f"   {versao:04d}_{nome}: {situacao}")
+    cursor.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrações do schema - Sistema Olimpíadas")
+    parser.add_argument('comando', choices=['status', 'aplicar'], nargs='?', default='aplicar')
+    parser.add_argument('--ate', type=int, default=None, help="aplica só até esta versão")
+    parser.add_argument('--lock-wait-timeout', type=int, default=5,
+                        help="segundos que um ALTER espera pelo metadata lock antes de desistir")
+    args = parser.parse_args()
+    
+    try:
+        conexao = mysql.connector.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            user=os.getenv('DB_USER', 'root'),
+            password=os.getenv('DB_PASSWORD', ''),
+            database=os.getenv('DB_NAME', 'olimpiadas_db')
+        )
+    except Error as e:
+        print(f"✗ Erro ao conectar ao MySQL: {e}")
+    else:
+        if args.comando == 'status':
+            mostrar_status(conexao)
+        else:
+            aplicar_migracoes(conexao, ate=args.ate, lock_wait_timeout=args.lock_wait_timeout)
+        conexao.close()
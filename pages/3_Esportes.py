@@ -1,45 +1,47 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from db import get_connection
+from db import get_connection, tem_tabela
 
 
 st.set_page_config(page_title="Análise dos Esportes", page_icon="📅", layout="wide")
 st.title("Esportes")
 
-conn = get_connection()
-
-@st.cache_data(ttl=600)
-def listar_esportes(_conn):
-    q = "SELECT DISTINCT esporte FROM Evento ORDER BY esporte"
-    return pd.read_sql(q, _conn)["esporte"].tolist()
-
-esportes = listar_esportes(conn)
-
-# -------------------- Sidebar Toggle --------------------
-if "mostrar_sql" not in st.session_state:
-    st.session_state.mostrar_sql = False
-
-st.sidebar.toggle("Mostrar SQL", key="mostrar_sql")
-
-# -------------------- Bloco utilitário --------------------
-def bloco(conteudo, consulta=None):
-    mostrar = st.session_state.get("mostrar_sql", False)
-    if mostrar and consulta:
-        col1, col2 = st.columns([3, 2], gap="small")
-        with col1:
+with get_connection() as conn:
+    # Com a tabela larga (popdados.py --fato) as consultas dispensam os joins
+    usar_fato = tem_tabela(conn, 'CompeteFato')
+
+    @st.cache_data(ttl=600)
+    def listar_esportes(_conn):
+        q = "SELECT DISTINCT esporte FROM Evento ORDER BY esporte"
+        return pd.read_sql(q, _conn)["esporte"].tolist()
+
+    esportes = listar_esportes(conn)
+
+    # -------------------- Sidebar Toggle --------------------
+    if "mostrar_sql" not in st.session_state:
+        st.session_state.mostrar_sql = False
+
+    st.sidebar.toggle("Mostrar SQL", key="mostrar_sql")
+
+    # -------------------- Bloco utilitário --------------------
+    def bloco(conteudo, consulta=None):
+        mostrar = st.session_state.get("mostrar_sql", False)
+        if mostrar and consulta:
+            col1, col2 = st.columns([3, 2], gap="small")
+            with col1:
+                conteudo()
+            with col2:
+                st.code(consulta, language="sql")
+        else:
             conteudo()
-        with col2:
-            st.code(consulta, language="sql")
-    else:
-        conteudo()
 
 
-# -------------------- 1. Top 10 atletas --------------------
-st.subheader("Top 10 atletas por medalhas no esporte escolhido")
-esporte_sel = st.selectbox("Esporte:", esportes)
+    # -------------------- 1. Top 10 atletas --------------------
+    st.subheader("Top 10 atletas por medalhas no esporte escolhido")
+    esporte_sel = st.selectbox("Esporte:", esportes)
 
-q_atletas = """
+    q_atletas = """
 SELECT 
     A.nome AS Nome,
     (
@@ -47,7 +49,7 @@ SELECT
         FROM Compete C
         JOIN Evento E ON E.id_evento = C.id_evento
         WHERE C.id_atleta = A.id_atleta
-          AND C.medalha <> 'Sem Medalha'
+          AND C.eh_medalha = 1
           AND E.esporte = %s
     ) AS Total_Medalhas
 FROM Atleta A
@@ -55,82 +57,93 @@ ORDER BY Total_Medalhas DESC
 LIMIT 10;
 """
 
-df_atletas = pd.read_sql(q_atletas, conn, params=[esporte_sel])
+    df_atletas = pd.read_sql(q_atletas, conn, params=[esporte_sel])
 
-def render_atletas():
-    st.dataframe(df_atletas, use_container_width=True, hide_index=True)
+    def render_atletas():
+        st.dataframe(df_atletas, use_container_width=True, hide_index=True)
 
-bloco(render_atletas, q_atletas)
+    bloco(render_atletas, q_atletas)
 
-chart = (
-        alt.Chart(df_atletas.sort_values("Total_Medalhas", ascending=False))
-        .mark_bar()
-        .encode(
-            x=alt.X("Nome:N", sort=None, axis=alt.Axis(labelAngle=-45)),
-            y="Total_Medalhas:Q"
+    chart = (
+            alt.Chart(df_atletas.sort_values("Total_Medalhas", ascending=False))
+            .mark_bar()
+            .encode(
+                x=alt.X("Nome:N", sort=None, axis=alt.Axis(labelAngle=-45)),
+                y="Total_Medalhas:Q"
+            )
+            .properties(height=400)
         )
-        .properties(height=400)
-    )
 
-st.altair_chart(chart, use_container_width=True)
+    st.altair_chart(chart, use_container_width=True)
 
 
 
 
-# -------------------- 2. Top 10 países --------------------
-st.subheader("Top 10 países por medalhas no esporte escolhido")
-esporte_pais = st.selectbox("Esporte:", esportes, key="pais")
+    # -------------------- 2. Top 10 países --------------------
+    st.subheader("Top 10 países por medalhas no esporte escolhido")
+    esporte_pais = st.selectbox("Esporte:", esportes, key="pais")
 
-query = """
+    query = """
 SELECT 
     P.nome AS País,
-    COUNT(*) AS Total_Medalhas
-FROM Atleta A
-JOIN Pais P ON P.sigla = A.sigla_pais
-JOIN Compete C ON C.id_atleta = A.id_atleta
-JOIN Evento E ON E.id_evento = C.id_evento
-WHERE C.medalha <> 'Sem Medalha'
-  AND E.esporte = %s
+    CAST(SUM(R.total) AS SIGNED) AS Total_Medalhas
+FROM ResumoMedalhas R
+JOIN Esporte S ON S.id_esporte = R.id_esporte
+JOIN Pais P ON P.sigla = R.sigla_pais
+WHERE R.eh_medalha = 1
+  AND S.esporte = %s
 GROUP BY P.nome
 ORDER BY Total_Medalhas DESC
 LIMIT 10;
 """
 
-df_pizza = pd.read_sql(query, conn, params=[esporte_pais])
-df_pizza["label"] = df_pizza["País"] + " (" + df_pizza["Total_Medalhas"].astype(str) + ")"
-
-chart = (
-    alt.Chart(df_pizza)
-    .mark_arc()
-    .encode(
-        theta="Total_Medalhas:Q",
-        color=alt.Color(
-            "label:N",
-            title="País (Medalhas)",
-            sort=alt.SortField(
-                field="total_medalhas",
-                order="descending"
-            )
-        ),
+    df_pizza = pd.read_sql(query, conn, params=[esporte_pais])
+    df_pizza["label"] = df_pizza["País"] + " (" + df_pizza["Total_Medalhas"].astype(str) + ")"
 
-        tooltip=["País", "Total_Medalhas"]
-    )
-    .properties(
-        title=f"Distribuição de medalhas por País – {esporte_pais}"
+    chart = (
+        alt.Chart(df_pizza)
+        .mark_arc()
+        .encode(
+            theta="Total_Medalhas:Q",
+            color=alt.Color(
+                "label:N",
+                title="País (Medalhas)",
+                sort=alt.SortField(
+                    field="total_medalhas",
+                    order="descending"
+                )
+            ),
+
+            tooltip=["País", "Total_Medalhas"]
+        )
+        .properties(
+            title=f"Distribuição de medalhas por País – {esporte_pais}"
+        )
     )
-)
 
-def render_paises():
-    st.dataframe(df_pizza[['País', "Total_Medalhas"]], use_container_width=True, hide_index=True)
+    def render_paises():
+        st.dataframe(df_pizza[['País', "Total_Medalhas"]], use_container_width=True, hide_index=True)
 
-bloco(render_paises, query)
-st.altair_chart(chart, use_container_width=True)
+    bloco(render_paises, query)
+    st.altair_chart(chart, use_container_width=True)
 
 
-# -------------------- 3. Esportes mais competitivos --------------------
-st.subheader("Esportes com mais países competindo")
+    # -------------------- 3. Esportes mais competitivos --------------------
+    st.subheader("Esportes com mais países competindo")
 
-q_comp = """
+    if usar_fato:
+        q_comp = """
+SELECT 
+    S.esporte AS Esporte,
+    COUNT(DISTINCT F.sigla_pais) AS Total_Paises 
+FROM CompeteFato F
+JOIN Esporte S ON S.id_esporte = F.id_esporte
+GROUP BY S.esporte 
+ORDER BY Total_Paises DESC
+LIMIT 10;
+"""
+    else:
+        q_comp = """
 SELECT 
     E.esporte as Esporte,
     COUNT(DISTINCT A.sigla_pais) AS Total_Paises 
@@ -142,30 +155,39 @@ ORDER BY Total_Paises DESC
 LIMIT 10;
 """
 
-df_comp = pd.read_sql(q_comp, conn)
+    df_comp = pd.read_sql(q_comp, conn)
 
-def render_comp():
-    st.dataframe(df_comp, use_container_width=True, hide_index=True)
+    def render_comp():
+        st.dataframe(df_comp, use_container_width=True, hide_index=True)
 
-bloco(render_comp, q_comp)
-chart = (
-        alt.Chart(df_comp.sort_values("Total_Paises", ascending=False))
-        .mark_bar()
-        .encode(
-            x=alt.X("Esporte:N", sort=None, axis=alt.Axis(labelAngle=-45)),
-            y="Total_Paises:Q"
+    bloco(render_comp, q_comp)
+    chart = (
+            alt.Chart(df_comp.sort_values("Total_Paises", ascending=False))
+            .mark_bar()
+            .encode(
+                x=alt.X("Esporte:N", sort=None, axis=alt.Axis(labelAngle=-45)),
+                y="Total_Paises:Q"
+            )
+            .properties(height=400)
         )
-        .properties(height=400)
-    )
 
-st.altair_chart(chart, use_container_width=True)
+    st.altair_chart(chart, use_container_width=True)
 
 
-# -------------------- 4. Distribuição por sexo --------------------
-st.subheader("Distribuição de participantes por sexo")
-esporte_sexo = st.selectbox("Esporte:", esportes, key="Sexo")
+    # -------------------- 4. Distribuição por sexo --------------------
+    st.subheader("Distribuição de participantes por sexo")
+    esporte_sexo = st.selectbox("Esporte:", esportes, key="Sexo")
 
-q_sexo = """
+    if usar_fato:
+        q_sexo = """
+SELECT F.sexo AS Sexo, COUNT(*) AS Total
+FROM CompeteFato F
+JOIN Esporte S ON S.id_esporte = F.id_esporte
+WHERE S.esporte = %s
+GROUP BY F.sexo;
+"""
+    else:
+        q_sexo = """
 SELECT A.sexo AS Sexo, COUNT(*) AS Total
 FROM Atleta A
 JOIN Compete C ON C.id_atleta = A.id_atleta
@@ -174,62 +196,73 @@ WHERE E.esporte = %s
 GROUP BY A.sexo;
 """
 
-df_sexo = pd.read_sql(q_sexo, conn, params=[esporte_sexo])
-
-def render_sexo():
-    st.dataframe(df_sexo, use_container_width=True, hide_index=True)
-
-    pie = (
-        alt.Chart(df_sexo)
-        .mark_arc()
-        .encode(
-            theta="Total:Q",
-            color=alt.Color(
-                "Sexo:N",
-                scale=alt.Scale(
-                    domain=["F", "M"],               # valores da consulta
-                    range=["hotpink", "royalblue"]           # cores desejadas
+    df_sexo = pd.read_sql(q_sexo, conn, params=[esporte_sexo])
+
+    def render_sexo():
+        st.dataframe(df_sexo, use_container_width=True, hide_index=True)
+
+        pie = (
+            alt.Chart(df_sexo)
+            .mark_arc()
+            .encode(
+                theta="Total:Q",
+                color=alt.Color(
+                    "Sexo:N",
+                    scale=alt.Scale(
+                        domain=["F", "M"],               # valores da consulta
+                        range=["hotpink", "royalblue"]           # cores desejadas
+                    ),
+                    title="Sexo"
                 ),
-                title="Sexo"
-            ),
-            tooltip=["Sexo", "Total"]
-        )
-        .properties(
-            height=400,
-            title=f"Distribuição por Sexo – {esporte_sexo}"
+                tooltip=["Sexo", "Total"]
+            )
+            .properties(
+                height=400,
+                title=f"Distribuição por Sexo – {esporte_sexo}"
+            )
         )
-    )
 
-    st.altair_chart(pie, use_container_width=True)
+        st.altair_chart(pie, use_container_width=True)
 
-bloco(render_sexo, q_sexo)
+    bloco(render_sexo, q_sexo)
 
 
 
-# -------------------- 5. Modalidades do esporte --------------------
-st.subheader("Modalidades disponíveis")
-esporte_mod = st.selectbox("Esporte:", esportes, key="mods")
+    # -------------------- 5. Modalidades do esporte --------------------
+    st.subheader("Modalidades disponíveis")
+    esporte_mod = st.selectbox("Esporte:", esportes, key="mods")
 
-q_mod = """
+    q_mod = """
 SELECT DISTINCT modalidade as  Modalidade
 FROM Evento
 WHERE esporte = %s
 ORDER BY Modalidade;
 """
 
-df_mod = pd.read_sql(q_mod, conn, params=[esporte_mod])
+    df_mod = pd.read_sql(q_mod, conn, params=[esporte_mod])
 
-def render_mod():
-    st.dataframe(df_mod, use_container_width=True, hide_index=True)
+    def render_mod():
+        st.dataframe(df_mod, use_container_width=True, hide_index=True)
 
-bloco(render_mod, q_mod)
+    bloco(render_mod, q_mod)
 
 
-# -------------------- 6. Médias físicas --------------------
-st.subheader("Estatísticas médias dos atletas por esporte")
-esporte_media = st.selectbox("Esporte:", esportes, key="media")
+    # -------------------- 6. Médias físicas --------------------
+    st.subheader("Estatísticas médias dos atletas por esporte")
+    esporte_media = st.selectbox("Esporte:", esportes, key="media")
 
-q_media = """
+    if usar_fato:
+        q_media = """
+SELECT 
+    AVG(F.altura) AS Altura_Média,
+    AVG(F.peso) AS Peso_Médio,
+    AVG(F.idade) AS Idade_Média
+FROM CompeteFato F
+JOIN Esporte S ON S.id_esporte = F.id_esporte
+WHERE S.esporte = %s;
+"""
+    else:
+        q_media = """
 SELECT 
     AVG(A.altura) AS Altura_Média,
     AVG(A.peso) AS Peso_Médio,
@@ -240,11 +273,9 @@ JOIN Evento E ON E.id_evento = C.id_evento
 WHERE E.esporte = %s;
 """
 
-df_media = pd.read_sql(q_media, conn, params=[esporte_media])
-
-def render_media():
-    st.dataframe(df_media, use_container_width=True, hide_index=True)
+    df_media = pd.read_sql(q_media, conn, params=[esporte_media])
 
-bloco(render_media, q_media)
+    def render_media():
+        st.dataframe(df_media, use_container_width=True, hide_index=True)
 
-conn.close()
+    bloco(render_media, q_media)
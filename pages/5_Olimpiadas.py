@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import altair as alt
-from db import get_connection
+from db import get_connection, tem_tabela
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,34 +33,33 @@ def bloco(titulo, conteudo, consulta=None):
         conteudo()
 
 # ==================== Conexão ====================
-conn = None
 try:
-    conn = get_connection()
+    conexao = get_connection()
 except Exception as e:
     st.error(f"❌ Erro ao conectar ao banco: {e}")
     st.stop()
 
-if conn is None:
-    st.error("❌ Não foi possível conectar ao banco de dados.")
-    st.stop()
+with conexao as conn:
+    # Com a tabela larga (popdados.py --fato) as consultas dispensam os joins
+    usar_fato = tem_tabela(conn, 'CompeteFato')
 
-# ==================== Filtro Global ====================
-st.sidebar.header("Filtro Global")
-anos_df = pd.read_sql("SELECT DISTINCT ano FROM Olimpiada ORDER BY ano DESC", conn)
-anos = anos_df['ano'].tolist()
+    # ==================== Filtro Global ====================
+    st.sidebar.header("Filtro Global")
+    anos_df = pd.read_sql("SELECT DISTINCT ano FROM Olimpiada ORDER BY ano DESC", conn)
+    anos = anos_df['ano'].tolist()
 
-if not anos:
-    st.error("Nenhum dado de Olimpíada encontrado.")
-    st.stop()
+    if not anos:
+        st.error("Nenhum dado de Olimpíada encontrado.")
+        st.stop()
 
-ano_selecionado = st.sidebar.selectbox(
-    "Selecione a edição da Olimpíada",
-    options=anos,
-    index=0
-)
+    ano_selecionado = st.sidebar.selectbox(
+        "Selecione a edição da Olimpíada",
+        options=anos,
+        index=0
+    )
 
-# ==================== Proporção de medalhas por atleta ====================
-q_prop_medalhas = """
+    # ==================== Proporção de medalhas por atleta ====================
+    q_prop_medalhas = """
 SELECT 
     A.nome AS Atleta,
     COUNT(*) AS Total_Medalhas,
@@ -73,32 +72,46 @@ GROUP BY A.id_atleta, A.nome
 ORDER BY Total_Medalhas DESC
 LIMIT 10;
 """
-df_prop_medalhas = pd.read_sql(q_prop_medalhas, conn, params=[ano_selecionado])
-bloco("Proporção de medalhas por atleta", lambda: st.dataframe(df_prop_medalhas, use_container_width=True, hide_index=True), q_prop_medalhas)
+    df_prop_medalhas = pd.read_sql(q_prop_medalhas, conn, params=[ano_selecionado])
+    bloco("Proporção de medalhas por atleta", lambda: st.dataframe(df_prop_medalhas, use_container_width=True, hide_index=True), q_prop_medalhas)
 
-# ==================== Top 10 atletas mais vitoriosos ====================
-q_top_atletas = """
+    # ==================== Top 10 atletas mais vitoriosos ====================
+    q_top_atletas = """
 SELECT 
     A.nome AS Atleta,
     P.nome AS Pais,
-    COUNT(*) AS Total_Medalhas,
-    SUM(CASE WHEN C.medalha = 'Ouro' THEN 1 ELSE 0 END) AS Ouro,
-    SUM(CASE WHEN C.medalha = 'Prata' THEN 1 ELSE 0 END) AS Prata,
-    SUM(CASE WHEN C.medalha = 'Bronze' THEN 1 ELSE 0 END) AS Bronze
-FROM Atleta A
+    CAST(SUM(R.total) AS SIGNED) AS Total_Medalhas,
+    CAST(SUM(CASE WHEN R.cod_medalha = 1 THEN R.total ELSE 0 END) AS SIGNED) AS Ouro,
+    CAST(SUM(CASE WHEN R.cod_medalha = 2 THEN R.total ELSE 0 END) AS SIGNED) AS Prata,
+    CAST(SUM(CASE WHEN R.cod_medalha = 3 THEN R.total ELSE 0 END) AS SIGNED) AS Bronze
+FROM ResumoMedalhasAtleta R
+JOIN Atleta A ON A.id_atleta = R.id_atleta
 JOIN Pais P ON A.sigla_pais = P.sigla
-JOIN Compete C ON A.id_atleta = C.id_atleta
-JOIN Evento E ON C.id_evento = E.id_evento
-WHERE E.ano_olimpiada = %s AND C.medalha IN ('Ouro', 'Prata', 'Bronze')
+WHERE R.ano = %s AND R.eh_medalha = 1
 GROUP BY A.id_atleta, A.nome, P.nome
 ORDER BY Total_Medalhas DESC, Ouro DESC, Prata DESC
 LIMIT 10;
 """
-df_top_atletas = pd.read_sql(q_top_atletas, conn, params=[ano_selecionado])
-bloco("Top 10 atletas mais vitoriosos", lambda: st.dataframe(df_top_atletas, use_container_width=True, hide_index=True), q_top_atletas)
+    df_top_atletas = pd.read_sql(q_top_atletas, conn, params=[ano_selecionado])
+    bloco("Top 10 atletas mais vitoriosos", lambda: st.dataframe(df_top_atletas, use_container_width=True, hide_index=True), q_top_atletas)
 
-# ==================== Top 10 países com atletas mais pesados ====================
-q_paises_mais_pesados = """
+    # ==================== Top 10 países com atletas mais pesados ====================
+    if usar_fato:
+        q_paises_mais_pesados = """
+SELECT 
+    P.nome AS Pais,
+    ROUND(AVG(F.peso), 2) AS Peso_Medio,
+    COUNT(*) AS Qtd_Atletas
+FROM CompeteFato F
+JOIN Pais P ON F.sigla_pais = P.sigla
+WHERE F.ano = %s AND F.peso IS NOT NULL
+GROUP BY P.sigla, P.nome
+HAVING COUNT(*) >= 3
+ORDER BY Peso_Medio DESC
+LIMIT 10;
+"""
+    else:
+        q_paises_mais_pesados = """
 SELECT 
     P.nome AS Pais,
     ROUND(AVG(A.peso), 2) AS Peso_Medio,
@@ -113,11 +126,11 @@ HAVING COUNT(*) >= 3
 ORDER BY Peso_Medio DESC
 LIMIT 10;
 """
-df_paises_pesados = pd.read_sql(q_paises_mais_pesados, conn, params=[ano_selecionado])
-bloco("Top 10 países com atletas mais pesados", lambda: st.dataframe(df_paises_pesados, use_container_width=True, hide_index=True), q_paises_mais_pesados)
+    df_paises_pesados = pd.read_sql(q_paises_mais_pesados, conn, params=[ano_selecionado])
+    bloco("Top 10 países com atletas mais pesados", lambda: st.dataframe(df_paises_pesados, use_container_width=True, hide_index=True), q_paises_mais_pesados)
 
-# ==================== Atleta mais jovem e mais velho por sexo ====================
-q_idades_extremas = """
+    # ==================== Atleta mais jovem e mais velho por sexo ====================
+    q_idades_extremas = """
 WITH Ranked AS (
     SELECT 
         A.nome,
@@ -140,11 +153,23 @@ FROM Ranked
 WHERE rn_jovem = 1 OR rn_velho = 1
 GROUP BY sexo;
 """
-df_idades_extremas = pd.read_sql(q_idades_extremas, conn, params=[ano_selecionado])
-bloco("Atleta mais jovem e mais velho por sexo", lambda: st.dataframe(df_idades_extremas, use_container_width=True, hide_index=True), q_idades_extremas)
+    df_idades_extremas = pd.read_sql(q_idades_extremas, conn, params=[ano_selecionado])
+    bloco("Atleta mais jovem e mais velho por sexo", lambda: st.dataframe(df_idades_extremas, use_container_width=True, hide_index=True), q_idades_extremas)
 
-# ==================== Proporção de gênero ====================
-q_genero = """
+    # ==================== Proporção de gênero ====================
+    if usar_fato:
+        q_genero = """
+SELECT 
+    ano AS Ano,
+    SUM(CASE WHEN sexo = 'M' THEN 1 ELSE 0 END) AS Homens,
+    SUM(CASE WHEN sexo = 'F' THEN 1 ELSE 0 END) AS Mulheres
+FROM CompeteFato
+WHERE sexo IN ('M', 'F')
+GROUP BY ano
+ORDER BY ano;
+"""
+    else:
+        q_genero = """
 SELECT 
     O.ano AS Ano,
     SUM(CASE WHEN A.sexo = 'M' THEN 1 ELSE 0 END) AS Homens,
@@ -157,34 +182,44 @@ WHERE A.sexo IN ('M', 'F')
 GROUP BY O.ano
 ORDER BY O.ano;
 """
-df_genero = pd.read_sql(q_genero, conn)
-def plot_genero():
-    if not df_genero.empty:
-        ano_row = df_genero[df_genero['Ano'] == ano_selecionado]
-        if not ano_row.empty:
-            df_pizza = pd.DataFrame({
-                'Sexo': ['Homens', 'Mulheres'],
-                'Quantidade': [int(ano_row['Homens'].iloc[0]), int(ano_row['Mulheres'].iloc[0])]
-            })
-            chart_pizza = alt.Chart(df_pizza).mark_arc(innerRadius=0).encode(
-                theta=alt.Theta(field="Quantidade", type="quantitative"),
-                color=alt.Color(field="Sexo", type="nominal", scale=alt.Scale(range=['#1f77b4', "#f065ba"])),
-                tooltip=["Sexo", "Quantidade"]
-            )
-            st.altair_chart(chart_pizza, use_container_width=True)
-        
-        df_genero['% Mulheres'] = (df_genero['Mulheres'] / (df_genero['Homens'] + df_genero['Mulheres']) * 100).round(1)
-        
-bloco("Proporção de gênero por edição", plot_genero, q_genero)
-chart_linha = alt.Chart(df_genero).mark_line(point=True, color="#f065ba").encode(
-        x=alt.X("Ano:O"),
-        y=alt.Y("% Mulheres:Q", title="% Mulheres"),
-        tooltip=["Ano", "% Mulheres"]
-    )
-st.altair_chart(chart_linha, use_container_width=True)  
-
-# ==================== Número de países por edição ====================
-q_paises_ano = """
+    df_genero = pd.read_sql(q_genero, conn)
+    def plot_genero():
+        if not df_genero.empty:
+            ano_row = df_genero[df_genero['Ano'] == ano_selecionado]
+            if not ano_row.empty:
+                df_pizza = pd.DataFrame({
+                    'Sexo': ['Homens', 'Mulheres'],
+                    'Quantidade': [int(ano_row['Homens'].iloc[0]), int(ano_row['Mulheres'].iloc[0])]
+                })
+                chart_pizza = alt.Chart(df_pizza).mark_arc(innerRadius=0).encode(
+                    theta=alt.Theta(field="Quantidade", type="quantitative"),
+                    color=alt.Color(field="Sexo", type="nominal", scale=alt.Scale(range=['#1f77b4', "#f065ba"])),
+                    tooltip=["Sexo", "Quantidade"]
+                )
+                st.altair_chart(chart_pizza, use_container_width=True)
+
+            df_genero['% Mulheres'] = (df_genero['Mulheres'] / (df_genero['Homens'] + df_genero['Mulheres']) * 100).round(1)
+
+    bloco("Proporção de gênero por edição", plot_genero, q_genero)
+    chart_linha = alt.Chart(df_genero).mark_line(point=True, color="#f065ba").encode(
+            x=alt.X("Ano:O"),
+            y=alt.Y("% Mulheres:Q", title="% Mulheres"),
+            tooltip=["Ano", "% Mulheres"]
+        )
+    st.altair_chart(chart_linha, use_container_width=True)  
+
+    # ==================== Número de países por edição ====================
+    if usar_fato:
+        q_paises_ano = """
+SELECT 
+    ano AS Ano,
+    COUNT(DISTINCT sigla_pais) AS Paises_Participantes
+FROM CompeteFato
+GROUP BY ano
+ORDER BY ano;
+"""
+    else:
+        q_paises_ano = """
 SELECT 
     O.ano AS Ano,
     COUNT(DISTINCT A.sigla_pais) AS Paises_Participantes
@@ -196,6 +231,6 @@ GROUP BY O.Ano
 ORDER BY O.Ano;
 """
 
-df_paises_ano = pd.read_sql(q_paises_ano, conn)
-bloco("Número de países por edição", lambda: st.dataframe(df_paises_ano, use_container_width=True, hide_index=True), q_paises_ano)
-st.bar_chart(df_paises_ano.set_index('Ano'), sort='Paises_Participantes')
+    df_paises_ano = pd.read_sql(q_paises_ano, conn)
+    bloco("Número de países por edição", lambda: st.dataframe(df_paises_ano, use_container_width=True, hide_index=True), q_paises_ano)
+    st.bar_chart(df_paises_ano.set_index('Ano'), sort='Paises_Participantes')
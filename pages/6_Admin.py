@@ -1,10 +1,9 @@
 import streamlit as st
-import mysql.connector
 import pandas as pd
 from mysql.connector import Error
-import os
 from dotenv import load_dotenv
-from db import get_connection
+from db import get_connection, estatisticas_pool
+from resumos import atualizar_derivadas, anos_do_evento, anos_do_atleta
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -12,21 +11,6 @@ load_dotenv()
 # Configuração da página
 st.set_page_config(page_title="CRUD Olimpíadas",  page_icon="⚙️")
 
-# Função para criar conexão com o banco
-@st.cache_resource
-def criar_conn():
-    try:
-        conn = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'olimpiadas_db')
-        )
-        return conn
-    except Error as e:
-        st.error(f"Erro ao conectar ao MySQL: {e}")
-        return None
-
 # ==================== FUNÇÕES CRUD - PAÍS ====================
 def inserir_pais(conn, sigla, nome):
     try:
@@ -37,6 +21,7 @@ def inserir_pais(conn, sigla, nome):
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def atualizar_pais(conn, sigla, novo_nome):
@@ -48,6 +33,7 @@ def atualizar_pais(conn, sigla, novo_nome):
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def deletar_pais(conn, sigla):
@@ -59,6 +45,7 @@ def deletar_pais(conn, sigla):
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 # ==================== FUNÇÕES CRUD - OLIMPÍADA ====================
@@ -72,6 +59,7 @@ def inserir_olimpiada(conn, ano, estacao, sede):
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def atualizar_olimpiada(conn, ano, estacao, sede):
@@ -79,11 +67,13 @@ def atualizar_olimpiada(conn, ano, estacao, sede):
         cursor = conn.cursor()
         cursor.execute("UPDATE Olimpiada SET estacao = %s, sede = %s WHERE ano = %s", 
                       (estacao, sede, ano))
+        atualizar_derivadas(conn, [ano], commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def deletar_olimpiada(conn, ano):
@@ -95,6 +85,7 @@ def deletar_olimpiada(conn, ano):
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 # ==================== FUNÇÕES CRUD - ATLETA ====================
@@ -111,6 +102,7 @@ def inserir_atleta(conn, nome, sexo, peso, altura, idade, sigla_pais):
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def atualizar_atleta(conn, id_atleta, nome, sexo, peso, altura, idade, sigla_pais):
@@ -121,22 +113,27 @@ def atualizar_atleta(conn, id_atleta, nome, sexo, peso, altura, idade, sigla_pai
                idade = %s, sigla_pais = %s WHERE id_atleta = %s""",
             (nome, sexo, peso, altura, idade, sigla_pais, id_atleta)
         )
+        atualizar_derivadas(conn, anos_do_atleta(cursor, id_atleta), commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def deletar_atleta(conn, id_atleta):
     try:
         cursor = conn.cursor()
+        anos = anos_do_atleta(cursor, id_atleta)
         cursor.execute("DELETE FROM Atleta WHERE id_atleta = %s", (id_atleta,))
+        atualizar_derivadas(conn, anos, commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 # ==================== FUNÇÕES CRUD - EVENTO ====================
@@ -153,32 +150,39 @@ def inserir_evento(conn, esporte, modalidade, ano_olimpiada):
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def atualizar_evento(conn, id_evento, esporte, modalidade, ano_olimpiada):
     try:
         cursor = conn.cursor()
+        anos = anos_do_evento(cursor, id_evento) + [ano_olimpiada]
         cursor.execute(
             """UPDATE Evento SET esporte = %s, modalidade = %s, ano_olimpiada = %s 
                WHERE id_evento = %s""",
             (esporte, modalidade, ano_olimpiada, id_evento)
         )
+        atualizar_derivadas(conn, anos, commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def deletar_evento(conn, id_evento):
     try:
         cursor = conn.cursor()
+        anos = anos_do_evento(cursor, id_evento)
         cursor.execute("DELETE FROM Evento WHERE id_evento = %s", (id_evento,))
+        atualizar_derivadas(conn, anos, commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 # ==================== FUNÇÕES CRUD - COMPETE ====================
@@ -189,11 +193,13 @@ def inserir_compete(conn, id_atleta, id_evento, medalha):
             "INSERT INTO Compete (id_atleta, id_evento, medalha) VALUES (%s, %s, %s)",
             (id_atleta, id_evento, medalha)
         )
+        atualizar_derivadas(conn, anos_do_evento(cursor, id_evento), commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def atualizar_compete(conn, id_atleta, id_evento, medalha):
@@ -203,11 +209,13 @@ def atualizar_compete(conn, id_atleta, id_evento, medalha):
             "UPDATE Compete SET medalha = %s WHERE id_atleta = %s AND id_evento = %s",
             (medalha, id_atleta, id_evento)
         )
+        atualizar_derivadas(conn, anos_do_evento(cursor, id_evento), commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 def deletar_compete(conn, id_atleta, id_evento):
@@ -217,11 +225,13 @@ def deletar_compete(conn, id_atleta, id_evento):
             "DELETE FROM Compete WHERE id_atleta = %s AND id_evento = %s",
             (id_atleta, id_evento)
         )
+        atualizar_derivadas(conn, anos_do_evento(cursor, id_evento), commit=False)
         conn.commit()
         cursor.close()
         return True
     except Error as e:
         st.error(f"Erro: {e}")
+        conn.rollback()
         return False
 
 # ==================== LEITURA ====================
@@ -239,9 +249,25 @@ def main():
     st.title("🏅 Sistema CRUD - Banco de Dados Olimpíadas")
     st.markdown("---")
     
-    conn = get_connection()
-    cur = conn.cursor()
+    try:
+        conn = get_connection()
+    except Error as e:
+        st.error(f"Erro ao conectar ao MySQL: {e}")
+        interface(None)
+        return
     
+    # Devolve a conexão ao pool mesmo quando st.rerun() interrompe a página
+    with conn:
+        interface(conn)
+
+def mostrar_pool():
+    stats = estatisticas_pool()
+    with st.sidebar.expander("🔌 Pool de conexões"):
+        st.write(f"Em uso: {stats['em_uso']} de {stats['tamanho']} (livres: {stats['livres']})")
+        st.write(f"Empréstimos: {stats['emprestimos']} | Esperas: {stats['esperas']}")
+        st.write(f"Reconexões: {stats['reconexoes']} | Vazamentos: {stats['vazamentos']} | Falhas: {stats['falhas']}")
+
+def interface(conn):
     if conn and conn.is_connected():
         st.success("✅ Conectado ao MySQL - olimpiadas_db")
         
@@ -252,6 +278,9 @@ def main():
             ["Pais", "Olimpiada", "Atleta", "Evento", "Compete"]
         )
         
+        st.sidebar.markdown("---")
+        mostrar_pool()
+        
         st.sidebar.markdown("---")
         operacao = st.sidebar.radio(
             "Operação:",
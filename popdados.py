@@ -1,12 +1,442 @@
 import pandas as pd
+import numpy as np
 import mysql.connector
 from mysql.connector import Error
 import os
+import argparse
+import tempfile
+import hashlib
+import json
+import queue
+import threading
+import re
+import time
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 
+from migrar import aplicar_migracoes
+from resumos import atualizar_resumos, atualizar_fato, TABELA_FATO
+from db import BACKEND, CAMINHO_SQLITE, conectar_sqlite, dividir_definicoes
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
+COLUNAS_NECESSARIAS = ['nome', 'equipe', 'sigla', 'ano', 'temporada', 'cidade', 'esporte', 'evento', 'medalha', 'peso', 'altura', 'idade', 'sexo']
+
+# Valores de medalha do CSV para o ENUM de Compete (o resto vira 'Sem Medalha')
+MEDALHAS = {
+    'Gold': 'Ouro', 'Ouro': 'Ouro',
+    'Silver': 'Prata', 'Prata': 'Prata',
+    'Bronze': 'Bronze',
+    'NA': 'Sem Medalha', 'nan': 'Sem Medalha', 'None': 'Sem Medalha'
+}
+
+# Muda sempre que _normalizar_dataframe mudar, para invalidar os caches Parquet
+VERSAO_NORMALIZACAO = 2
+
+# Restrições do schema conferidas antes da gravação: tamanho dos VARCHAR NOT NULL
+LIMITES_TEXTO = {
+    'pais_nome': 100,
+    'sigla': 3,
+    'estacao': 20,
+    'sede': 100,
+    'nome': 150,
+    'esporte': 100,
+    'modalidade': 100,
+}
+ESTACOES = ['Verão', 'Inverno', 'Summer', 'Winter']
+
+# Tipos compactos para a leitura em blocos: textos repetidos viram category
+DTYPES_CSV = {
+    'nome': 'object',
+    'equipe': 'category',
+    'sigla': 'category',
+    'ano': 'int16',
+    'temporada': 'category',
+    'cidade': 'category',
+    'esporte': 'category',
+    'evento': 'category',
+    'medalha': 'category',
+    'peso': 'float32',
+    'altura': 'float32',
+    'idade': 'float32',
+    'sexo': 'category',
+}
+
+# Chave primária de cada tabela (mesmos nomes nos DataFrames da importação)
+CHAVES_TABELAS = {
+    'Pais': ['sigla'],
+    'Olimpiada': ['ano'],
+    'Atleta': ['id_atleta'],
+    'Evento': ['id_evento'],
+    'Compete': ['id_atleta', 'id_evento'],
+}
+
+# Tabelas do modelo lógico, na ordem exigida pelas FKs. É a única cópia do DDL:
+# a carga em massa separa daqui as chaves secundárias, CHECKs e FKs para criá-las
+# depois (_separar_restricoes) e o SQLite recebe o mesmo texto traduzido pela conexão
+SCHEMA_TABELAS = [
+    """
+    CREATE TABLE IF NOT EXISTS Pais (
+        sigla VARCHAR(3) PRIMARY KEY,
+        nome VARCHAR(100) NOT NULL,
+        UNIQUE KEY nome (nome)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+
+    """
+    CREATE TABLE IF NOT EXISTS Olimpiada (
+        ano INT PRIMARY KEY,
+        estacao VARCHAR(20) NOT NULL,
+        sede VARCHAR(100) NOT NULL,
+        CHECK (estacao IN ('Verão', 'Inverno', 'Summer', 'Winter'))
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+
+    """
+    CREATE TABLE IF NOT EXISTS Atleta (
+        id_atleta INT PRIMARY KEY AUTO_INCREMENT,
+        nome VARCHAR(150) NOT NULL,
+        sexo CHAR(1),
+        peso DECIMAL(5,2),
+        altura DECIMAL(3,2),
+        idade INT,
+        sigla_pais VARCHAR(3) NOT NULL,
+        FOREIGN KEY (sigla_pais) REFERENCES Pais(sigla)
+            ON DELETE RESTRICT
+            ON UPDATE CASCADE,
+        CHECK (peso > 0 AND altura > 0 AND idade > 0),
+        CHECK (sexo IN ('M', 'F'))
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+
+    """
+    CREATE TABLE IF NOT EXISTS Evento (
+        id_evento INT PRIMARY KEY AUTO_INCREMENT,
+        esporte VARCHAR(100) NOT NULL,
+        modalidade VARCHAR(100) NOT NULL,
+        ano_olimpiada INT NOT NULL,
+        FOREIGN KEY (ano_olimpiada) REFERENCES Olimpiada(ano)
+            ON DELETE RESTRICT
+            ON UPDATE CASCADE,
+        UNIQUE KEY unique_evento (esporte, modalidade, ano_olimpiada)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+
+    """
+    CREATE TABLE IF NOT EXISTS Compete (
+        id_atleta INT,
+        id_evento INT,
+        medalha ENUM('Ouro', 'Prata', 'Bronze', 'Sem Medalha', 'Gold', 'Silver', 'NA') DEFAULT 'Sem Medalha',
+        PRIMARY KEY (id_atleta, id_evento),
+        FOREIGN KEY (id_atleta) REFERENCES Atleta(id_atleta)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        FOREIGN KEY (id_evento) REFERENCES Evento(id_evento)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """
+]
+
+# INSERTs de carga com ids explícitos, na ordem exigida pelas FKs. O ON DUPLICATE
+# KEY sem efeito faz o papel do INSERT IGNORE sem impedir que o conector reescreva
+# o executemany como um único INSERT de múltiplas linhas
+COMANDOS_INSERT = {
+    'Pais': """INSERT INTO Pais (sigla, nome) VALUES (%s, %s)
+               ON DUPLICATE KEY UPDATE sigla = sigla""",
+    'Olimpiada': """INSERT INTO Olimpiada (ano, estacao, sede) VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE ano = ano""",
+    'Atleta': """INSERT INTO Atleta (id_atleta, nome, sexo, peso, altura, idade, sigla_pais)
+                 VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+    'Evento': """INSERT INTO Evento (id_evento, esporte, modalidade, ano_olimpiada)
+                 VALUES (%s, %s, %s, %s)""",
+    'Compete': """INSERT INTO Compete (id_atleta, id_evento, medalha) VALUES (%s, %s, %s)
+                  ON DUPLICATE KEY UPDATE id_atleta = id_atleta""",
+}
+
+# INSERTs que também atualizam a linha quando a chave já existe
+COMANDOS_UPSERT = {
+    'Pais': """INSERT INTO Pais (sigla, nome) VALUES (%s, %s)
+               ON DUPLICATE KEY UPDATE nome = VALUES(nome)""",
+    'Olimpiada': """INSERT INTO Olimpiada (ano, estacao, sede) VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE estacao = VALUES(estacao), sede = VALUES(sede)""",
+    'Atleta': """INSERT INTO Atleta (id_atleta, nome, sexo, peso, altura, idade, sigla_pais)
+                 VALUES (%s, %s, %s, %s, %s, %s, %s)
+                 ON DUPLICATE KEY UPDATE nome = VALUES(nome), sexo = VALUES(sexo), peso = VALUES(peso),
+                     altura = VALUES(altura), idade = VALUES(idade), sigla_pais = VALUES(sigla_pais)""",
+    'Evento': """INSERT INTO Evento (id_evento, esporte, modalidade, ano_olimpiada)
+                 VALUES (%s, %s, %s, %s)
+                 ON DUPLICATE KEY UPDATE esporte = VALUES(esporte), modalidade = VALUES(modalidade),
+                     ano_olimpiada = VALUES(ano_olimpiada)""",
+    'Compete': """INSERT INTO Compete (id_atleta, id_evento, medalha) VALUES (%s, %s, %s)
+                  ON DUPLICATE KEY UPDATE medalha = VALUES(medalha)""",
+}
+
+class MapaCompacto:
+    """
+    Mapa chave -> id para milhões de chaves: cada tupla vira um hash de 64 bits
+    guardado em arrays NumPy ordenados (12 bytes por chave, contra algumas
+    centenas num dict de tuplas de strings). Inserções avulsas ficam num dict
+    pequeno até serem intercaladas nos arrays. Uma colisão de hash faria duas
+    chaves dividirem o id; com 10 milhões de chaves a chance é da ordem de 1 em 300 mil
+    """
+    
+    def __init__(self, limite_pendentes=100_000):
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.ids = np.empty(0, dtype=np.int32)
+        self.pendentes = {}     # hash -> id, ainda fora dos arrays
+        self.limite_pendentes = limite_pendentes
+    
+    def _hash(self, chaves):
+        """Hash de 64 bits de cada tupla, combinando o hash de cada posição"""
+        resultado = np.zeros(len(chaves), dtype=np.uint64)
+        for coluna in zip(*chaves):
+            valores = pd.util.hash_array(np.asarray(coluna, dtype=object))
+            resultado = (resultado * np.uint64(0x100000001B3)) ^ valores
+        return resultado
+    
+    def _intercalar(self, hashes, ids):
+        """Insere hashes novos mantendo os arrays ordenados (sem reordenar tudo)"""
+        ordem = np.argsort(hashes, kind='stable')
+        hashes, ids = hashes[ordem], ids[ordem]
+        posicoes = np.searchsorted(self.hashes, hashes)
+        self.hashes = np.insert(self.hashes, posicoes, hashes)
+        self.ids = np.insert(self.ids, posicoes, ids.astype(np.int32))
+    
+    def _consolidar(self):
+        if self.pendentes:
+            self._intercalar(np.fromiter(self.pendentes.keys(), np.uint64, len(self.pendentes)),
+                             np.fromiter(self.pendentes.values(), np.int64, len(self.pendentes)))
+            self.pendentes.clear()
+    
+    def _buscar(self, hashes):
+        """Id de cada hash, ou -1 para os que não estão no mapa"""
+        self._consolidar()
+        posicoes = np.searchsorted(self.hashes, hashes)
+        posicoes[posicoes == len(self.hashes)] = 0
+        encontrados = (self.hashes[posicoes] == hashes) if len(self.hashes) else np.zeros(len(hashes), bool)
+        return np.where(encontrados, self.ids[posicoes] if len(self.ids) else -1, -1).astype(np.int64)
+    
+    def carregar(self, chaves, ids):
+        """Acrescenta pares vindos do banco; para chaves repetidas vale o menor id"""
+        hashes = self._hash(chaves)
+        ids = np.asarray(ids, dtype=np.int64)
+        ordem = np.lexsort((ids, hashes))
+        hashes, ids = hashes[ordem], ids[ordem]
+        primeiros = np.ones(len(hashes), dtype=bool)
+        primeiros[1:] = hashes[1:] != hashes[:-1]
+        existentes = self._buscar(hashes[primeiros]) >= 0
+        self._intercalar(hashes[primeiros][~existentes], ids[primeiros][~existentes])
+    
+    def resolver(self, chaves, proximo):
+        """
+        Versão vetorizada do laço de _resolver_ids para chaves únicas: devolve
+        os ids, a máscara das novas (numeradas a partir de `proximo`) e o próximo id livre
+        """
+        hashes = self._hash(chaves)
+        ids = self._buscar(hashes)
+        novos = ids < 0
+        quantidade = int(novos.sum())
+        ids[novos] = np.arange(proximo, proximo + quantidade)
+        self._intercalar(hashes[novos], ids[novos])
+        return ids, novos, proximo + quantidade
+    
+    def get(self, chave, padrao=None):
+        h = self._hash([chave])[0]
+        if h in self.pendentes:
+            return self.pendentes[h]
+        posicao = np.searchsorted(self.hashes, h)
+        if posicao < len(self.hashes) and self.hashes[posicao] == h:
+            return int(self.ids[posicao])
+        return padrao
+    
+    def __contains__(self, chave):
+        return self.get(chave) is not None
+    
+    def __getitem__(self, chave):
+        valor = self.get(chave)
+        if valor is None:
+            raise KeyError(chave)
+        return valor
+    
+    def __setitem__(self, chave, id_):
+        self.pendentes[self._hash([chave])[0]] = id_
+        if len(self.pendentes) >= self.limite_pendentes:
+            self._consolidar()
+    
+    def __len__(self):
+        return len(self.hashes) + len(self.pendentes)
+
+
+class MapaChaves:
+    """Chaves já gravadas no banco, mantidas em memória entre lotes da importação"""
+    
+    def __init__(self, compacto=False):
+        self.paises = {}        # sigla -> nome
+        self.olimpiadas = set()
+        # (nome, sigla) -> id_atleta; com `compacto`, guardado como hashes em arrays
+        self.atletas = MapaCompacto() if compacto else {}
+        self.eventos = {}       # (esporte, modalidade, ano) -> id_evento
+        self.proximo_atleta = 1
+        self.proximo_evento = 1
+
+
+class Telemetria:
+    """Tempos por etapa, idas ao servidor e rejeições de uma importação"""
+    
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas = {}        # etapa -> segundos
+        self.tabelas = {}       # tabela -> {'segundos', 'comandos', 'linhas'}
+        self.idas_servidor = 0
+        self.commits = 0
+        self.linhas_lidas = 0
+        self.linhas_importadas = 0
+        self.rejeicoes = Counter()
+        self.exemplos = {}      # motivo -> primeiras mensagens
+        self.lotes = []         # linhas de cada transação confirmada
+    
+    @contextmanager
+    def medir(self, etapa):
+        """Soma o tempo do bloco `with` na etapa indicada"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[etapa] = self.etapas.get(etapa, 0.0) + time.perf_counter() - inicio
+    
+    def registrar_comando(self, tabela, segundos, linhas):
+        """Contabiliza um execute/executemany enviado ao servidor"""
+        dados = self.tabelas.setdefault(tabela, {'segundos': 0.0, 'comandos': 0, 'linhas': 0})
+        dados['segundos'] += segundos
+        dados['comandos'] += 1
+        dados['linhas'] += linhas
+        self.idas_servidor += 1
+    
+    def commit(self, connection):
+        """Faz o commit medindo o tempo gasto; devolve a latência em segundos"""
+        inicio = time.perf_counter()
+        with self.medir('commit'):
+            connection.commit()
+        self.commits += 1
+        self.idas_servidor += 1
+        return time.perf_counter() - inicio
+    
+    def registrar_lote(self, linhas, importadas):
+        """Chamado depois do commit: só então as linhas do lote contam como importadas"""
+        self.lotes.append(linhas)
+        self.linhas_importadas += importadas
+    
+    def rejeitar(self, motivo, linha, mensagem):
+        """Conta uma linha rejeitada e guarda até cinco exemplos por motivo"""
+        self.rejeicoes[motivo] += 1
+        exemplos = self.exemplos.setdefault(motivo, [])
+        if len(exemplos) < 5:
+            exemplos.append({'linha': linha, 'mensagem': mensagem[:200]})
+    
+    def linhas_por_segundo(self):
+        duracao = time.perf_counter() - self.inicio
+        return self.linhas_lidas / duracao if duracao else 0.0
+    
+    def relatorio(self):
+        """Resumo da importação em um dicionário serializável em JSON"""
+        duracao = time.perf_counter() - self.inicio
+        return {
+            'duracao_segundos': round(duracao, 3),
+            'linhas_lidas': self.linhas_lidas,
+            'linhas_importadas': self.linhas_importadas,
+            'linhas_por_segundo': round(self.linhas_lidas / duracao, 1) if duracao else 0.0,
+            'idas_servidor': self.idas_servidor,
+            'commits': self.commits,
+            'lotes': {
+                'quantidade': len(self.lotes),
+                'menor': min(self.lotes, default=0),
+                'maior': max(self.lotes, default=0),
+                'ultimo': self.lotes[-1] if self.lotes else 0,
+            },
+            'etapas': {etapa: round(segundos, 3) for etapa, segundos in self.etapas.items()},
+            'tabelas': {
+                tabela: {**dados, 'segundos': round(dados['segundos'], 3)}
+                for tabela, dados in self.tabelas.items()
+            },
+            'rejeicoes': dict(self.rejeicoes),
+            'exemplos_rejeicoes': self.exemplos,
+        }
+    
+    def gravar_json(self, caminho):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.relatorio(), arquivo, indent=2, ensure_ascii=False)
+
+
+class ControleLotes:
+    """
+    Decide quantas linhas entram em cada transação. Depois de cada commit,
+    separa a latência do commit do tempo gasto por linha e calcula o lote que
+    levaria `duracao_alvo` segundos, limitado a [minimo, maximo] e a no máximo
+    o dobro do atual. Sem `duracao_alvo`, o tamanho fica fixo em `inicial`
+    """
+    
+    def __init__(self, inicial=500, minimo=100, maximo=50_000, duracao_alvo=1.0):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.duracao_alvo = duracao_alvo
+        self.tamanho = inicial if not duracao_alvo else max(minimo, min(maximo, inicial))
+        self.inicio_lote = time.perf_counter()
+    
+    def registrar(self, linhas, latencia_commit):
+        """Recalcula o tamanho com a duração do lote que acabou de ser confirmado"""
+        agora = time.perf_counter()
+        duracao, self.inicio_lote = agora - self.inicio_lote, agora
+        if not self.duracao_alvo or linhas <= 0:
+            return
+        
+        por_linha = max(duracao - latencia_commit, 1e-9) / linhas
+        if latencia_commit >= self.duracao_alvo:
+            # Commit lento (servidor ocupado): lotes grandes diluem o custo dele
+            ideal = self.maximo
+        else:
+            ideal = (self.duracao_alvo - latencia_commit) / por_linha
+        
+        # Média com o tamanho atual para não oscilar a cada lote
+        ideal = min(ideal, self.tamanho * 2)
+        self.tamanho = int(max(self.minimo, min(self.maximo, (self.tamanho + ideal) / 2)))
+
+
+class CursorMedido:
+    """Repassa as chamadas ao cursor, registrando tempo e linhas por tabela na Telemetria"""
+    
+    TABELA_SQL = re.compile(r'\b(?:INTO|FROM|UPDATE)\s+`?(\w+)', re.IGNORECASE)
+    
+    def __init__(self, cursor, telemetria):
+        self.cursor = cursor
+        self.telemetria = telemetria
+    
+    def _tabela(self, sql):
+        encontrada = self.TABELA_SQL.search(sql)
+        return encontrada.group(1) if encontrada else 'outros'
+    
+    def execute(self, sql, params=None):
+        inicio = time.perf_counter()
+        try:
+            return self.cursor.execute(sql, params)
+        finally:
+            self.telemetria.registrar_comando(self._tabela(sql), time.perf_counter() - inicio, 1)
+    
+    def executemany(self, sql, params):
+        inicio = time.perf_counter()
+        try:
+            return self.cursor.executemany(sql, params)
+        finally:
+            self.telemetria.registrar_comando(self._tabela(sql), time.perf_counter() - inicio, len(params))
+    
+    def __getattr__(self, nome):
+        return getattr(self.cursor, nome)
+
+
 class OlimpiadasCSVToMySQL:
     def __init__(self, host, database, user, password):
         """
@@ -17,6 +447,12 @@ class OlimpiadasCSVToMySQL:
         self.user = user
         self.password = password
         self.connection = None
+        self.carga_em_massa = False
+        self.cache_dados = True
+        self.arquivo_rejeitados = None
+        self.mapa_compacto = False
+        self.silencioso = False     # processos de gravação não anunciam a conexão
+        self.siglas_descartadas = {}    # sigla -> registros não importados (nome de país de outra sigla)
     
     def conectar(self):
         """Estabelece conexão com o banco de dados"""
@@ -24,10 +460,12 @@ class OlimpiadasCSVToMySQL:
             self.connection = mysql.connector.connect(
                 host=self.host,
                 user=self.user,
-                password=self.password
+                password=self.password,
+                allow_local_infile=True
             )
             if self.connection.is_connected():
-                print(f"✓ Conectado ao MySQL Server versão {self.connection.get_server_info()}")
+                if not self.silencioso:
+                    print(f"✓ Conectado ao MySQL Server versão {self.connection.get_server_info()}")
                 return True
         except Error as e:
             print(f"✗ Erro ao conectar ao MySQL: {e}")
@@ -54,75 +492,31 @@ class OlimpiadasCSVToMySQL:
         except Error as e:
             print(f"✗ Erro ao criar banco: {e}")
     
-    def criar_schema(self):
-        """Cria as tabelas do modelo lógico de Olimpíadas"""
+    def usar_database(self):
+        """Seleciona o banco de dados, criando-o apenas se ainda não existir"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+            cursor.execute(f"USE {self.database}")
+            print(f"✓ Usando banco de dados '{self.database}'")
+            cursor.close()
+        except Error as e:
+            print(f"✗ Erro ao selecionar banco: {e}")
+    
+    def criar_schema(self, carga_em_massa=False):
+        """
+        Cria as tabelas do modelo lógico de Olimpíadas. Com `carga_em_massa`,
+        cria só as tabelas com chave primária; FKs, UNIQUE e CHECK ficam para
+        finalizar_schema(), depois que os dados forem carregados
+        """
+        if carga_em_massa:
+            self._criar_schema_sem_restricoes()
+            return
+        
         try:
             cursor = self.connection.cursor()
             
-            tabelas = [
-                """
-                CREATE TABLE IF NOT EXISTS Pais (
-                    sigla VARCHAR(3) PRIMARY KEY,
-                    nome VARCHAR(100) NOT NULL UNIQUE
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """,
-                
-                """
-                CREATE TABLE IF NOT EXISTS Olimpiada (
-                    ano INT PRIMARY KEY,
-                    estacao VARCHAR(20) NOT NULL,
-                    sede VARCHAR(100) NOT NULL,
-                    CHECK (estacao IN ('Verão', 'Inverno', 'Summer', 'Winter'))
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """,
-                
-                """
-                CREATE TABLE IF NOT EXISTS Atleta (
-                    id_atleta INT PRIMARY KEY AUTO_INCREMENT,
-                    nome VARCHAR(150) NOT NULL,
-                    sexo CHAR(1),
-                    peso DECIMAL(5,2),
-                    altura DECIMAL(3,2),
-                    idade INT,
-                    sigla_pais VARCHAR(3) NOT NULL,
-                    FOREIGN KEY (sigla_pais) REFERENCES Pais(sigla)
-                        ON DELETE RESTRICT
-                        ON UPDATE CASCADE,
-                    CHECK (peso > 0 AND altura > 0 AND idade > 0),
-                    CHECK (sexo IN ('M', 'F'))
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """,
-                
-                """
-                CREATE TABLE IF NOT EXISTS Evento (
-                    id_evento INT PRIMARY KEY AUTO_INCREMENT,
-                    esporte VARCHAR(100) NOT NULL,
-                    modalidade VARCHAR(100) NOT NULL,
-                    ano_olimpiada INT NOT NULL,
-                    FOREIGN KEY (ano_olimpiada) REFERENCES Olimpiada(ano)
-                        ON DELETE RESTRICT
-                        ON UPDATE CASCADE,
-                    UNIQUE KEY unique_evento (esporte, modalidade, ano_olimpiada)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """,
-                
-                """
-                CREATE TABLE IF NOT EXISTS Compete (
-                    id_atleta INT,
-                    id_evento INT,
-                    medalha ENUM('Ouro', 'Prata', 'Bronze', 'Sem Medalha', 'Gold', 'Silver', 'NA') DEFAULT 'Sem Medalha',
-                    PRIMARY KEY (id_atleta, id_evento),
-                    FOREIGN KEY (id_atleta) REFERENCES Atleta(id_atleta)
-                        ON DELETE CASCADE
-                        ON UPDATE CASCADE,
-                    FOREIGN KEY (id_evento) REFERENCES Evento(id_evento)
-                        ON DELETE CASCADE
-                        ON UPDATE CASCADE
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """
-            ]
-            
-            for sql in tabelas:
+            for sql in SCHEMA_TABELAS:
                 cursor.execute(sql)
                 self.connection.commit()
             
@@ -132,89 +526,427 @@ class OlimpiadasCSVToMySQL:
         except Error as e:
             print(f"✗ Erro ao criar schema: {e}")
     
-    def processar_csv_unico(self, csv_path, batch_size=500, ano_inicial=1896, ano_final=2016):
+    def _criar_schema_sem_restricoes(self):
+        """Cria as tabelas apenas com as chaves primárias, para a carga em massa"""
+        try:
+            cursor = self.connection.cursor()
+            
+            for sql in SCHEMA_TABELAS:
+                sem_restricoes, _ = self._separar_restricoes(sql)
+                cursor.execute(sem_restricoes)
+            
+            # Sem FKs para manter e sem verificação de unicidade durante a carga
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            cursor.execute("SET SESSION unique_checks = 0")
+            self.carga_em_massa = True
+            
+            print("✓ Tabelas criadas sem restrições (carga em massa)")
+            cursor.close()
+            
+        except Error as e:
+            print(f"✗ Erro ao criar schema: {e}")
+    
+    def finalizar_schema(self):
+        """
+        Depois da carga em massa: cria índices, UNIQUE, CHECK e FKs com um
+        único ALTER TABLE por tabela, reativa as verificações da sessão e
+        confere a integridade referencial. Devolve True se estiver tudo íntegro
+        """
+        try:
+            cursor = self.connection.cursor()
+            
+            print("🔧 Criando índices e restrições adiadas...")
+            for sql in SCHEMA_TABELAS:
+                _, restricoes = self._separar_restricoes(sql)
+                tabela = re.search(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)', sql).group(1)
+                if restricoes:
+                    cursor.execute(f"ALTER TABLE {tabela} " + ", ".join(f"ADD {r}" for r in restricoes))
+            
+            cursor.execute("SET SESSION unique_checks = 1")
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+            self.carga_em_massa = False
+            
+            # Com foreign_key_checks = 0 as FKs foram criadas sem validar os dados
+            problemas = self._contar_orfaos(cursor)
+            cursor.close()
+            
+            if problemas:
+                for relacao, total in problemas.items():
+                    print(f"❌ Integridade referencial violada em {relacao}: {total} linhas órfãs")
+                return False
+            
+            print("✓ Restrições criadas e integridade referencial confirmada!")
+            return True
+            
+        except Error as e:
+            print(f"✗ Erro ao finalizar schema: {e}")
+            return False
+    
+    def _contar_orfaos(self, cursor):
+        """Linhas que apontam para pais inexistentes, por relação (só as que têm órfãos)"""
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM Atleta a LEFT JOIN Pais p ON p.sigla = a.sigla_pais
+                 WHERE p.sigla IS NULL),
+                (SELECT COUNT(*) FROM Evento e LEFT JOIN Olimpiada o ON o.ano = e.ano_olimpiada
+                 WHERE o.ano IS NULL),
+                (SELECT COUNT(*) FROM Compete c LEFT JOIN Atleta a ON a.id_atleta = c.id_atleta
+                 WHERE a.id_atleta IS NULL),
+                (SELECT COUNT(*) FROM Compete c LEFT JOIN Evento e ON e.id_evento = c.id_evento
+                 WHERE e.id_evento IS NULL)
+        """)
+        orfaos = dict(zip(['Atleta → Pais', 'Evento → Olimpiada', 'Compete → Atleta', 'Compete → Evento'],
+                          cursor.fetchone()))
+        return {relacao: total for relacao, total in orfaos.items() if total}
+    
+    def validar_banco(self, referencia=None):
+        """
+        Confere o banco recém-importado antes da troca: nenhuma tabela vazia e
+        nenhuma linha órfã. Com `referencia`, mostra também a contagem atual
+        daquele banco para comparação. Devolve True se estiver tudo certo
+        """
+        try:
+            cursor = self.connection.cursor()
+            valido = True
+            
+            print("🔍 Validando o banco importado...")
+            for tabela in CHAVES_TABELAS:
+                cursor.execute(f"SELECT COUNT(*) FROM {self.database}.{tabela}")
+                total = cursor.fetchone()[0]
+                anterior = ''
+                if referencia and tabela in self._listar_tabelas(cursor, referencia):
+                    cursor.execute(f"SELECT COUNT(*) FROM {referencia}.{tabela}")
+                    anterior = f" (atual: {cursor.fetchone()[0]})"
+                print(f"   {tabela}: {total} linhas{anterior}")
+                if not total:
+                    print(f"❌ Tabela {tabela} vazia")
+                    valido = False
+            
+            for relacao, total in self._contar_orfaos(cursor).items():
+                print(f"❌ Integridade referencial violada em {relacao}: {total} linhas órfãs")
+                valido = False
+            
+            cursor.close()
+            if valido:
+                print("✓ Banco importado validado!")
+            return valido
+            
+        except Error as e:
+            print(f"✗ Erro ao validar banco: {e}")
+            return False
+    
+    def _listar_tabelas(self, cursor, database):
+        cursor.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = %s AND table_type = 'BASE TABLE'",
+            (database,)
+        )
+        return [nome for (nome,) in cursor.fetchall()]
+    
+    def tem_tabela_em(self, database, tabela):
+        """Se `tabela` existe em `database` (pode ser outro banco que não o da importação)"""
+        cursor = self.connection.cursor()
+        existe = tabela in self._listar_tabelas(cursor, database)
+        cursor.close()
+        return existe
+    
+    def trocar_sombra(self, destino):
         """
-        Processa o arquivo olimpiadasfiltrado.csv com todas as informações
+        Publica o banco sombra (self.database) no lugar de `destino` com um único
+        RENAME TABLE, que é atômico: quem lê `destino` vê as tabelas antigas até o
+        instante da troca e as novas logo depois, sem passar por um banco vazio.
+        As tabelas antigas vão para `<destino>_old`, que é removido em seguida;
+        vão junto as que só existem em `destino` (RecargaPendente, checkpoints,
+        staging), que descreviam os dados substituídos.
+        Esporte e Modalidade também são os da sombra: os códigos podem mudar na
+        troca, e por isso ResumoMedalhas e CompeteFato precisam vir da sombra
         """
+        antigo = f"{destino}_old"
         try:
-            print(f"\n📂 Carregando CSV: {csv_path}")
-            df = pd.read_csv(csv_path)
+            cursor = self.connection.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {destino} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+            cursor.execute(f"DROP DATABASE IF EXISTS {antigo}")
+            cursor.execute(f"CREATE DATABASE {antigo} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
             
-            df.columns = df.columns.str.strip().str.lower()
-            print(f"✓ CSV carregado: {len(df)} registros")
+            # Tabelas auxiliares da importação não são publicadas
+            tabelas = [tabela for tabela in self._listar_tabelas(cursor, self.database)
+                       if tabela != 'ImportacaoCheckpoint' and not tabela.startswith('Staging')]
+            existentes = set(self._listar_tabelas(cursor, destino))
             
-            df = df[(df['ano'] >= ano_inicial) & (df['ano'] <= ano_final)]
-            print(f"✓ Após filtro ({ano_inicial}-{ano_final}): {len(df)} registros")
-            print(f"📊 Colunas encontradas: {', '.join(df.columns)}\n")
+            renomear = []
+            for tabela in tabelas:
+                if tabela in existentes:
+                    renomear.append(f"{destino}.{tabela} TO {antigo}.{tabela}")
+                renomear.append(f"{self.database}.{tabela} TO {destino}.{tabela}")
+            for tabela in sorted(existentes - set(tabelas)):
+                renomear.append(f"{destino}.{tabela} TO {antigo}.{tabela}")
             
-            colunas_necessarias = ['nome', 'equipe', 'sigla', 'ano', 'temporada', 'cidade', 'esporte', 'evento', 'medalha', 'peso', 'altura', 'idade', 'sexo']
-            colunas_faltando = [col for col in colunas_necessarias if col not in df.columns]
+            print(f"🔀 Trocando {len(tabelas)} tabelas de '{self.database}' para '{destino}'...")
+            cursor.execute("RENAME TABLE " + ", ".join(renomear))
             
-            if colunas_faltando:
-                print(f"❌ ERRO: Colunas faltando no CSV: {', '.join(colunas_faltando)}")
-                print(f"📋 Colunas disponíveis: {', '.join(df.columns)}")
-                return
+            cursor.execute(f"DROP DATABASE {antigo}")
+            cursor.execute(f"DROP DATABASE {self.database}")
+            cursor.execute(f"USE {destino}")
+            cursor.close()
+            self.database = destino
+            print(f"✓ Banco '{destino}' atualizado sem interrupção!")
+            return True
             
-            col_map = self._mapear_colunas(df.columns)
+        except Error as e:
+            print(f"✗ Erro ao trocar as tabelas: {e}")
+            return False
+    
+    def criar_snapshot(self, pasta):
+        """
+        Exporta as cinco tabelas (e a schema_version, se existir) para `pasta`,
+        um Parquet (zstd) por tabela, com o CREATE TABLE e a ordem de carga nos
+        metadados. restaurar_snapshot recria o banco só a partir desses arquivos,
+        sem passar pelo CSV
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("✗ Snapshot precisa do pyarrow (pip install pyarrow)")
+            return False
+        
+        try:
+            os.makedirs(pasta, exist_ok=True)
+            cursor = self.connection.cursor()
+            
+            # schema_version vai junto, para o banco restaurado saber quais migrações já tem
+            tabelas = list(CHAVES_TABELAS)
+            if 'schema_version' in self._listar_tabelas(cursor, self.database):
+                tabelas.append('schema_version')
+            
+            print(f"📸 Criando snapshot de '{self.database}' em {pasta}")
+            for ordem, tabela in enumerate(tabelas):
+                cursor.execute(f"SHOW CREATE TABLE {tabela}")
+                ddl = cursor.fetchone()[1]
+                # Colunas geradas (ex.: Compete.cod_medalha) são recalculadas pelo MySQL e não aceitam INSERT
+                cursor.execute(
+                    "SELECT column_name FROM information_schema.columns WHERE table_schema = %s "
+                    "AND table_name = %s AND extra NOT LIKE '%%GENERATED%%' ORDER BY ordinal_position",
+                    (self.database, tabela)
+                )
+                colunas = [nome for (nome,) in cursor.fetchall()]
+                cursor.execute(f"SELECT {', '.join(colunas)} FROM {tabela}")
+                df = pd.DataFrame(cursor.fetchall(), columns=colunas)
+                
+                arquivo = pa.Table.from_pandas(df, preserve_index=False)
+                metadados = dict(arquivo.schema.metadata or {})
+                metadados.update({b'tabela': tabela.encode(), b'ordem': str(ordem).encode(), b'ddl': ddl.encode()})
+                
+                destino = os.path.join(pasta, f"{tabela}.parquet")
+                pq.write_table(arquivo.replace_schema_metadata(metadados), destino + '.tmp', compression='zstd')
+                os.replace(destino + '.tmp', destino)
+                print(f"   {tabela}: {len(df)} linhas")
+            
+            cursor.close()
+            print("✓ Snapshot criado!")
+            return True
+            
+        except Error as e:
+            print(f"✗ Erro ao criar snapshot: {e}")
+            return False
+    
+    def restaurar_snapshot(self, pasta):
+        """
+        Recria as tabelas do snapshot em `pasta` no banco atual (que deve estar
+        vazio). Cada tabela é criada pelo CREATE TABLE guardado, mas só com a
+        chave primária; os dados entram com INSERTs de múltiplas linhas e as
+        verificações de FK/UNIQUE desligadas, e os índices, CHECKs e FKs
+        removidos do DDL são criados no fim, um ALTER TABLE por tabela
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("✗ Restauração precisa do pyarrow (pip install pyarrow)")
+            return False
+        
+        arquivos = []
+        for nome in os.listdir(pasta):
+            if nome.endswith('.parquet'):
+                caminho = os.path.join(pasta, nome)
+                metadados = pq.read_schema(caminho).metadata or {}
+                if b'ddl' in metadados:
+                    arquivos.append((int(metadados[b'ordem']), metadados[b'tabela'].decode(),
+                                     metadados[b'ddl'].decode(), caminho))
+        if not arquivos:
+            print(f"✗ Nenhum snapshot encontrado em {pasta}")
+            return False
+        arquivos.sort()
+        
+        try:
             cursor = self.connection.cursor()
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            cursor.execute("SET SESSION unique_checks = 0")
+            limite_pacote = self._limite_pacote(cursor)
+            adiadas = {}
+            
+            print(f"♻️  Restaurando snapshot de {pasta} em '{self.database}'")
+            for _, tabela, ddl, caminho in arquivos:
+                ddl, adiadas[tabela] = self._separar_restricoes(ddl)
+                cursor.execute(ddl)
+                
+                df = pq.read_table(caminho).to_pandas()
+                colunas = ', '.join(df.columns)
+                marcadores = ', '.join(['%s'] * len(df.columns))
+                sql = f"INSERT INTO {tabela} ({colunas}) VALUES ({marcadores})"
+                enviados = self._inserir_em_lotes(cursor, sql, self._linhas(df), limite_pacote)
+                self.connection.commit()
+                print(f"   {tabela}: {len(df)} linhas em {enviados} comandos")
+            
+            print("🔧 Recriando índices e restrições...")
+            for tabela, restricoes in adiadas.items():
+                if restricoes:
+                    cursor.execute(f"ALTER TABLE {tabela} " + ", ".join(f"ADD {r}" for r in restricoes))
+            
+            cursor.execute("SET SESSION unique_checks = 1")
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+            problemas = self._contar_orfaos(cursor)
+            cursor.close()
+            
+            if problemas:
+                for relacao, total in problemas.items():
+                    print(f"❌ Integridade referencial violada em {relacao}: {total} linhas órfãs")
+                return False
+            
+            print("✓ Snapshot restaurado!")
+            return True
+            
+        except Error as e:
+            print(f"✗ Erro ao restaurar snapshot: {e}")
+            self.connection.rollback()
+            return False
+    
+    def _separar_restricoes(self, ddl):
+        """
+        Divide um CREATE TABLE (de SHOW CREATE TABLE ou de SCHEMA_TABELAS) em
+        (DDL só com colunas e chave primária, lista de índices/CHECKs/FKs para
+        um ALTER TABLE ... ADD posterior)
+        """
+        ddl = ddl.strip()
+        inicio = ddl.index('(')
+        fim = re.search(r'\n\s*\)[^\n]*$', ddl).start()
+        corpo, restricoes = [], []
+        for definicao in dividir_definicoes(ddl[inicio + 1:fim]):
+            if re.match(r'(UNIQUE|KEY|INDEX|FULLTEXT|CONSTRAINT|FOREIGN\s+KEY|CHECK)\b', definicao, re.I):
+                restricoes.append(definicao)
+            else:
+                corpo.append('  ' + definicao)
+        # FKs por último, depois dos índices que elas usam
+        restricoes.sort(key=lambda r: 'FOREIGN KEY' in r)
+        return '\n'.join([ddl[:inicio + 1], ',\n'.join(corpo), ddl[fim:].strip()]), restricoes
+    
+    def processar_csv_unico(self, csv_path, batch_size=500, ano_inicial=1896, ano_final=2016, ids_no_cliente=False,
+                            relatorio=None, lote_min=100, lote_max=50_000, duracao_alvo=1.0):
+        """
+        Processa o arquivo olimpiadasfiltrado.csv com todas as informações.
+        A limpeza e a validação são feitas antes, em colunas inteiras; o laço só
+        grava registros que já respeitam as restrições do schema.
+        Com `ids_no_cliente`, id_atleta e id_evento vêm de contadores em memória
+        (a partir do MAX(id) do banco) e as cinco tabelas são gravadas em lotes
+        a cada commit, sem lastrowid nem SELECT de volta por entidade nova.
+        Tempos por etapa e por tabela, idas ao servidor e rejeições por motivo
+        são medidos e, com `relatorio`, gravados nesse arquivo JSON.
+        O commit acontece a cada `batch_size` linhas processadas; com
+        `duracao_alvo`, esse tamanho é ajustado entre `lote_min` e `lote_max`
+        para que cada transação dure por volta desse número de segundos
+        """
+        telemetria = Telemetria()
+        controle = ControleLotes(batch_size, lote_min, lote_max, duracao_alvo)
+        try:
+            with telemetria.medir('leitura'):
+                df = self._carregar_csv(csv_path, ano_inicial, ano_final)
+            if df is None:
+                return
+            telemetria.linhas_lidas = len(df)
+            
+            with telemetria.medir('transformacao'):
+                dados = self._normalizar_dataframe(df, self._mapear_colunas(df.columns))
+            with telemetria.medir('validacao'):
+                dados, rejeitados = self._separar_rejeitados(dados, csv_path)
+            for motivo, quantidade in rejeitados['motivo'].str.split(';').explode().value_counts().items():
+                telemetria.rejeicoes[motivo] += int(quantidade)
+            
+            cursor = CursorMedido(self.connection.cursor(), telemetria)
             
             paises_cache = {}
-            atletas_cache = {}
+            atletas_cache = MapaCompacto() if self.mapa_compacto else {}
             eventos_cache = {}
             olimpiadas_cache = set()
             
-            total = len(df)
+            if ids_no_cliente:
+                chaves = self._carregar_chaves(cursor)
+                paises_cache = chaves.paises
+                eventos_cache = chaves.eventos
+                olimpiadas_cache = chaves.olimpiadas
+                nomes_paises = set(paises_cache.values())
+                pendentes = {tabela: [] for tabela in COMANDOS_INSERT}
+                limite_pacote = self._limite_pacote(cursor)
+            
+            total = len(dados)
             erros = 0
             
             print("🔄 Processando registros...\n")
             
-            for idx, row in df.iterrows():
+            inicio_loop = time.perf_counter()
+            controle.inicio_lote = inicio_loop
+            linhas_lote = 0
+            importadas_lote = 0
+            for idx, linha in enumerate(self._linhas(dados)):
+                if linhas_lote >= controle.tamanho:
+                    if ids_no_cliente:
+                        self._gravar_pendentes(cursor, pendentes, limite_pacote)
+                    controle.registrar(linhas_lote, telemetria.commit(self.connection))
+                    telemetria.registrar_lote(linhas_lote, importadas_lote)
+                    linhas_lote = 0
+                    importadas_lote = 0
+                    progresso = (idx / total) * 100
+                    print(f"   Progresso: {idx}/{total} ({progresso:.1f}%) - Erros: {erros} - "
+                          f"{telemetria.linhas_por_segundo():.0f} linhas/s - lote: {controle.tamanho}")
+                linhas_lote += 1
+                
+                (pais_nome, pais_sigla, ano, estacao, sede, atleta_nome, sexo,
+                 peso, altura, idade, esporte, modalidade, medalha) = linha
                 try:
                     # PAÍS
-                    pais_nome = str(row[col_map['pais']]).strip()
-                    pais_sigla = str(row[col_map['sigla']]).strip().upper()
-                    
                     if pais_sigla not in paises_cache:
-                        cursor.execute(
-                            "INSERT IGNORE INTO Pais (sigla, nome) VALUES (%s, %s)",
-                            (pais_sigla, pais_nome)
-                        )
-                        paises_cache[pais_sigla] = True
+                        if ids_no_cliente:
+                            # O INSERT IGNORE descartaria o país e o atleta violaria a FK
+                            if pais_nome in nomes_paises:
+                                raise ValueError(f"país '{pais_nome}' já cadastrado com outra sigla")
+                            pendentes['Pais'].append((pais_sigla, pais_nome))
+                            nomes_paises.add(pais_nome)
+                            paises_cache[pais_sigla] = pais_nome
+                        else:
+                            cursor.execute(
+                                "INSERT IGNORE INTO Pais (sigla, nome) VALUES (%s, %s)",
+                                (pais_sigla, pais_nome)
+                            )
+                            paises_cache[pais_sigla] = True
                     
                     # OLIMPÍADA
-                    ano = int(row[col_map['ano']])
-                    estacao = str(row[col_map['estacao']]).strip()
-                    sede = str(row[col_map['sede']]).strip()
-                    
                     if ano not in olimpiadas_cache:
-                        cursor.execute(
-                            "INSERT IGNORE INTO Olimpiada (ano, estacao, sede) VALUES (%s, %s, %s)",
-                            (ano, estacao, sede)
-                        )
+                        if ids_no_cliente:
+                            pendentes['Olimpiada'].append((ano, estacao, sede))
+                        else:
+                            cursor.execute(
+                                "INSERT IGNORE INTO Olimpiada (ano, estacao, sede) VALUES (%s, %s, %s)",
+                                (ano, estacao, sede)
+                            )
                         olimpiadas_cache.add(ano)
                     
                     # ATLETA
-                    atleta_nome = str(row[col_map['nome']]).strip()
-                    sexo = str(row[col_map['sexo']]).strip()[0].upper() if pd.notna(row[col_map['sexo']]) else None
-                    peso = None if pd.isna(row[col_map['peso']]) else float(row[col_map['peso']])
-                    
-                    # CORREÇÃO: Converter altura de cm para metros
-                    altura_raw = row[col_map['altura']]
-                    if pd.isna(altura_raw):
-                        altura = None
-                    else:
-                        altura_cm = float(altura_raw)
-                        # Se altura >= 3, está em cm, converte para metros
-                        if altura_cm >= 3:
-                            altura = round(altura_cm / 100, 2)
-                        else:
-                            altura = altura_cm  # Já está em metros
-                    
-                    idade = None if pd.isna(row[col_map['idade']]) else int(row[col_map['idade']])
-                    
                     chave_atleta = (atleta_nome, pais_sigla)
                     
-                    if chave_atleta not in atletas_cache:
+                    if chave_atleta not in atletas_cache and ids_no_cliente:
+                        atletas_cache[chave_atleta] = chaves.proximo_atleta
+                        pendentes['Atleta'].append(
+                            (chaves.proximo_atleta, atleta_nome, sexo, peso, altura, idade, pais_sigla)
+                        )
+                        chaves.proximo_atleta += 1
+                    elif chave_atleta not in atletas_cache:
                         cursor.execute(
                             """INSERT INTO Atleta (nome, sexo, peso, altura, idade, sigla_pais) 
                                VALUES (%s, %s, %s, %s, %s, %s)
@@ -226,12 +958,13 @@ class OlimpiadasCSVToMySQL:
                     id_atleta = atletas_cache[chave_atleta]
                     
                     # EVENTO
-                    esporte = str(row[col_map['esporte']]).strip()
-                    modalidade = str(row[col_map['modalidade']]).strip()
-                    
                     chave_evento = (esporte, modalidade, ano)
                     
-                    if chave_evento not in eventos_cache:
+                    if chave_evento not in eventos_cache and ids_no_cliente:
+                        eventos_cache[chave_evento] = chaves.proximo_evento
+                        pendentes['Evento'].append((chaves.proximo_evento, esporte, modalidade, ano))
+                        chaves.proximo_evento += 1
+                    elif chave_evento not in eventos_cache:
                         cursor.execute(
                             """INSERT IGNORE INTO Evento (esporte, modalidade, ano_olimpiada) 
                                VALUES (%s, %s, %s)""",
@@ -248,38 +981,40 @@ class OlimpiadasCSVToMySQL:
                     
                     id_evento = eventos_cache.get(chave_evento)
                     if not id_evento:
+                        erros += 1
+                        telemetria.rejeitar('evento_sem_id', idx + 1, f"evento {chave_evento} não encontrado")
                         continue
                     
                     # COMPETE
-                    medalha_raw = str(row[col_map['medalha']]).strip()
-                    
-                    medalha_map = {
-                        'Gold': 'Ouro', 'Ouro': 'Ouro',
-                        'Silver': 'Prata', 'Prata': 'Prata',
-                        'Bronze': 'Bronze',
-                        'NA': 'Sem Medalha', 'nan': 'Sem Medalha', 'None': 'Sem Medalha'
-                    }
-                    medalha = medalha_map.get(medalha_raw, 'Sem Medalha')
-                    
-                    cursor.execute(
-                        """INSERT IGNORE INTO Compete (id_atleta, id_evento, medalha) 
-                           VALUES (%s, %s, %s)""",
-                        (id_atleta, id_evento, medalha)
-                    )
-                    
-                    if (idx + 1) % batch_size == 0:
-                        self.connection.commit()
-                        progresso = ((idx + 1) / total) * 100
-                        print(f"   Progresso: {idx + 1}/{total} ({progresso:.1f}%) - Erros: {erros}")
+                    if ids_no_cliente:
+                        pendentes['Compete'].append((id_atleta, id_evento, medalha))
+                    else:
+                        cursor.execute(
+                            """INSERT IGNORE INTO Compete (id_atleta, id_evento, medalha) 
+                               VALUES (%s, %s, %s)""",
+                            (id_atleta, id_evento, medalha)
+                        )
+                    importadas_lote += 1
                 
                 except Exception as e:
                     erros += 1
+                    motivo = self._motivo_rejeicao(e)
+                    telemetria.rejeitar(motivo, idx + 1, str(e))
                     if erros <= 5:
                         print(f"   ⚠ Erro na linha {idx + 1}: {str(e)[:100]}")
             
-            self.connection.commit()
+            if ids_no_cliente:
+                self._gravar_pendentes(cursor, pendentes, limite_pacote)
+            telemetria.commit(self.connection)
+            if linhas_lote:
+                telemetria.registrar_lote(linhas_lote, importadas_lote)
             cursor.close()
             
+            # O que sobra do laço, tirando o tempo no servidor, é a montagem dos registros
+            tempo_servidor = sum(medidas['segundos'] for medidas in telemetria.tabelas.values())
+            tempo_servidor += telemetria.etapas.get('commit', 0.0)
+            telemetria.etapas['montagem'] = max(0.0, time.perf_counter() - inicio_loop - tempo_servidor)
+            
             print(f"\n{'='*60}")
             print(f"✓ IMPORTAÇÃO CONCLUÍDA!")
             print(f"{'='*60}")
@@ -288,72 +1023,1553 @@ class OlimpiadasCSVToMySQL:
             print(f"✓ Atletas únicos: {len(atletas_cache)}")
             print(f"✓ Eventos únicos: {len(eventos_cache)}")
             print(f"✓ Olimpíadas: {len(olimpiadas_cache)}")
+            print(f"⚠ Rejeitados na validação: {len(rejeitados)}")
             print(f"⚠ Erros encontrados: {erros}")
+            for motivo, quantidade in telemetria.rejeicoes.most_common():
+                print(f"   {motivo}: {quantidade}")
+            print(f"⏱  {telemetria.linhas_por_segundo():.0f} linhas/s, {telemetria.idas_servidor} idas ao servidor")
+            for etapa, segundos in telemetria.etapas.items():
+                print(f"   {etapa}: {segundos:.2f}s")
+            for tabela, medidas in telemetria.tabelas.items():
+                print(f"   {tabela}: {medidas['segundos']:.2f}s em {medidas['comandos']} comandos")
             print(f"{'='*60}\n")
             
+            if relatorio:
+                telemetria.gravar_json(relatorio)
+                print(f"💾 Relatório da importação gravado em {relatorio}")
+            
         except Error as e:
             print(f"✗ Erro ao processar CSV: {e}")
             self.connection.rollback()
     
-    def _mapear_colunas(self, colunas):
-        """Mapeia as colunas do CSV"""
-        mapeamento = {
-            'nome': 'nome',
-            'pais': 'equipe',
-            'sigla': 'sigla',
-            'ano': 'ano',
-            'estacao': 'temporada',
-            'sede': 'cidade',
-            'esporte': 'esporte',
-            'modalidade': 'evento',
-            'medalha': 'medalha',
-            'peso': 'peso',
-            'altura': 'altura',
-            'idade': 'idade',
-            'sexo': 'sexo'
-        }
-        
-        print("🔍 Mapeamento de colunas:")
-        for chave, valor in mapeamento.items():
-            print(f"   {chave}: '{valor}'")
-        print()
-        
-        return mapeamento
-    
-    def desconectar(self):
-        """Fecha a conexão com o banco de dados"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("✓ Conexão MySQL fechada")
-
-
-if __name__ == "__main__":
-    # Configurações do banco de dados
-    DB_CONFIG = {
-        'host': os.getenv('DB_HOST', 'localhost'),
-        'database': os.getenv('DB_NAME', 'olimpiadas_db'),
-        'user': os.getenv('DB_USER', 'root'),
-        'password': os.getenv('DB_PASSWORD', '')
-    }
-    
-    # Caminho do CSV
-    CSV_FILE = 'olimpiadasfiltrado.csv'
-    
-    print("=" * 60)
-    print("IMPORTAÇÃO DE DADOS - SISTEMA OLIMPÍADAS")
-    print("=" * 60)
-    
-    db = OlimpiadasCSVToMySQL(**DB_CONFIG)
+    def _motivo_rejeicao(self, erro):
+        """Agrupa as exceções de uma linha em motivos estáveis para o relatório"""
+        if isinstance(erro, Error):
+            return f"mysql_{erro.errno}"
+        if isinstance(erro, (ValueError, TypeError)):
+            return 'valor_invalido'
+        if isinstance(erro, (KeyError, IndexError)):
+            return 'campo_ausente'
+        return type(erro).__name__
     
-    if db.conectar():
-        print("\n[1/3] Recriando banco de dados...")
-        db.drop_database()
-        db.criar_database()
-        
-        print("\n[2/3] Criando estrutura do banco de dados...")
-        db.criar_schema()
-        
-        print("\n[3/3] Processando arquivo CSV único...")
-        db.processar_csv_unico(CSV_FILE, batch_size=500, ano_inicial=1896, ano_final=2016)
+    def processar_csv_vetorizado(self, csv_path, ano_inicial=1896, ano_final=2016):
+        """
+        Importa o CSV em modo vetorizado: monta as tabelas com operações de
+        conjunto do pandas, atribui as chaves em memória e grava cada tabela
+        com INSERTs de múltiplas linhas (executemany) limitados ao max_allowed_packet
+        """
+        try:
+            dados = self._carregar_dados(csv_path, ano_inicial, ano_final)
+            if dados is None:
+                return
+            
+            cursor = self.connection.cursor()
+            chaves = self._carregar_chaves(cursor)
+            tabelas, erros = self._montar_tabelas(dados, chaves)
+            
+            limite_pacote = self._limite_pacote(cursor)
+            statements = self._gravar_tabelas(cursor, tabelas, limite_pacote)
+            cursor.close()
+            
+            print(f"\n{'='*60}")
+            print(f"✓ IMPORTAÇÃO CONCLUÍDA!")
+            print(f"{'='*60}")
+            print(f"📊 Total de registros processados: {len(dados)}")
+            print(f"✓ Países únicos: {len(chaves.paises)}")
+            print(f"✓ Atletas únicos: {len(chaves.atletas)}")
+            print(f"✓ Eventos únicos: {len(chaves.eventos)}")
+            print(f"✓ Olimpíadas: {len(chaves.olimpiadas)}")
+            print(f"✓ Comandos INSERT enviados: {statements}")
+            print(f"⚠ Erros encontrados: {erros}")
+            print(f"{'='*60}\n")
+            
+        except Error as e:
+            print(f"✗ Erro ao processar CSV: {e}")
+            self.connection.rollback()
+    
+    def processar_csv_streaming(self, csv_path, chunksize=100_000, ano_inicial=1896, ano_final=2016, retomar=False):
+        """
+        Importa o CSV em blocos de `chunksize` linhas, lendo só as colunas usadas
+        e com dtypes compactos. Cada bloco é filtrado e gravado antes de ler o
+        próximo, então o pico de memória não depende do tamanho do arquivo.
+        Cada bloco é confirmado junto com um checkpoint em ImportacaoCheckpoint;
+        com `retomar`, a leitura continua da última linha confirmada
+        """
+        try:
+            cursor = self.connection.cursor()
+            self._criar_tabela_checkpoint(cursor)
+            arquivo, assinatura = os.path.abspath(csv_path), self._assinatura_arquivo(csv_path)
+            
+            pular = 0
+            if retomar:
+                pular = self._ler_checkpoint(cursor, arquivo, assinatura)
+                if pular is None:
+                    cursor.close()
+                    return
+                print(f"↩️  Retomando após {pular} linhas já confirmadas")
+            else:
+                cursor.execute("DELETE FROM ImportacaoCheckpoint WHERE arquivo = %s", (arquivo,))
+                self.connection.commit()
+            
+            # Após uma falha, o que já foi confirmado está no banco: os mapas saem de lá
+            chaves = self._carregar_chaves(cursor, incluir_atletas=retomar)
+            limite_pacote = self._limite_pacote(cursor)
+            
+            total = 0
+            erros = 0
+            statements = 0
+            
+            print("🔄 Processando blocos...\n")
+            
+            for dados, linhas_lidas in self._ler_csv_em_blocos(csv_path, chunksize, ano_inicial, ano_final, pular):
+                tabelas, erros_bloco = self._montar_tabelas(dados, chaves)
+                statements += self._gravar_tabelas(cursor, tabelas, limite_pacote, detalhar=False, confirmar=False)
+                cursor.execute(
+                    """REPLACE INTO ImportacaoCheckpoint (arquivo, assinatura, linhas_lidas)
+                       VALUES (%s, %s, %s)""",
+                    (arquivo, assinatura, pular + linhas_lidas)
+                )
+                self.connection.commit()
+                total += len(dados)
+                erros += erros_bloco
+                print(f"   Progresso: {total} registros - Erros: {erros}")
+            
+            cursor.execute("DELETE FROM ImportacaoCheckpoint WHERE arquivo = %s", (arquivo,))
+            self.connection.commit()
+            cursor.close()
+            
+            print(f"\n{'='*60}")
+            print(f"✓ IMPORTAÇÃO CONCLUÍDA!")
+            print(f"{'='*60}")
+            print(f"📊 Total de registros processados: {total}")
+            print(f"✓ Países únicos: {len(chaves.paises)}")
+            print(f"✓ Atletas únicos: {len(chaves.atletas)}")
+            print(f"✓ Eventos únicos: {len(chaves.eventos)}")
+            print(f"✓ Olimpíadas: {len(chaves.olimpiadas)}")
+            print(f"✓ Comandos INSERT enviados: {statements}")
+            print(f"⚠ Erros encontrados: {erros}")
+            print(f"{'='*60}\n")
+            
+        except Error as e:
+            print(f"✗ Erro ao processar CSV: {e}")
+            self.connection.rollback()
+    
+    def processar_csv_pipeline(self, csv_path, chunksize=100_000, ano_inicial=1896, ano_final=2016, fila_max=2):
+        """
+        Importa em blocos como o modo streaming, mas sobrepondo leitura e gravação:
+        esta thread lê, valida e monta as tabelas do próximo bloco (as chaves são
+        atribuídas só aqui) enquanto uma thread escritora, com conexão própria,
+        grava e confirma o bloco anterior. A fila tem no máximo `fila_max` blocos,
+        então a leitura espera quando o MySQL fica para trás. Não há checkpoint:
+        os blocos já confirmados ficam no banco e uma falha pede uma recarga completa
+        """
+        try:
+            cursor = self.connection.cursor()
+            chaves = self._carregar_chaves(cursor)
+            cursor.close()
+            
+            config = {'host': self.host, 'database': self.database, 'user': self.user, 'password': self.password}
+            fila = queue.Queue(maxsize=fila_max)
+            resultado = {'statements': 0, 'espera': 0.0, 'erro': None}
+            escritor = threading.Thread(target=self._escritor_pipeline, args=(config, fila, resultado), daemon=True)
+            escritor.start()
+            
+            total = 0
+            erros = 0
+            espera_leitor = 0.0
+            
+            print("🔄 Processando blocos (leitura e gravação em paralelo)...\n")
+            
+            try:
+                for dados, linhas_lidas in self._ler_csv_em_blocos(csv_path, chunksize, ano_inicial, ano_final):
+                    tabelas, erros_bloco = self._montar_tabelas(dados, chaves)
+                    inicio = time.perf_counter()
+                    # put com timeout para não travar se o escritor morrer com a fila cheia
+                    while resultado['erro'] is None and escritor.is_alive():
+                        try:
+                            fila.put(tabelas, timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+                    espera_leitor += time.perf_counter() - inicio
+                    if resultado['erro'] is not None or not escritor.is_alive():
+                        break
+                    total += len(dados)
+                    erros += erros_bloco
+                    print(f"   Lidos: {total} registros - Erros: {erros}")
+            finally:
+                # Fim da fila também quando a leitura falha, para o escritor não ficar esperando
+                while escritor.is_alive():
+                    try:
+                        fila.put(None, timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+                escritor.join()
+            
+            erro = resultado['erro']
+            if erro is not None and not isinstance(erro, Error):
+                # Ex.: erro do pandas na thread escritora; vira Error para ser relatado abaixo
+                raise Error(msg=f"{type(erro).__name__} na gravação: {erro}") from erro
+            if erro is not None:
+                raise erro
+            
+            print(f"\n{'='*60}")
+            print(f"✓ IMPORTAÇÃO CONCLUÍDA!")
+            print(f"{'='*60}")
+            print(f"📊 Total de registros processados: {total}")
+            print(f"✓ Países únicos: {len(chaves.paises)}")
+            print(f"✓ Atletas únicos: {len(chaves.atletas)}")
+            print(f"✓ Eventos únicos: {len(chaves.eventos)}")
+            print(f"✓ Olimpíadas: {len(chaves.olimpiadas)}")
+            print(f"✓ Comandos INSERT enviados: {resultado['statements']}")
+            print(f"⏱  Leitor esperando o banco: {espera_leitor:.2f}s - escritor esperando dados: {resultado['espera']:.2f}s")
+            print(f"⚠ Erros encontrados: {erros}")
+            print(f"{'='*60}\n")
+            
+        except Error as e:
+            print(f"✗ Erro ao processar CSV: {e}")
+            self.connection.rollback()
+    
+    def _escritor_pipeline(self, config, fila, resultado):
+        """
+        Thread escritora do modo pipeline: grava e confirma cada bloco da fila
+        com uma conexão própria até receber None. Qualquer erro (do MySQL ou
+        não) fica em `resultado` para a thread leitora parar
+        """
+        db = OlimpiadasCSVToMySQL(**config)
+        try:
+            if not db.conectar():
+                raise Error(msg="não foi possível abrir a conexão de gravação")
+            db.connection.database = db.database
+            cursor = db.connection.cursor()
+            if self.carga_em_massa:
+                cursor.execute("SET SESSION foreign_key_checks = 0")
+                cursor.execute("SET SESSION unique_checks = 0")
+            limite_pacote = db._limite_pacote(cursor)
+            
+            while True:
+                inicio = time.perf_counter()
+                tabelas = fila.get()
+                resultado['espera'] += time.perf_counter() - inicio
+                if tabelas is None:
+                    break
+                resultado['statements'] += db._gravar_tabelas(cursor, tabelas, limite_pacote,
+                                                              detalhar=False, confirmar=False)
+                db.connection.commit()
+            cursor.close()
+        except Exception as e:
+            resultado['erro'] = e
+            if db.connection and db.connection.is_connected():
+                db.connection.rollback()
+        finally:
+            db.desconectar()
+    
+    def _criar_tabela_checkpoint(self, cursor):
+        """Tabela lateral com a última linha do CSV confirmada no banco"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ImportacaoCheckpoint (
+                arquivo VARCHAR(255) PRIMARY KEY,
+                assinatura VARCHAR(64) NOT NULL,
+                linhas_lidas BIGINT NOT NULL,
+                atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+    
+    def _assinatura_arquivo(self, csv_path):
+        """Tamanho e data de modificação, para não retomar sobre um arquivo alterado"""
+        info = os.stat(csv_path)
+        return f"{info.st_size}:{info.st_mtime_ns}"
+    
+    def _ler_checkpoint(self, cursor, arquivo, assinatura):
+        """Devolve quantas linhas do CSV já foram confirmadas (None se não der para retomar)"""
+        cursor.execute(
+            "SELECT assinatura, linhas_lidas FROM ImportacaoCheckpoint WHERE arquivo = %s",
+            (arquivo,)
+        )
+        checkpoint = cursor.fetchone()
+        if checkpoint is None:
+            print("⚠ Nenhum checkpoint encontrado, importando desde o início")
+            return 0
+        if checkpoint[0] != assinatura:
+            print("❌ ERRO: O CSV mudou desde o checkpoint, rode a importação completa novamente")
+            return None
+        return int(checkpoint[1])
+    
+    def _ler_csv_em_blocos(self, csv_path, chunksize, ano_inicial, ano_final, pular=0):
+        """
+        Gera pares (bloco, linhas_lidas): blocos já filtrados por ano e normalizados,
+        lendo apenas as 13 colunas de COLUNAS_NECESSARIAS com os tipos de DTYPES_CSV,
+        e o total de linhas do arquivo consumidas até ali. As `pular` primeiras
+        linhas de dados são descartadas pelo leitor, sem conversão de tipos
+        """
+        print(f"\n📂 Lendo CSV em blocos de {chunksize} linhas: {csv_path}")
+        cabecalho = pd.read_csv(csv_path, nrows=0).columns
+        originais = {col.strip().lower(): col for col in cabecalho}
+        
+        colunas_faltando = [col for col in COLUNAS_NECESSARIAS if col not in originais]
+        if colunas_faltando:
+            print(f"❌ ERRO: Colunas faltando no CSV: {', '.join(colunas_faltando)}")
+            print(f"📋 Colunas disponíveis: {', '.join(originais)}")
+            return
+        
+        col_map = self._mapear_colunas(COLUNAS_NECESSARIAS)
+        leitor = pd.read_csv(
+            csv_path,
+            usecols=[originais[col] for col in COLUNAS_NECESSARIAS],
+            dtype={originais[col]: tipo for col, tipo in DTYPES_CSV.items()},
+            skiprows=range(1, pular + 1),
+            chunksize=chunksize,
+        )
+        
+        linhas_lidas = 0
+        anexar = pular > 0
+        with leitor:
+            for bloco in leitor:
+                linhas_lidas += len(bloco)
+                bloco.columns = bloco.columns.str.strip().str.lower()
+                bloco = bloco[(bloco['ano'] >= ano_inicial) & (bloco['ano'] <= ano_final)]
+                if len(bloco):
+                    dados, _ = self._separar_rejeitados(self._normalizar_dataframe(bloco, col_map), csv_path, anexar)
+                    anexar = True
+                    yield dados, linhas_lidas
+    
+    def processar_csv_paralelo(self, csv_path, processos=None, ano_inicial=1896, ano_final=2016):
+        """
+        Importa o CSV com vários processos. As chaves de todas as tabelas são
+        resolvidas aqui, uma única vez, e cada processo só grava linhas com ids
+        já definidos usando a própria conexão: primeiro os atletas, divididos em
+        faixas, depois Evento e Compete particionados por ano da Olimpíada.
+        Cada partição é confirmada sozinha: se uma falhar, as anteriores ficam no
+        banco, que precisa de uma recarga completa (com --sombra, o banco em uso
+        nem chega a ser tocado)
+        """
+        gravando = False
+        try:
+            processos = processos or os.cpu_count() or 1
+            
+            dados = self._carregar_dados(csv_path, ano_inicial, ano_final)
+            if dados is None:
+                return
+            
+            cursor = self.connection.cursor()
+            chaves = self._carregar_chaves(cursor)
+            tabelas, erros = self._montar_tabelas(dados, chaves)
+            
+            # Países e olimpíadas são poucos e precisam existir antes de tudo
+            limite_pacote = self._limite_pacote(cursor)
+            self._gravar_tabelas(cursor, {'Pais': tabelas['Pais'], 'Olimpiada': tabelas['Olimpiada']}, limite_pacote)
+            cursor.close()
+            
+            config = {'host': self.host, 'database': self.database, 'user': self.user, 'password': self.password}
+            
+            atleta = tabelas['Atleta']
+            tamanho_faixa = max(1, -(-len(atleta) // processos))
+            faixas = [{'Atleta': atleta.iloc[i:i + tamanho_faixa]} for i in range(0, len(atleta), tamanho_faixa)]
+            
+            ano_evento = {id_evento: chave[2] for chave, id_evento in chaves.eventos.items()}
+            compete = tabelas['Compete'].assign(ano=tabelas['Compete']['id_evento'].map(ano_evento))
+            anos = {}
+            for ano, parte in tabelas['Evento'].groupby('ano'):
+                anos.setdefault(ano, {})['Evento'] = parte
+            for ano, parte in compete.groupby('ano'):
+                anos.setdefault(ano, {})['Compete'] = parte.drop(columns='ano')
+            # Maiores partições primeiro para equilibrar os processos
+            particoes = sorted(anos.values(), key=lambda p: -sum(len(t) for t in p.values()))
+            
+            print(f"\n⚙️  Gravando com {processos} processos ({len(faixas)} faixas de atletas, {len(particoes)} anos)")
+            gravando = True
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                for etapa in [faixas, particoes]:
+                    for statements in executor.map(_gravar_particao, [config] * len(etapa), etapa,
+                                                   [self.carga_em_massa] * len(etapa)):
+                        if statements is None:
+                            raise Error("falha em um processo de gravação")
+            
+            print(f"\n{'='*60}")
+            print(f"✓ IMPORTAÇÃO CONCLUÍDA!")
+            print(f"{'='*60}")
+            print(f"📊 Total de registros processados: {len(dados)}")
+            print(f"✓ Países únicos: {len(chaves.paises)}")
+            print(f"✓ Atletas únicos: {len(chaves.atletas)}")
+            print(f"✓ Eventos únicos: {len(chaves.eventos)}")
+            print(f"✓ Olimpíadas: {len(chaves.olimpiadas)}")
+            print(f"⚠ Erros encontrados: {erros}")
+            print(f"{'='*60}\n")
+            
+        except Error as e:
+            print(f"✗ Erro ao processar CSV: {e}")
+            self.connection.rollback()
+            if gravando:
+                print("⚠ As partições gravadas antes da falha ficaram confirmadas e o banco está incompleto. "
+                      "Rode a importação completa de novo (com --sombra para não expor o banco pela metade)")
+    
+    def processar_csv_load_data(self, csv_path, ano_inicial=1896, ano_final=2016):
+        """
+        Importa o CSV limpo com LOAD DATA LOCAL INFILE para uma tabela de staging
+        e preenche Pais, Olimpiada, Atleta, Evento e Compete com INSERT ... SELECT
+        no próprio servidor. Se o local_infile estiver desativado, usa o modo vetorizado
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT @@local_infile")
+        if not int(cursor.fetchone()[0]):
+            cursor.close()
+            print("⚠ local_infile desativado no servidor, usando o modo vetorizado")
+            self.processar_csv_vetorizado(csv_path, ano_inicial, ano_final)
+            return
+        
+        dados = self._carregar_dados(csv_path, ano_inicial, ano_final)
+        if dados is None:
+            cursor.close()
+            return
+        
+        arquivo = tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8', delete=False)
+        try:
+            with arquivo:
+                arquivo.write(self._formatar_tsv(dados))
+            
+            print("📥 Carregando staging com LOAD DATA LOCAL INFILE...")
+            cursor.execute("DROP TABLE IF EXISTS StagingImportacao")
+            cursor.execute("""
+                CREATE TABLE StagingImportacao (
+                    linha INT PRIMARY KEY,
+                    pais_nome VARCHAR(100),
+                    sigla VARCHAR(3),
+                    ano INT,
+                    estacao VARCHAR(20),
+                    sede VARCHAR(100),
+                    nome VARCHAR(150),
+                    sexo CHAR(1),
+                    peso DECIMAL(5,2),
+                    altura DECIMAL(3,2),
+                    idade INT,
+                    esporte VARCHAR(100),
+                    modalidade VARCHAR(100),
+                    medalha VARCHAR(20),
+                    KEY (nome, sigla),
+                    KEY (esporte, modalidade, ano)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+            try:
+                cursor.execute(
+                    """LOAD DATA LOCAL INFILE %s INTO TABLE StagingImportacao
+                       CHARACTER SET utf8mb4
+                       FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                       LINES TERMINATED BY '\\n'""",
+                    (arquivo.name,)
+                )
+            except Error as e:
+                print(f"⚠ LOAD DATA recusado ({e}), usando o modo vetorizado")
+                self.processar_csv_vetorizado(csv_path, ano_inicial, ano_final)
+                return
+            print(f"✓ Staging carregada: {cursor.rowcount} registros")
+            
+            self._normalizar_staging(cursor)
+            self.connection.commit()
+            
+            cursor.execute("SELECT COUNT(*) FROM StagingImportacao")
+            total = cursor.fetchone()[0]
+            contagens = {}
+            for tabela in ['Pais', 'Olimpiada', 'Atleta', 'Evento', 'Compete']:
+                cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
+                contagens[tabela] = cursor.fetchone()[0]
+            
+            print(f"\n{'='*60}")
+            print(f"✓ IMPORTAÇÃO CONCLUÍDA!")
+            print(f"{'='*60}")
+            print(f"📊 Total de registros processados: {total}")
+            print(f"✓ Países: {contagens['Pais']}")
+            print(f"✓ Atletas: {contagens['Atleta']}")
+            print(f"✓ Eventos: {contagens['Evento']}")
+            print(f"✓ Olimpíadas: {contagens['Olimpiada']}")
+            print(f"✓ Participações: {contagens['Compete']}")
+            print(f"{'='*60}\n")
+            
+        except Error as e:
+            print(f"✗ Erro ao processar CSV: {e}")
+            self.connection.rollback()
+        finally:
+            os.remove(arquivo.name)
+            for tabela in ['StagingImportacao', 'StagingAtleta', 'StagingEvento']:
+                cursor.execute(f"DROP TABLE IF EXISTS {tabela}")
+            cursor.close()
+    
+    def _formatar_tsv(self, dados):
+        """
+        Serializa o DataFrame normalizado no formato padrão do LOAD DATA
+        (tab, barra invertida como escape e \\N para NULL), coluna a coluna
+        """
+        colunas = [pd.Series(dados.index.astype(str), index=dados.index)]
+        for coluna in dados.columns:
+            serie = dados[coluna]
+            texto = serie.astype(str)
+            if serie.dtype == object:
+                texto = (texto.str.replace('\\', '\\\\', regex=False)
+                              .str.replace('\t', '\\t', regex=False)
+                              .str.replace('\n', '\\n', regex=False))
+            colunas.append(texto.where(serie.notna(), '\\N'))
+        
+        linhas = colunas[0].str.cat(colunas[1:], sep='\t')
+        return '\n'.join(linhas) + '\n'
+    
+    def _normalizar_staging(self, cursor):
+        """
+        Distribui a staging nas tabelas do modelo com INSERT ... SELECT.
+        As chaves seguem a ordem de primeira aparição, como no modo linha a linha
+        """
+        # PAÍS e OLIMPÍADA: a primeira linha de cada chave vence
+        cursor.execute("""
+            INSERT IGNORE INTO Pais (sigla, nome)
+            SELECT s.sigla, s.pais_nome
+            FROM StagingImportacao s
+            JOIN (
+                -- Entre as primeiras linhas de cada sigla, uma por nome (nome é UNIQUE)
+                SELECT MIN(s1.linha) AS linha
+                FROM StagingImportacao s1
+                JOIN (SELECT MIN(linha) AS linha FROM StagingImportacao GROUP BY sigla) p ON p.linha = s1.linha
+                GROUP BY s1.pais_nome
+            ) u ON u.linha = s.linha
+            ORDER BY s.linha
+        """)
+        print(f"   Pais: {cursor.rowcount} linhas")
+        
+        cursor.execute("""
+            INSERT IGNORE INTO Olimpiada (ano, estacao, sede)
+            SELECT s.ano, s.estacao, s.sede
+            FROM StagingImportacao s
+            JOIN (SELECT MIN(linha) AS linha FROM StagingImportacao GROUP BY ano) o ON o.linha = s.linha
+        """)
+        print(f"   Olimpiada: {cursor.rowcount} linhas")
+        
+        # ATLETA: ids explícitos a partir do maior id já existente
+        cursor.execute("SELECT COALESCE(MAX(id_atleta), 0) FROM Atleta")
+        base_atleta = int(cursor.fetchone()[0])
+        cursor.execute("DROP TABLE IF EXISTS StagingAtleta")
+        cursor.execute("""
+            CREATE TABLE StagingAtleta (PRIMARY KEY (nome, sigla))
+            SELECT %s + ROW_NUMBER() OVER (ORDER BY k.linha) AS id_atleta, k.nome, k.sigla, k.linha
+            FROM (
+                SELECT s.nome, s.sigla, MIN(s.linha) AS linha
+                FROM StagingImportacao s
+                JOIN Pais p ON p.sigla = s.sigla
+                GROUP BY s.nome, s.sigla
+            ) k
+        """, (base_atleta,))
+        cursor.execute("""
+            INSERT INTO Atleta (id_atleta, nome, sexo, peso, altura, idade, sigla_pais)
+            SELECT a.id_atleta, s.nome, s.sexo, s.peso, s.altura, s.idade, s.sigla
+            FROM StagingAtleta a
+            JOIN StagingImportacao s ON s.linha = a.linha
+        """)
+        print(f"   Atleta: {cursor.rowcount} linhas")
+        
+        # EVENTO: reaproveita ids existentes (unique_evento) e numera só os novos
+        cursor.execute("SELECT COALESCE(MAX(id_evento), 0) FROM Evento")
+        base_evento = int(cursor.fetchone()[0])
+        cursor.execute("DROP TABLE IF EXISTS StagingEvento")
+        cursor.execute("""
+            CREATE TABLE StagingEvento (PRIMARY KEY (esporte, modalidade, ano))
+            SELECT k.esporte, k.modalidade, k.ano, k.existente,
+                   COALESCE(k.existente, %s + SUM(k.existente IS NULL) OVER (ORDER BY k.linha)) AS id_evento
+            FROM (
+                SELECT s.esporte, s.modalidade, s.ano, MIN(s.linha) AS linha, MAX(e.id_evento) AS existente
+                FROM StagingImportacao s
+                LEFT JOIN Evento e
+                    ON e.esporte = s.esporte AND e.modalidade = s.modalidade AND e.ano_olimpiada = s.ano
+                GROUP BY s.esporte, s.modalidade, s.ano
+            ) k
+        """, (base_evento,))
+        cursor.execute("""
+            INSERT INTO Evento (id_evento, esporte, modalidade, ano_olimpiada)
+            SELECT id_evento, esporte, modalidade, ano
+            FROM StagingEvento
+            WHERE existente IS NULL
+        """)
+        print(f"   Evento: {cursor.rowcount} linhas")
+        
+        # COMPETE: INSERT IGNORE em ordem de linha mantém a primeira ocorrência
+        cursor.execute("""
+            INSERT IGNORE INTO Compete (id_atleta, id_evento, medalha)
+            SELECT a.id_atleta, e.id_evento, s.medalha
+            FROM StagingImportacao s
+            JOIN StagingAtleta a ON a.nome = s.nome AND a.sigla = s.sigla
+            JOIN StagingEvento e ON e.esporte = s.esporte AND e.modalidade = s.modalidade AND e.ano = s.ano
+            ORDER BY s.linha
+        """)
+        print(f"   Compete: {cursor.rowcount} linhas")
+    
+    def processar_csv_delta(self, csv_path, ano_inicial=1896, ano_final=2016):
+        """
+        Sincroniza o banco com o CSV sem recriá-lo: cada linha de cada tabela
+        recebe uma impressão digital (hash do conteúdo, indexada pela chave) e
+        só o que mudou é inserido, atualizado ou removido, em uma única transação.
+        O CSV é a fonte da verdade: registros que não estão nele são apagados
+        """
+        try:
+            dados = self._carregar_dados(csv_path, ano_inicial, ano_final)
+            if dados is None:
+                return
+            
+            cursor = self.connection.cursor()
+            atuais = self._ler_tabelas_atuais(cursor)
+            
+            # Atletas já gravados mantêm o id
+            chaves = self._carregar_chaves(cursor, incluir_atletas=True)
+            
+            desejadas, erros = self._montar_tabelas(dados, chaves, somente_novos=False)
+            
+            print("🔍 Comparando impressões digitais com o banco...\n")
+            diferencas = {
+                tabela: self._diferenca(desejadas[tabela], atuais[tabela], chave)
+                for tabela, chave in CHAVES_TABELAS.items()
+            }
+            
+            limite_pacote = self._limite_pacote(cursor)
+            self._liberar_nomes_paises(cursor, diferencas['Pais'][0], atuais['Pais'])
+            
+            # Inclusões e alterações dos pais para os filhos, remoções no sentido inverso
+            for tabela in CHAVES_TABELAS:
+                gravar, _ = diferencas[tabela]
+                self._inserir_em_lotes(cursor, COMANDOS_UPSERT[tabela], self._linhas(gravar), limite_pacote)
+            for tabela in reversed(list(CHAVES_TABELAS)):
+                _, remover = diferencas[tabela]
+                self._remover_em_lotes(cursor, tabela, CHAVES_TABELAS[tabela], self._linhas(remover))
+            
+            self.connection.commit()
+            cursor.close()
+            
+            print(f"{'='*60}")
+            print(f"✓ IMPORTAÇÃO INCREMENTAL CONCLUÍDA!")
+            print(f"{'='*60}")
+            for tabela, (gravar, remover) in diferencas.items():
+                print(f"   {tabela}: {len(gravar)} inseridos/atualizados, {len(remover)} removidos")
+            print(f"⚠ Erros encontrados: {erros}")
+            print(f"{'='*60}\n")
+            
+        except Error as e:
+            print(f"✗ Erro na importação incremental: {e}")
+            self.connection.rollback()
+    
+    def _liberar_nomes_paises(self, cursor, gravar, atuais):
+        """
+        Pais.nome é UNIQUE: se um nome passa para outra sigla (sigla nova com o
+        nome de uma antiga, ou troca de nomes entre siglas), o upsert cairia na
+        linha antiga e a sigla nova nunca seria criada. Antes dos upserts, os
+        países que cedem o nome ficam com um provisório ('~' + sigla); até o
+        commit eles recebem o nome novo ou são removidos
+        """
+        dono = dict(zip(atuais['nome'], atuais['sigla']))
+        ceder = sorted({dono[nome] for sigla, nome in zip(gravar['sigla'], gravar['nome'])
+                        if nome in dono and dono[nome] != sigla})
+        if ceder:
+            print(f"↩ Países que cedem o nome para outra sigla: {', '.join(ceder)}")
+            cursor.executemany("UPDATE Pais SET nome = %s WHERE sigla = %s", [(f"~{sigla}", sigla) for sigla in ceder])
+        return ceder
+    
+    def _ler_tabelas_atuais(self, cursor):
+        """Lê as cinco tabelas com os mesmos nomes de coluna de _montar_tabelas"""
+        consultas = {
+            'Pais': ("SELECT sigla, nome FROM Pais", ['sigla', 'nome']),
+            'Olimpiada': ("SELECT ano, estacao, sede FROM Olimpiada", ['ano', 'estacao', 'sede']),
+            'Atleta': ("SELECT id_atleta, nome, sexo, peso, altura, idade, sigla_pais FROM Atleta",
+                       ['id_atleta', 'nome', 'sexo', 'peso', 'altura', 'idade', 'sigla']),
+            'Evento': ("SELECT id_evento, esporte, modalidade, ano_olimpiada FROM Evento",
+                       ['id_evento', 'esporte', 'modalidade', 'ano']),
+            'Compete': ("SELECT id_atleta, id_evento, medalha FROM Compete",
+                        ['id_atleta', 'id_evento', 'medalha']),
+        }
+        
+        tabelas = {}
+        for tabela, (sql, colunas) in consultas.items():
+            cursor.execute(sql)
+            tabelas[tabela] = pd.DataFrame(cursor.fetchall(), columns=colunas)
+        return tabelas
+    
+    def _impressao_digital(self, df):
+        """
+        Hash de 64 bits do conteúdo de cada linha. Os tipos são uniformizados
+        antes (DECIMAL → float, inteiros anuláveis) para que CSV e banco batam
+        """
+        canonico = df.copy()
+        for coluna in ['peso', 'altura']:
+            if coluna in canonico:
+                canonico[coluna] = canonico[coluna].astype(float).round(2)
+        for coluna in ['idade', 'ano', 'id_atleta', 'id_evento']:
+            if coluna in canonico:
+                canonico[coluna] = canonico[coluna].astype('Int64')
+        canonico = canonico.astype(object).where(canonico.notna(), None)
+        return pd.util.hash_pandas_object(canonico.astype(str), index=False).to_numpy()
+    
+    def _diferenca(self, desejado, atual, chave):
+        """
+        Compara as impressões digitais pela chave e devolve (gravar, remover):
+        linhas novas ou alteradas e chaves que não existem mais no CSV
+        """
+        colunas = list(desejado.columns)
+        desejado = desejado.assign(_hash=self._impressao_digital(desejado))
+        atual = atual[colunas].assign(_hash=self._impressao_digital(atual[colunas]))
+        
+        # Uniformiza os tipos da chave para o merge
+        for coluna in chave:
+            if coluna in ['ano', 'id_atleta', 'id_evento']:
+                desejado[coluna] = desejado[coluna].astype('int64')
+                atual[coluna] = atual[coluna].astype('int64')
+        
+        cruzado = desejado.merge(atual[chave + ['_hash']], on=chave, how='outer',
+                                 suffixes=('', '_atual'), indicator=True)
+        
+        gravar = cruzado[(cruzado['_merge'] == 'left_only') |
+                         ((cruzado['_merge'] == 'both') & (cruzado['_hash'] != cruzado['_hash_atual']))]
+        remover = cruzado[cruzado['_merge'] == 'right_only']
+        return gravar[colunas], remover[chave]
+    
+    def _remover_em_lotes(self, cursor, tabela, chave, linhas, tamanho_lote=1000):
+        """Apaga linhas pela chave com DELETE ... WHERE (chave) IN (...) em lotes"""
+        colunas = ', '.join(chave)
+        tupla = '(' + ', '.join(['%s'] * len(chave)) + ')'
+        
+        for inicio in range(0, len(linhas), tamanho_lote):
+            lote = linhas[inicio:inicio + tamanho_lote]
+            cursor.execute(
+                f"DELETE FROM {tabela} WHERE ({colunas}) IN ({', '.join([tupla] * len(lote))})",
+                [valor for linha in lote for valor in linha]
+            )
+    
+    def processar_csv_anos(self, csv_path, anos, tamanho_lote=5000):
+        """
+        Recarrega só as edições de `anos` no banco existente: apaga Compete e
+        Evento desses anos em lotes de `tamanho_lote` (um commit por lote),
+        reimporta as linhas do CSV desses anos e remove os atletas e países
+        que ficaram sem participações. O resto do banco não é tocado; atletas
+        que já existiam recebem os dados do CSV (peso, altura etc. corrigidos).
+        A recarga não é atômica: do primeiro lote apagado até o commit final,
+        que grava todas as linhas novas de uma vez, quem lê o banco vê essas
+        edições vazias ou pela metade. Como os lotes apagados já estão
+        confirmados, as edições ficam em RecargaPendente até a reimportação
+        terminar; a próxima recarga (mesmo sem anos) as refaz. Devolve as
+        edições tocadas, para os resumos
+        """
+        anos = set(int(ano) for ano in anos)
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS RecargaPendente (
+                    ano INT PRIMARY KEY
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+            cursor.execute("SELECT ano FROM RecargaPendente")
+            pendentes = {ano for (ano,) in cursor.fetchall()} - anos
+        except Error as e:
+            print(f"✗ Erro ao ler as recargas pendentes: {e}")
+            cursor.close()
+            return []
+        if pendentes:
+            print(f"↩️  A recarga das edições {', '.join(map(str, sorted(pendentes)))} não terminou; "
+                  "elas serão recarregadas também")
+        anos = sorted(anos | pendentes)
+        if not anos:
+            print("✓ Nenhuma edição para recarregar")
+            cursor.close()
+            return []
+        
+        marcadores = ', '.join(['%s'] * len(anos))
+        lista_anos = ', '.join(map(str, anos))
+        apagando = False
+        try:
+            dados = self._carregar_dados(csv_path, anos[0], anos[-1])
+            if dados is None:
+                cursor.close()
+                return []
+            dados = dados[dados['ano'].isin(anos)].reset_index(drop=True)
+            print(f"✓ Registros das edições {lista_anos}: {len(dados)}")
+            
+            cursor.executemany("INSERT IGNORE INTO RecargaPendente (ano) VALUES (%s)", [(ano,) for ano in anos])
+            self.connection.commit()
+            apagando = True
+            
+            # Atletas e países afetados, para limpar os órfãos no fim
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS RecargaAtletas")
+            cursor.execute(f"""
+                CREATE TEMPORARY TABLE RecargaAtletas (id_atleta INT PRIMARY KEY, sigla_pais VARCHAR(3))
+                SELECT DISTINCT A.id_atleta, A.sigla_pais
+                FROM Compete C
+                JOIN Evento E ON E.id_evento = C.id_evento
+                JOIN Atleta A ON A.id_atleta = C.id_atleta
+                WHERE E.ano_olimpiada IN ({marcadores})
+            """, anos)
+            
+            print("🗑️  Apagando participações e eventos das edições...")
+            removidos = {
+                'Compete': self._apagar_em_lotes(
+                    cursor,
+                    f"""DELETE FROM Compete WHERE id_evento IN
+                        (SELECT id_evento FROM Evento WHERE ano_olimpiada IN ({marcadores}))""",
+                    anos, tamanho_lote),
+                'Evento': self._apagar_em_lotes(
+                    cursor, f"DELETE FROM Evento WHERE ano_olimpiada IN ({marcadores})", anos, tamanho_lote),
+            }
+            
+            # Atletas de outras edições mantêm o id e também passam pelo upsert
+            chaves = self._carregar_chaves(cursor, incluir_atletas=True)
+            tabelas, erros = self._montar_tabelas(dados, chaves, atualizar_atletas=True)
+            # Sede ou estação corrigidas também valem para a edição
+            olimpiada = dados.drop_duplicates('ano')[['ano', 'estacao', 'sede']]
+            
+            limite_pacote = self._limite_pacote(cursor)
+            self._inserir_em_lotes(cursor, COMANDOS_UPSERT['Olimpiada'], self._linhas(olimpiada), limite_pacote)
+            # Tudo confirmado junto com a limpeza, no commit final
+            self._gravar_tabelas(cursor, tabelas, limite_pacote, confirmar=False,
+                                 comandos={'Atleta': COMANDOS_UPSERT['Atleta']})
+            
+            print("🧹 Removendo atletas e países sem participações...")
+            cursor.execute("""
+                SELECT R.id_atleta FROM RecargaAtletas R
+                WHERE NOT EXISTS (SELECT 1 FROM Compete C WHERE C.id_atleta = R.id_atleta)
+            """)
+            orfaos = cursor.fetchall()
+            self._remover_em_lotes(cursor, 'Atleta', ['id_atleta'], orfaos, tamanho_lote)
+            removidos['Atleta'] = len(orfaos)
+            
+            cursor.execute("SELECT DISTINCT sigla_pais FROM RecargaAtletas")
+            siglas = [sigla for (sigla,) in cursor.fetchall()]
+            orfaos = []
+            if siglas:
+                cursor.execute(f"""
+                    SELECT P.sigla FROM Pais P
+                    WHERE P.sigla IN ({', '.join(['%s'] * len(siglas))})
+                      AND NOT EXISTS (SELECT 1 FROM Atleta A WHERE A.sigla_pais = P.sigla)
+                """, siglas)
+                orfaos = cursor.fetchall()
+            self._remover_em_lotes(cursor, 'Pais', ['sigla'], orfaos, tamanho_lote)
+            removidos['Pais'] = len(orfaos)
+            
+            cursor.execute("DROP TEMPORARY TABLE RecargaAtletas")
+            cursor.execute(f"DELETE FROM RecargaPendente WHERE ano IN ({marcadores})", anos)
+            self.connection.commit()
+            cursor.close()
+            
+            print(f"\n{'='*60}")
+            print(f"✓ RECARGA DAS EDIÇÕES {lista_anos} CONCLUÍDA!")
+            print(f"{'='*60}")
+            for tabela, quantidade in removidos.items():
+                print(f"   {tabela}: {quantidade} removidos")
+            print(f"   Atleta: {len(tabelas['Atleta'])} inseridos/atualizados")
+            for tabela in ['Evento', 'Compete']:
+                print(f"   {tabela}: {len(tabelas[tabela])} inseridos")
+            print(f"⚠ Erros encontrados: {erros}")
+            print(f"{'='*60}\n")
+            return anos
+            
+        except Error as e:
+            print(f"✗ Erro na recarga das edições: {e}")
+            self.connection.rollback()
+            if not apagando:
+                return []
+            print(f"⚠ As edições {lista_anos} podem ter ficado vazias ou incompletas (os lotes apagados já "
+                  f"foram confirmados). Rode novamente: python popdados.py --anos {' '.join(map(str, anos))} "
+                  "(ou só --anos, que refaz as recargas pendentes)")
+            return anos
+    
+    def _apagar_em_lotes(self, cursor, sql, parametros, tamanho_lote):
+        """
+        Executa um DELETE com LIMIT repetidamente, com um commit por lote, até
+        não sobrar nada, para não segurar locks de muitas linhas de uma vez
+        """
+        total = 0
+        while True:
+            cursor.execute(f"{sql} LIMIT %s", list(parametros) + [tamanho_lote])
+            self.connection.commit()
+            total += cursor.rowcount
+            if cursor.rowcount < tamanho_lote:
+                return total
+    
+    def _carregar_dados(self, csv_path, ano_inicial, ano_final):
+        """
+        Devolve os registros já filtrados e normalizados. Se houver um cache
+        Parquet válido para o CSV (mesmo tamanho e mtime, ou mesmo SHA-256),
+        lê dele com memory-map; senão faz o parse do CSV e grava o cache
+        """
+        cache = self._caminho_cache(csv_path, ano_inicial, ano_final)
+        origem = self._origem_cache(csv_path)
+        
+        dados = self._ler_cache(cache, origem, csv_path) if self.cache_dados else None
+        
+        if dados is None:
+            df = self._carregar_csv(csv_path, ano_inicial, ano_final)
+            if df is None:
+                return None
+            
+            col_map = self._mapear_colunas(df.columns)
+            
+            print("🔄 Normalizando registros...\n")
+            dados = self._normalizar_dataframe(df, col_map)
+            
+            if self.cache_dados:
+                self._gravar_cache(cache, origem, csv_path, dados)
+        
+        dados, _ = self._separar_rejeitados(dados, csv_path)
+        return dados
+    
+    def _caminho_cache(self, csv_path, ano_inicial, ano_final):
+        """Arquivo de cache ao lado do CSV, um por intervalo de anos"""
+        pasta = os.path.join(os.path.dirname(os.path.abspath(csv_path)), '.cache_importacao')
+        nome = os.path.splitext(os.path.basename(csv_path))[0]
+        return os.path.join(pasta, f"{nome}_{ano_inicial}_{ano_final}.parquet")
+    
+    def _origem_cache(self, csv_path):
+        """Identificação do CSV de origem guardada nos metadados do cache"""
+        info = os.stat(csv_path)
+        return {
+            'versao': str(VERSAO_NORMALIZACAO),
+            'tamanho': str(info.st_size),
+            'mtime': str(info.st_mtime_ns),
+        }
+    
+    def _sha256(self, caminho):
+        """SHA-256 do arquivo, lido em blocos de 1 MB"""
+        resumo = hashlib.sha256()
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+                resumo.update(bloco)
+        return resumo.hexdigest()
+    
+    def _ler_cache(self, cache, origem, csv_path):
+        """Lê o cache se ele corresponder ao CSV atual; senão devolve None"""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        
+        if not os.path.exists(cache):
+            return None
+        
+        metadados = {chave.decode(): valor.decode()
+                     for chave, valor in (pq.read_schema(cache).metadata or {}).items()}
+        if metadados.get('versao') != origem['versao'] or metadados.get('tamanho') != origem['tamanho']:
+            return None
+        # Só a data mudou (cópia, checkout): confere o conteúdo pelo hash
+        data_mudou = metadados.get('mtime') != origem['mtime']
+        if data_mudou and metadados.get('sha256') != self._sha256(csv_path):
+            return None
+        
+        print(f"\n⚡ Usando cache: {cache}")
+        # Sem memory-map quando o arquivo vai ser substituído logo abaixo
+        tabela = pq.read_table(cache, memory_map=not data_mudou)
+        if data_mudou:
+            # Mesmo conteúdo: guarda a data nova para as próximas execuções não refazerem o hash
+            self._escrever_cache(cache, tabela, dict(origem, sha256=metadados['sha256']))
+        dados = tabela.to_pandas()
+        print(f"✓ Cache carregado: {len(dados)} registros\n")
+        return dados
+    
+    def _gravar_cache(self, cache, origem, csv_path, dados):
+        """Grava o cache Parquet (zstd) de forma atômica, com a origem nos metadados"""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            print("⚠ pyarrow não instalado, cache Parquet desativado")
+            return
+        
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        tabela = pa.Table.from_pandas(dados, preserve_index=False)
+        self._escrever_cache(cache, tabela, dict(origem, sha256=self._sha256(csv_path)))
+        print(f"💾 Cache gravado: {cache}")
+    
+    def _escrever_cache(self, cache, tabela, origem):
+        """Escreve a tabela com a origem nos metadados (arquivo temporário + os.replace)"""
+        import pyarrow.parquet as pq
+        
+        metadados = dict(tabela.schema.metadata or {})
+        metadados.update({chave.encode(): valor.encode() for chave, valor in origem.items()})
+        
+        temporario = cache + '.tmp'
+        pq.write_table(tabela.replace_schema_metadata(metadados), temporario, compression='zstd')
+        os.replace(temporario, cache)
+    
+    def _carregar_csv(self, csv_path, ano_inicial, ano_final):
+        """Lê o CSV, aplica o filtro de anos e confere as colunas necessárias"""
+        print(f"\n📂 Carregando CSV: {csv_path}")
+        df = pd.read_csv(csv_path)
+        
+        df.columns = df.columns.str.strip().str.lower()
+        print(f"✓ CSV carregado: {len(df)} registros")
+        
+        df = df[(df['ano'] >= ano_inicial) & (df['ano'] <= ano_final)]
+        print(f"✓ Após filtro ({ano_inicial}-{ano_final}): {len(df)} registros")
+        print(f"📊 Colunas encontradas: {', '.join(df.columns)}\n")
+        
+        colunas_faltando = [col for col in COLUNAS_NECESSARIAS if col not in df.columns]
+        
+        if colunas_faltando:
+            print(f"❌ ERRO: Colunas faltando no CSV: {', '.join(colunas_faltando)}")
+            print(f"📋 Colunas disponíveis: {', '.join(df.columns)}")
+            return None
+        
+        return df
+    
+    def _normalizar_dataframe(self, df, col_map):
+        """
+        Limpa colunas inteiras de uma vez (strip, sigla em maiúsculas,
+        altura cm → m, medalhas). Textos ausentes continuam nulos para que
+        a validação os rejeite
+        """
+        def texto(chave):
+            coluna = df[col_map[chave]]
+            return coluna.astype(str).str.strip().where(coluna.notna())
+        
+        altura = df[col_map['altura']].astype(float)
+        
+        dados = pd.DataFrame({
+            'pais_nome': texto('pais'),
+            'sigla': texto('sigla').str.upper(),
+            'ano': df[col_map['ano']].astype(int),
+            'estacao': texto('estacao'),
+            'sede': texto('sede'),
+            'nome': texto('nome'),
+            'sexo': texto('sexo').str[0].str.upper(),
+            'peso': df[col_map['peso']].astype(float).round(2),
+            # Se altura >= 3, está em cm, converte para metros
+            'altura': altura.where(altura < 3, altura / 100).round(2),
+            'idade': np.trunc(df[col_map['idade']].astype(float)).astype('Int64'),
+            'esporte': texto('esporte'),
+            'modalidade': texto('modalidade'),
+            'medalha': df[col_map['medalha']].astype(str).str.strip().map(MEDALHAS).fillna('Sem Medalha'),
+        })
+        
+        return dados.reset_index(drop=True)
+    
+    def _validar_dataframe(self, dados):
+        """
+        Confere em colunas inteiras as restrições do schema (NOT NULL, tamanho
+        dos VARCHAR, CHECKs e faixa dos DECIMAL) e devolve, para cada registro,
+        os motivos de rejeição separados por ';' ('' quando é válido)
+        """
+        regras = []
+        for coluna, limite in LIMITES_TEXTO.items():
+            valores = dados[coluna]
+            regras.append((f'{coluna}_vazio', valores.isna() | (valores == '')))
+            regras.append((f'{coluna}_muito_longo', valores.str.len() > limite))
+        regras += [
+            ('estacao_invalida', dados['estacao'].notna() & ~dados['estacao'].isin(ESTACOES)),
+            ('sexo_invalido', dados['sexo'].notna() & ~dados['sexo'].isin(['M', 'F'])),
+            ('peso_nao_positivo', dados['peso'] <= 0),
+            ('peso_fora_da_faixa', dados['peso'] >= 1000),      # DECIMAL(5,2)
+            ('altura_nao_positiva', dados['altura'] <= 0),
+            ('altura_fora_da_faixa', dados['altura'] >= 10),    # DECIMAL(3,2)
+            ('idade_nao_positiva', dados['idade'] <= 0),
+        ]
+        
+        motivos = np.full(len(dados), '', dtype=object)
+        for motivo, falha in regras:
+            mascara = falha.fillna(False).to_numpy(dtype=bool)
+            if mascara.any():
+                motivos[mascara] = motivos[mascara] + ';' + motivo
+        
+        return pd.Series(motivos, index=dados.index).str.lstrip(';')
+    
+    def _separar_rejeitados(self, dados, csv_path, anexar=False):
+        """
+        Valida os registros e grava os inválidos, com o motivo, no CSV de
+        rejeitados. Devolve (válidos, rejeitados). Com `anexar`, acrescenta ao
+        arquivo em vez de recriá-lo (leitura em blocos)
+        """
+        caminho = self.arquivo_rejeitados or os.path.splitext(csv_path)[0] + '_rejeitados.csv'
+        if not anexar and os.path.exists(caminho):
+            os.remove(caminho)
+        
+        motivos = self._validar_dataframe(dados)
+        invalidos = (motivos != '').to_numpy()
+        rejeitados = dados[invalidos].assign(motivo=motivos[invalidos])
+        if not len(rejeitados):
+            return dados, rejeitados
+        
+        rejeitados.to_csv(caminho, mode='a', header=not os.path.exists(caminho), index=False)
+        print(f"⚠ {len(rejeitados)} registros rejeitados na validação → {caminho}")
+        return dados[~invalidos].reset_index(drop=True), rejeitados
+    
+    def _carregar_chaves(self, cursor, incluir_atletas=False):
+        """
+        Cria o mapa de chaves a partir do que já está gravado no banco.
+        Com `incluir_atletas`, os atletas existentes também entram no mapa
+        (para (nome, sigla) repetidos, vale o menor id)
+        """
+        chaves = MapaChaves(compacto=self.mapa_compacto)
+        
+        cursor.execute("SELECT sigla, nome FROM Pais")
+        chaves.paises = dict(cursor.fetchall())
+        cursor.execute("SELECT ano FROM Olimpiada")
+        chaves.olimpiadas = {ano for (ano,) in cursor.fetchall()}
+        cursor.execute("SELECT id_evento, esporte, modalidade, ano_olimpiada FROM Evento")
+        chaves.eventos = {(esporte, modalidade, ano): id_evento
+                          for id_evento, esporte, modalidade, ano in cursor.fetchall()}
+        
+        if incluir_atletas and self.mapa_compacto:
+            # Em lotes, para não ter todos os atletas do banco como tuplas ao mesmo tempo
+            cursor.execute("SELECT id_atleta, nome, sigla_pais FROM Atleta")
+            while True:
+                lote = cursor.fetchmany(100_000)
+                if not lote:
+                    break
+                chaves.atletas.carregar([(nome, sigla) for _, nome, sigla in lote], [id_ for id_, _, _ in lote])
+        elif incluir_atletas:
+            cursor.execute("SELECT id_atleta, nome, sigla_pais FROM Atleta ORDER BY id_atleta DESC")
+            chaves.atletas = {(nome, sigla): id_atleta for id_atleta, nome, sigla in cursor.fetchall()}
+        
+        cursor.execute("SELECT COALESCE(MAX(id_atleta), 0) FROM Atleta")
+        chaves.proximo_atleta = int(cursor.fetchone()[0]) + 1
+        chaves.proximo_evento = max(chaves.eventos.values(), default=0) + 1
+        return chaves
+    
+    def _montar_tabelas(self, dados, chaves, somente_novos=True, atualizar_atletas=False):
+        """
+        Monta os DataFrames de Pais, Olimpiada, Atleta, Evento e Compete com
+        drop_duplicates/factorize, atribuindo id_atleta e id_evento em memória.
+        Com `somente_novos`, só as linhas ainda ausentes de `chaves` são devolvidas;
+        sem ele, volta o conteúdo completo que o CSV descreve. `atualizar_atletas`
+        devolve todos os atletas mesmo com `somente_novos` (para um upsert).
+        `chaves` é atualizado
+        """
+        # PAÍS: a primeira ocorrência da sigla vence e o nome também é único
+        pais = dados.drop_duplicates('sigla')[['sigla', 'pais_nome']]
+        if somente_novos:
+            pais = pais[~pais['sigla'].isin(list(chaves.paises))]
+        pais = pais.drop_duplicates('pais_nome')
+        if somente_novos:
+            pais = pais[~pais['pais_nome'].isin(list(chaves.paises.values()))]
+        pais = pais.rename(columns={'pais_nome': 'nome'})
+        chaves.paises.update(zip(pais['sigla'], pais['nome']))
+        
+        # Registros de siglas descartadas violariam a FK de Atleta
+        validos = dados['sigla'].isin(list(chaves.paises))
+        erros = int((~validos).sum())
+        if erros:
+            self._avisar_siglas_descartadas(dados[~validos], chaves)
+        dados = dados[validos]
+        
+        # OLIMPÍADA
+        olimpiada = dados.drop_duplicates('ano')[['ano', 'estacao', 'sede']]
+        if somente_novos:
+            olimpiada = olimpiada[~olimpiada['ano'].isin(list(chaves.olimpiadas))]
+        chaves.olimpiadas.update(olimpiada['ano'].tolist())
+        
+        # ATLETA: um id por par (nome, sigla), na ordem de primeira aparição
+        codigos, unicos = pd.factorize(pd.MultiIndex.from_frame(dados[['nome', 'sigla']]))
+        ids_unicos, novos = self._resolver_ids(list(unicos), chaves.atletas, chaves, 'proximo_atleta')
+        ids_atleta = ids_unicos[codigos]
+        
+        primeiros = ~pd.Series(codigos).duplicated().to_numpy()
+        atleta = dados.loc[primeiros, ['nome', 'sexo', 'peso', 'altura', 'idade', 'sigla']].copy()
+        atleta.insert(0, 'id_atleta', ids_atleta[primeiros])
+        if somente_novos and not atualizar_atletas:
+            atleta = atleta[novos[codigos[primeiros]]]
+        
+        # EVENTO: eventos já conhecidos (unique_evento) mantêm o id
+        chaves_evento = ['esporte', 'modalidade', 'ano']
+        codigos, unicos = pd.factorize(pd.MultiIndex.from_frame(dados[chaves_evento]))
+        ids_unicos, novos = self._resolver_ids(list(unicos), chaves.eventos, chaves, 'proximo_evento')
+        
+        evento = pd.DataFrame(list(unicos), columns=chaves_evento)
+        evento.insert(0, 'id_evento', ids_unicos)
+        if somente_novos:
+            evento = evento[novos]
+        
+        # COMPETE: INSERT IGNORE do modo linha a linha mantém a primeira ocorrência
+        compete = pd.DataFrame({
+            'id_atleta': ids_atleta,
+            'id_evento': ids_unicos[codigos],
+            'medalha': dados['medalha'].to_numpy(),
+        }).drop_duplicates(['id_atleta', 'id_evento'])
+        
+        tabelas = {
+            'Pais': pais,
+            'Olimpiada': olimpiada,
+            'Atleta': atleta,
+            'Evento': evento,
+            'Compete': compete,
+        }
+        return tabelas, erros
+    
+    def _avisar_siglas_descartadas(self, descartados, chaves):
+        """
+        Avisa (uma vez por sigla) das siglas cujo nome de país já pertence a
+        outra sigla: como Pais.nome é UNIQUE, os registros delas não são
+        importados. As contagens ficam em self.siglas_descartadas
+        """
+        dono = {nome: sigla for sigla, nome in chaves.paises.items()}
+        contagem = descartados.groupby(['sigla', 'pais_nome'], observed=True).size()
+        for (sigla, nome), registros in contagem.items():
+            if sigla not in self.siglas_descartadas:
+                print(f"⚠ Sigla {sigla} descartada: o país '{nome}' já é da sigla {dono.get(nome, '?')} "
+                      "(os registros dela não serão importados)")
+            self.siglas_descartadas[sigla] = self.siglas_descartadas.get(sigla, 0) + int(registros)
+    
+    def _resolver_ids(self, unicos, mapa, chaves, contador):
+        """
+        Devolve o id de cada chave única (numerando as novas a partir do
+        contador de `chaves`) e a máscara das chaves que ainda não existiam
+        """
+        if isinstance(mapa, MapaCompacto):
+            ids, novos, proximo = mapa.resolver(unicos, getattr(chaves, contador))
+            setattr(chaves, contador, proximo)
+            return ids, novos
+        
+        ids = np.empty(len(unicos), dtype=np.int64)
+        novos = np.zeros(len(unicos), dtype=bool)
+        proximo = getattr(chaves, contador)
+        
+        for i, chave in enumerate(unicos):
+            id_existente = mapa.get(chave)
+            if id_existente is None:
+                id_existente = mapa[chave] = proximo
+                proximo += 1
+                novos[i] = True
+            ids[i] = id_existente
+        
+        setattr(chaves, contador, proximo)
+        return ids, novos
+    
+    def _gravar_tabelas(self, cursor, tabelas, limite_pacote, detalhar=True, confirmar=True, comandos=None):
+        """
+        Grava as tabelas montadas em memória na ordem exigida pelas FKs.
+        Sem `confirmar`, o commit fica a cargo de quem chamou. `comandos`
+        troca os INSERTs de COMANDOS_INSERT (ex.: um upsert para Atleta)
+        """
+        comandos = dict(COMANDOS_INSERT, **(comandos or {}))
+        total = 0
+        for tabela, sql in comandos.items():
+            if tabela not in tabelas:
+                continue
+            linhas = self._linhas(tabelas[tabela])
+            enviados = self._inserir_em_lotes(cursor, sql, linhas, limite_pacote)
+            if confirmar:
+                self.connection.commit()
+            total += enviados
+            if detalhar:
+                print(f"   {tabela}: {len(linhas)} linhas em {enviados} comandos")
+        
+        return total
+    
+    def _gravar_pendentes(self, cursor, pendentes, limite_pacote):
+        """Envia as tuplas acumuladas pelo modo linha a linha e esvazia as listas"""
+        for tabela, sql in COMANDOS_INSERT.items():
+            self._inserir_em_lotes(cursor, sql, pendentes[tabela], limite_pacote)
+            pendentes[tabela].clear()
+    
+    def _limite_pacote(self, cursor):
+        """Lê o max_allowed_packet do servidor"""
+        cursor.execute("SELECT @@max_allowed_packet")
+        return int(cursor.fetchone()[0])
+    
+    def _linhas(self, df):
+        """Converte um DataFrame em tuplas de tipos Python nativos (NaN → None)"""
+        valores = df.astype(object).where(df.notna(), None)
+        return list(valores.itertuples(index=False, name=None))
+    
+    def _inserir_em_lotes(self, cursor, sql, linhas, limite_pacote):
+        """
+        Envia as linhas com executemany, que o conector reescreve em um único
+        INSERT de múltiplas linhas, sem deixar o comando passar do max_allowed_packet
+        """
+        # Margem para escape de strings e para a sintaxe do próprio comando
+        limite = int(limite_pacote * 0.75) - len(sql)
+        
+        enviados = 0
+        lote = []
+        tamanho_lote = 0
+        for linha in linhas:
+            tamanho = sum(len(str(valor)) + 4 for valor in linha)
+            if lote and tamanho_lote + tamanho > limite:
+                cursor.executemany(sql, lote)
+                enviados += 1
+                lote = []
+                tamanho_lote = 0
+            lote.append(linha)
+            tamanho_lote += tamanho
+        
+        if lote:
+            cursor.executemany(sql, lote)
+            enviados += 1
+        
+        return enviados
+    
+    def _mapear_colunas(self, colunas):
+        """Mapeia as colunas do CSV"""
+        mapeamento = {
+            'nome': 'nome',
+            'pais': 'equipe',
+            'sigla': 'sigla',
+            'ano': 'ano',
+            'estacao': 'temporada',
+            'sede': 'cidade',
+            'esporte': 'esporte',
+            'modalidade': 'evento',
+            'medalha': 'medalha',
+            'peso': 'peso',
+            'altura': 'altura',
+            'idade': 'idade',
+            'sexo': 'sexo'
+        }
+        
+        print("🔍 Mapeamento de colunas:")
+        for chave, valor in mapeamento.items():
+            print(f"   {chave}: '{valor}'")
+        print()
+        
+        return mapeamento
+    
+    def desconectar(self):
+        """Fecha a conexão com o banco de dados"""
+        if self.connection and self.connection.is_connected():
+            self.connection.close()
+            if not self.silencioso:
+                print("✓ Conexão MySQL fechada")
+
+
+class OlimpiadasCSVToSQLite(OlimpiadasCSVToMySQL):
+    """
+    Mesma importação gravando num arquivo SQLite (DB_BACKEND=sqlite). A conexão
+    de db.conectar_sqlite traduz o SQL do MySQL, então os modos vetorizado e
+    streaming, o SCHEMA_TABELAS e as migrações rodam sem mudanças
+    """
+    
+    def __init__(self, caminho=CAMINHO_SQLITE):
+        super().__init__(host=None, database=caminho, user=None, password=None)
+        self.caminho = caminho
+    
+    def conectar(self):
+        """Abre (ou cria) o arquivo do banco"""
+        try:
+            self.connection = conectar_sqlite(self.caminho)
+            print(f"✓ Conectado ao SQLite {sqlite3.sqlite_version} em '{self.caminho}'")
+            return True
+        except Error as e:
+            print(f"✗ Erro ao abrir o SQLite: {e}")
+            return False
+    
+    def drop_database(self):
+        """Apaga o arquivo do banco (e os do WAL) e reabre um vazio"""
+        self.connection.close()
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(self.caminho + sufixo):
+                os.remove(self.caminho + sufixo)
+        print(f"🗑️  Banco de dados '{self.caminho}' removido (se existia)")
+        self.conectar()
+    
+    def criar_database(self):
+        """O arquivo é criado ao conectar"""
+    
+    def usar_database(self):
+        """O arquivo é criado ao conectar"""
+    
+    def _limite_pacote(self, cursor):
+        """Sem max_allowed_packet: o executemany do sqlite3 não monta um único comando"""
+        return 1 << 30
+    
+    def desconectar(self):
+        """Fecha o arquivo, consolidando o WAL no banco"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+            print("✓ Conexão SQLite fechada")
+
+
+def _gravar_particao(config, tabelas, carga_em_massa=False):
+    """
+    Executado em um processo filho: abre uma conexão própria e grava uma
+    partição cujas chaves já foram atribuídas pelo processo principal
+    """
+    db = OlimpiadasCSVToMySQL(**config)
+    db.silencioso = True
+    if not db.conectar():
+        return None
+    try:
+        db.connection.database = db.database
+        cursor = db.connection.cursor()
+        if carga_em_massa:
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            cursor.execute("SET SESSION unique_checks = 0")
+        statements = db._gravar_tabelas(cursor, tabelas, db._limite_pacote(cursor), detalhar=False)
+        cursor.close()
+        return statements
+    except Error as e:
+        print(f"✗ Erro ao gravar partição: {e}")
+        db.connection.rollback()
+        return None
+    finally:
+        db.desconectar()
+
+
+if __name__ == "__main__":
+    # Configurações do banco de dados
+    DB_CONFIG = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'database': os.getenv('DB_NAME', 'olimpiadas_db'),
+        'user': os.getenv('DB_USER', 'root'),
+        'password': os.getenv('DB_PASSWORD', '')
+    }
+    
+    # Caminho do CSV
+    CSV_FILE = 'olimpiadasfiltrado.csv'
+    
+    parser = argparse.ArgumentParser(description="Importação de dados - Sistema Olimpíadas")
+    parser.add_argument('--modo', choices=['vetorizado', 'streaming', 'pipeline', 'load-data', 'delta', 'paralelo',
+                                           'linha'],
+                        default='vetorizado',
+                        help="vetorizado: INSERTs de múltiplas linhas; streaming: vetorizado em blocos com memória "
+                             "limitada; pipeline: streaming lendo o próximo bloco enquanto outra "
+                             "thread grava o anterior; load-data: LOAD DATA LOCAL INFILE + INSERT ... SELECT no servidor; "
+                             "delta: aplica só as diferenças no banco existente, sem recriá-lo; "
+                             "paralelo: vetorizado gravado por vários processos; linha: um registro por vez")
+    parser.add_argument('--anos', type=int, nargs='*', default=None,
+                        help="recarrega só estas edições no banco existente (ex.: --anos 2008 2012); "
+                             "sem anos, só termina recargas interrompidas")
+    parser.add_argument('--processos', type=int, default=None,
+                        help="processos de gravação no modo paralelo (padrão: número de CPUs)")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="linhas por bloco nos modos streaming e pipeline")
+    parser.add_argument('--retomar', '--resume', action='store_true',
+                        help="continua uma importação streaming interrompida a partir do último checkpoint")
+    parser.add_argument('--ids-no-cliente', action='store_true',
+                        help="no modo linha, gera id_atleta/id_evento em memória e grava as tabelas em lotes")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="no modo linha, linhas por transação (tamanho inicial se o ajuste estiver ligado)")
+    parser.add_argument('--lote-min', type=int, default=100,
+                        help="no modo linha, menor lote permitido pelo ajuste automático")
+    parser.add_argument('--lote-max', type=int, default=50_000,
+                        help="no modo linha, maior lote permitido pelo ajuste automático")
+    parser.add_argument('--duracao-transacao', type=float, default=1.0,
+                        help="no modo linha, duração alvo de cada transação em segundos; 0 mantém o lote fixo")
+    parser.add_argument('--relatorio', default=None,
+                        help="só no modo linha (os outros modos não geram relatório): grava em JSON os "
+                             "tempos por etapa, idas ao servidor, linhas confirmadas e rejeições")
+    parser.add_argument('--rejeitados', default=None,
+                        help="CSV com os registros que falharam na validação e o motivo "
+                             "(padrão: <csv>_rejeitados.csv)")
+    parser.add_argument('--fato', action='store_true',
+                        help="cria também a tabela larga CompeteFato (Compete já com edição, país, esporte "
+                             "e dados do atleta) para as páginas consultarem sem joins")
+    parser.add_argument('--mapa-compacto', action='store_true',
+                        help="guarda o mapa (nome, sigla) -> id_atleta como hashes de 64 bits em arrays "
+                             "ordenados, para importar milhões de atletas com pouca memória")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="ignora o cache Parquet do CSV já limpo e filtrado")
+    parser.add_argument('--sombra', action='store_true',
+                        help="importa em <DB_NAME>_next e, se a validação passar, troca as tabelas com "
+                             "um RENAME TABLE atômico, sem derrubar o banco em uso")
+    parser.add_argument('--snapshot', metavar='PASTA',
+                        help="exporta as tabelas do banco atual para arquivos Parquet em PASTA e sai")
+    parser.add_argument('--restaurar', metavar='PASTA',
+                        help="recria o banco a partir de um snapshot em PASTA, sem ler o CSV, e sai")
+    parser.add_argument('--carga-em-massa', action='store_true',
+                        help="cria as tabelas sem FKs/UNIQUE/CHECK, carrega com as verificações relaxadas "
+                             "e só então constrói índices e restrições")
+    args = parser.parse_args()
+    if args.retomar:
+        args.modo = 'streaming'
+    if args.ids_no_cliente and args.modo != 'linha':
+        parser.error("--ids-no-cliente só se aplica ao modo linha")
+    if args.relatorio and args.modo != 'linha':
+        parser.error("--relatorio só se aplica ao modo linha")
+    if args.sombra and (args.retomar or args.anos is not None or args.modo == 'delta'):
+        parser.error("--sombra é uma recarga completa: não combina com --retomar, --anos nem com o modo delta")
+    if args.anos is not None and (args.retomar or args.carga_em_massa):
+        parser.error("--anos não combina com --retomar nem com --carga-em-massa")
+    if args.carga_em_massa and (args.retomar or args.modo in ('delta', 'linha')):
+        parser.error("--carga-em-massa só vale para uma recarga completa nos modos "
+                     "vetorizado, streaming, pipeline, paralelo ou load-data")
+    
+    if BACKEND == 'sqlite' and (args.modo not in ('vetorizado', 'streaming') or args.anos is not None or args.sombra
+                                or args.snapshot or args.restaurar or args.carga_em_massa):
+        parser.error("com DB_BACKEND=sqlite só há os modos vetorizado e streaming (com --retomar); "
+                     "--anos, --sombra, --snapshot, --restaurar e --carga-em-massa são do MySQL")
+    
+    print("=" * 60)
+    print("IMPORTAÇÃO DE DADOS - SISTEMA OLIMPÍADAS")
+    print("=" * 60)
+    
+    db = OlimpiadasCSVToSQLite() if BACKEND == 'sqlite' else OlimpiadasCSVToMySQL(**DB_CONFIG)
+    if args.sombra:
+        db.database = f"{DB_CONFIG['database']}_next"
+    db.cache_dados = not args.sem_cache
+    db.arquivo_rejeitados = args.rejeitados
+    db.mapa_compacto = args.mapa_compacto
+    
+    if args.snapshot or args.restaurar:
+        if db.conectar():
+            if args.snapshot:
+                db.usar_database()
+                db.criar_snapshot(args.snapshot)
+            else:
+                db.drop_database()
+                db.criar_database()
+                if db.restaurar_snapshot(args.restaurar):
+                    aplicar_migracoes(db.connection)
+                    atualizar_resumos(db.connection)
+                    atualizar_fato(db.connection, criar=args.fato)
+            db.desconectar()
+    elif db.conectar():
+        criar_fato = args.fato
+        if args.sombra and not criar_fato:
+            # A troca só substitui tabelas que existem na sombra: uma CompeteFato publicada
+            # sobreviveria com fatos antigos e códigos dos dicionários substituídos
+            criar_fato = db.tem_tabela_em(DB_CONFIG['database'], TABELA_FATO)
+        
+        if args.modo == 'delta' or args.retomar or args.anos is not None:
+            print("\n[1/3] Usando banco de dados existente...")
+            db.usar_database()
+        else:
+            print("\n[1/3] Recriando banco de dados...")
+            db.drop_database()
+            db.criar_database()
+        
+        print("\n[2/3] Criando estrutura do banco de dados...")
+        db.criar_schema(carga_em_massa=args.carga_em_massa)
+        
+        print("\n[3/3] Processando arquivo CSV único...")
+        anos_alterados = None
+        if args.anos is not None:
+            anos_alterados = db.processar_csv_anos(CSV_FILE, args.anos)
+        elif args.modo == 'vetorizado':
+            db.processar_csv_vetorizado(CSV_FILE, ano_inicial=1896, ano_final=2016)
+        elif args.modo == 'streaming':
+            db.processar_csv_streaming(CSV_FILE, chunksize=args.chunksize, ano_inicial=1896, ano_final=2016,
+                                       retomar=args.retomar)
+        elif args.modo == 'pipeline':
+            db.processar_csv_pipeline(CSV_FILE, chunksize=args.chunksize, ano_inicial=1896, ano_final=2016)
+        elif args.modo == 'load-data':
+            db.processar_csv_load_data(CSV_FILE, ano_inicial=1896, ano_final=2016)
+        elif args.modo == 'delta':
+            db.processar_csv_delta(CSV_FILE, ano_inicial=1896, ano_final=2016)
+        elif args.modo == 'paralelo':
+            db.processar_csv_paralelo(CSV_FILE, processos=args.processos, ano_inicial=1896, ano_final=2016)
+        else:
+            db.processar_csv_unico(CSV_FILE, batch_size=args.batch_size, ano_inicial=1896, ano_final=2016,
+                                   ids_no_cliente=args.ids_no_cliente, relatorio=args.relatorio,
+                                   lote_min=args.lote_min, lote_max=args.lote_max,
+                                   duracao_alvo=args.duracao_transacao)
+        
+        if args.carga_em_massa:
+            print("\n[+] Construindo índices e restrições...")
+            db.finalizar_schema()
+        
+        print("\n[+] Aplicando migrações pendentes...")
+        aplicar_migracoes(db.connection)
+        
+        # Numa recarga por ano só as edições tocadas mudam (também se ela falhou no meio:
+        # os resumos acompanham o que ficou no banco até a nova tentativa)
+        print("\n[+] Atualizando resumos de medalhas...")
+        if atualizar_resumos(db.connection, anos=anos_alterados):
+            print("✓ Resumos de medalhas atualizados!")
+        # CompeteFato é opcional: criada com --fato, mantida sempre que já existir
+        if atualizar_fato(db.connection, anos=anos_alterados, criar=criar_fato):
+            print("✓ CompeteFato atualizada!" if criar_fato else "✓ CompeteFato atualizada (se existir)")
+        
+        if args.sombra:
+            print("\n[+] Validando e publicando o banco sombra...")
+            if db.validar_banco(referencia=DB_CONFIG['database']):
+                db.trocar_sombra(DB_CONFIG['database'])
+            else:
+                print(f"❌ Validação falhou: '{DB_CONFIG['database']}' não foi alterado; "
+                      f"'{db.database}' ficou para análise")
         
         db.desconectar()
\ No newline at end of file
@@ -0,0 +1,334 @@
+import mysql.connector
+from mysql.connector import Error
+import os
+import argparse
+from dotenv import load_dotenv
+from db import BACKEND, CursorSQLite, conectar_sqlite
+
+# Carregar variáveis de ambiente
+load_dotenv()
+
+# Contagens de Compete pré-agregadas que as páginas leem no lugar dos joins
+# Compete ⋈ Atleta ⋈ Evento. Como são derivadas das cinco tabelas, são
+# recalculadas (não copiadas) depois de importações, restaurações e edições
+TABELAS_RESUMO = ('ResumoMedalhas', 'ResumoMedalhasAtleta')
+
+# Tabela larga opcional: uma linha por Compete já com edição, país, esporte e
+# dados do atleta, para consultas sem join. Só existe se criada com --fato
+TABELA_FATO = 'CompeteFato'
+
+# Dicionários: resumos e CompeteFato guardam esporte, modalidade e medalha como
+# códigos SMALLINT/TINYINT; os nomes ficam aqui. As atualizações nunca apagam
+# nem renumeram códigos, então eles continuam válidos entre uma e outra. A exceção
+# é a troca do banco sombra (popdados.py --sombra), que publica dicionários novos
+# junto com os resumos e a CompeteFato montados com eles
+DICIONARIOS = ('Medalha', 'Esporte', 'Modalidade')
+
+# Mesmos códigos das colunas geradas Compete.cod_medalha/eh_medalha (migração 0003)
+MEDALHAS = [(0, 'Sem Medalha', 0), (1, 'Ouro', 1), (2, 'Prata', 1), (3, 'Bronze', 1)]
+
+
+def criar_dicionarios(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Medalha (
+            cod_medalha TINYINT UNSIGNED PRIMARY KEY,
+            medalha VARCHAR(20) NOT NULL UNIQUE,
+            eh_medalha BOOLEAN NOT NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    cursor.executemany("INSERT IGNORE INTO Medalha (cod_medalha, medalha, eh_medalha) VALUES (%s, %s, %s)",
+                       MEDALHAS)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Esporte (
+            id_esporte SMALLINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+            esporte VARCHAR(100) NOT NULL UNIQUE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Modalidade (
+            id_modalidade SMALLINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+            id_esporte SMALLINT UNSIGNED NOT NULL,
+            modalidade VARCHAR(100) NOT NULL,
+            UNIQUE KEY unique_modalidade (id_esporte, modalidade)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def _atualizar_dicionarios(cursor):
+    # Só os nomes novos: INSERT IGNORE gastaria um AUTO_INCREMENT por nome repetido
+    cursor.execute("""
+        INSERT INTO Esporte (esporte)
+        SELECT DISTINCT E.esporte
+        FROM Evento E
+        LEFT JOIN Esporte S ON S.esporte = E.esporte
+        WHERE S.id_esporte IS NULL
+    """)
+    cursor.execute("""
+        INSERT INTO Modalidade (id_esporte, modalidade)
+        SELECT DISTINCT S.id_esporte, E.modalidade
+        FROM Evento E
+        JOIN Esporte S ON S.esporte = E.esporte
+        LEFT JOIN Modalidade M ON M.id_esporte = S.id_esporte AND M.modalidade = E.modalidade
+        WHERE M.id_modalidade IS NULL
+    """)
+
+
+def criar_tabelas_resumo(cursor):
+    # Participações por país, edição, modalidade (e seu esporte) e medalha
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ResumoMedalhas (
+            sigla_pais VARCHAR(3) NOT NULL,
+            ano INT NOT NULL,
+            id_esporte SMALLINT UNSIGNED NOT NULL,
+            id_modalidade SMALLINT UNSIGNED NOT NULL,
+            cod_medalha TINYINT UNSIGNED NOT NULL,
+            eh_medalha BOOLEAN NOT NULL,
+            total INT NOT NULL,
+            PRIMARY KEY (sigla_pais, ano, id_modalidade, cod_medalha),
+            INDEX idx_resumo_ano (ano, eh_medalha),
+            INDEX idx_resumo_esporte (id_esporte, eh_medalha, sigla_pais)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    # Participações por atleta, edição e medalha (rankings de atletas)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ResumoMedalhasAtleta (
+            id_atleta INT NOT NULL,
+            ano INT NOT NULL,
+            cod_medalha TINYINT UNSIGNED NOT NULL,
+            eh_medalha BOOLEAN NOT NULL,
+            total INT NOT NULL,
+            PRIMARY KEY (id_atleta, ano, cod_medalha),
+            INDEX idx_resumo_atleta_ano (ano, eh_medalha)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def criar_tabela_fato(cursor):
+    # Índices seguem os filtros das páginas: edição, esporte e país
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABELA_FATO} (
+            id_atleta INT NOT NULL,
+            id_evento INT NOT NULL,
+            ano INT NOT NULL,
+            estacao VARCHAR(20) NOT NULL,
+            sigla_pais VARCHAR(3) NOT NULL,
+            id_esporte SMALLINT UNSIGNED NOT NULL,
+            id_modalidade SMALLINT UNSIGNED NOT NULL,
+            sexo CHAR(1),
+            idade INT,
+            peso DECIMAL(5,2),
+            altura DECIMAL(3,2),
+            cod_medalha TINYINT UNSIGNED NOT NULL,
+            eh_medalha BOOLEAN NOT NULL,
+            PRIMARY KEY (id_atleta, id_evento),
+            INDEX idx_fato_ano (ano, sexo, idade),
+            INDEX idx_fato_esporte (id_esporte, eh_medalha, sigla_pais),
+            INDEX idx_fato_pais (sigla_pais, ano, eh_medalha)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+
+
+def _tabelas_existem(cursor, tabelas, formato_atual=False):
+    """
+    Se todas as `tabelas` existem. Com formato_atual, só conta as que já têm
+    cod_medalha: as criadas antes dos códigos são recriadas por inteiro
+    """
+    marcadores = ', '.join(['%s'] * len(tabelas))
+    if isinstance(cursor, CursorSQLite):
+        coluna = " AND EXISTS (SELECT 1 FROM pragma_table_info(m.name) WHERE name = 'cod_medalha')"
+        cursor.execute(
+            f"SELECT COUNT(*) FROM sqlite_master m WHERE m.type = 'table' AND m.name IN ({marcadores})"
+            + (coluna if formato_atual else ''),
+            tuple(tabelas)
+        )
+    elif formato_atual:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = DATABASE() "
+            f"AND table_name IN ({marcadores}) AND column_name = 'cod_medalha'",
+            tuple(tabelas)
+        )
+    else:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() "
+            f"AND table_name IN ({marcadores})",
+            tuple(tabelas)
+        )
+    return cursor.fetchone()[0] == len(tabelas)
+
+
+def _filtro_anos(coluna, anos):
+    if anos is None:
+        return '', []
+    return f" AND {coluna} IN ({', '.join(['%s'] * len(anos))})", list(anos)
+
+
+def atualizar_resumos(conexao, anos=None, commit=True):
+    """
+    Recalcula as tabelas de resumo (todas as edições, ou só as de `anos`).
+    DELETE e INSERT ... SELECT ficam na mesma transação, então quem lê os
+    resumos vê as contagens antigas até o commit, nunca uma tabela vazia.
+    Com commit=False a transação fica aberta, para ir junto com a alteração
+    que motivou a atualização, e erros são repassados a quem chamou. Nesse
+    modo as tabelas não são criadas (CREATE TABLE faria commit implícito):
+    se os resumos ainda não existem, não há o que atualizar
+    """
+    if anos is not None:
+        anos = sorted(set(anos))
+        if not anos:
+            return True
+
+    try:
+        cursor = conexao.cursor()
+        if commit:
+            # Resumos criados agora precisam de todas as edições, não só de `anos`
+            if not _tabelas_existem(cursor, TABELAS_RESUMO, formato_atual=True):
+                anos = None
+                for tabela in TABELAS_RESUMO:
+                    cursor.execute(f"DROP TABLE IF EXISTS {tabela}")
+            criar_dicionarios(cursor)
+            criar_tabelas_resumo(cursor)
+        elif not _tabelas_existem(cursor, TABELAS_RESUMO, formato_atual=True):
+            cursor.close()
+            return True
+
+        _atualizar_dicionarios(cursor)
+
+        filtro, params = _filtro_anos('ano', anos)
+        for tabela in TABELAS_RESUMO:
+            cursor.execute(f"DELETE FROM {tabela} WHERE 1 = 1{filtro}", params)
+
+        filtro, params = _filtro_anos('E.ano_olimpiada', anos)
+        cursor.execute(f"""
+            INSERT INTO ResumoMedalhas (sigla_pais, ano, id_esporte, id_modalidade, cod_medalha, eh_medalha, total)
+            SELECT A.sigla_pais, E.ano_olimpiada, M.id_esporte, M.id_modalidade, C.cod_medalha, C.eh_medalha, COUNT(*)
+            FROM Compete C
+            JOIN Atleta A ON A.id_atleta = C.id_atleta
+            JOIN Evento E ON E.id_evento = C.id_evento
+            JOIN Esporte S ON S.esporte = E.esporte
+            JOIN Modalidade M ON M.id_esporte = S.id_esporte AND M.modalidade = E.modalidade
+            WHERE C.medalha IS NOT NULL{filtro}
+            GROUP BY A.sigla_pais, E.ano_olimpiada, M.id_modalidade, C.cod_medalha, C.eh_medalha
+        """, params)
+        cursor.execute(f"""
+            INSERT INTO ResumoMedalhasAtleta (id_atleta, ano, cod_medalha, eh_medalha, total)
+            SELECT C.id_atleta, E.ano_olimpiada, C.cod_medalha, C.eh_medalha, COUNT(*)
+            FROM Compete C
+            JOIN Evento E ON E.id_evento = C.id_evento
+            WHERE C.medalha IS NOT NULL{filtro}
+            GROUP BY C.id_atleta, E.ano_olimpiada, C.cod_medalha, C.eh_medalha
+        """, params)
+
+        if commit:
+            conexao.commit()
+        cursor.close()
+        return True
+
+    except Error as e:
+        if not commit:
+            raise
+        print(f"✗ Erro ao atualizar resumos de medalhas: {e}")
+        conexao.rollback()
+        return False
+
+
+def atualizar_fato(conexao, anos=None, commit=True, criar=False):
+    """
+    Recalcula CompeteFato (todas as edições, ou só as de `anos`) do mesmo jeito
+    que atualizar_resumos. Se a tabela não existe, só é criada com criar=True;
+    sem isso não há o que atualizar
+    """
+    if anos is not None:
+        anos = sorted(set(anos))
+        if not anos:
+            return True
+
+    try:
+        cursor = conexao.cursor()
+        if not _tabelas_existem(cursor, [TABELA_FATO], formato_atual=True):
+            existe = _tabelas_existem(cursor, [TABELA_FATO])
+            if not commit or not (criar or existe):
+                cursor.close()
+                return True
+            # Criada agora (ou no formato antigo, com os nomes em texto): todas as edições
+            cursor.execute(f"DROP TABLE IF EXISTS {TABELA_FATO}")
+            criar_dicionarios(cursor)
+            criar_tabela_fato(cursor)
+            anos = None
+
+        _atualizar_dicionarios(cursor)
+
+        filtro, params = _filtro_anos('ano', anos)
+        cursor.execute(f"DELETE FROM {TABELA_FATO} WHERE 1 = 1{filtro}", params)
+
+        filtro, params = _filtro_anos('E.ano_olimpiada', anos)
+        cursor.execute(f"""
+            INSERT INTO {TABELA_FATO} (id_atleta, id_evento, ano, estacao, sigla_pais, id_esporte, id_modalidade,
+                                       sexo, idade, peso, altura, cod_medalha, eh_medalha)
+            SELECT C.id_atleta, C.id_evento, E.ano_olimpiada, O.estacao, A.sigla_pais, M.id_esporte, M.id_modalidade,
+                   A.sexo, A.idade, A.peso, A.altura, C.cod_medalha, C.eh_medalha
+            FROM Compete C
+            JOIN Atleta A ON A.id_atleta = C.id_atleta
+            JOIN Evento E ON E.id_evento = C.id_evento
+            JOIN Olimpiada O ON O.ano = E.ano_olimpiada
+            JOIN Esporte S ON S.esporte = E.esporte
+            JOIN Modalidade M ON M.id_esporte = S.id_esporte AND M.modalidade = E.modalidade
+            WHERE 1 = 1{filtro}
+        """, params)
+
+        if commit:
+            conexao.commit()
+        cursor.close()
+        return True
+
+    except Error as e:
+        if not commit:
+            raise
+        print(f"✗ Erro ao atualizar {TABELA_FATO}: {e}")
+        conexao.rollback()
+        return False
+
+
+def atualizar_derivadas(conexao, anos, commit=False):
+    """Resumos e, se existir, CompeteFato: o que a página Admin chama a cada escrita"""
+    return atualizar_resumos(conexao, anos, commit=commit) and atualizar_fato(conexao, anos, commit=commit)
+
+
+def anos_do_evento(cursor, id_evento):
+    cursor.execute("SELECT ano_olimpiada FROM Evento WHERE id_evento = %s", (id_evento,))
+    return [ano for (ano,) in cursor.fetchall()]
+
+
+def anos_do_atleta(cursor, id_atleta):
+    cursor.execute("""
+        SELECT DISTINCT E.ano_olimpiada
+        FROM Compete C
+        JOIN Evento E ON E.id_evento = C.id_evento
+        WHERE C.id_atleta = %s
+    """, (id_atleta,))
+    return [ano for (ano,) in cursor.fetchall()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula os resumos de medalhas - Sistema Olimpíadas")
+    parser.add_argument('--anos', type=int, nargs='+', default=None, help="só estas edições")
+    parser.add_argument('--fato', action='store_true', help=f"cria {TABELA_FATO} se ainda não existir")
+    args = parser.parse_args()
+
+    try:
+        if BACKEND == 'sqlite':
+            conexao = conectar_sqlite()
+        else:
+            conexao = mysql.connector.connect(
+                host=os.getenv('DB_HOST', 'localhost'),
+                user=os.getenv('DB_USER', 'root'),
+                password=os.getenv('DB_PASSWORD', ''),
+                database=os.getenv('DB_NAME', 'olimpiadas_db')
+            )
+    except Error as e:
+        print(f"✗ Erro ao conectar ao banco: {e}")
+    else:
+        if atualizar_resumos(conexao, anos=args.anos):
+            print("✓ Resumos de medalhas atualizados!")
+        if atualizar_fato(conexao, anos=args.anos, criar=args.fato):
+            print(f"✓ {TABELA_FATO} atualizada!" if args.fato else f"✓ {TABELA_FATO} atualizada (se existir)")
+        conexao.close()
@@ -0,0 +1,352 @@
+import re
+
+import pytest
+from mysql.connector import Error
+from mysql.connector.errors import IntegrityError
+
+from db import traduzir_sql, conectar_sqlite, TRADUCOES_SQLITE
+
+
+def _normalizar(sql):
+    return ' '.join(sql.split())
+
+
+# ==================== TRADUÇÃO MYSQL -> SQLITE ====================
+
+# (MySQL, SQLite esperado): ao menos um caso por regra de TRADUCOES_SQLITE
+CASOS_TRADUCAO = [
+    ("SELECT nome FROM Pais WHERE sigla = %s AND nome <> %s",
+     "SELECT nome FROM Pais WHERE sigla = ? AND nome <> ?"),
+    ("SELECT CAST(SUM(R.total) AS SIGNED) AS total FROM ResumoMedalhas R",
+     "SELECT CAST(SUM(R.total) AS INTEGER) AS total FROM ResumoMedalhas R"),
+    ("INSERT IGNORE INTO Medalha (cod_medalha, medalha, eh_medalha) VALUES (%s, %s, %s)",
+     "INSERT OR IGNORE INTO Medalha (cod_medalha, medalha, eh_medalha) VALUES (?, ?, ?)"),
+    ("""INSERT INTO Pais (sigla, nome) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE sigla = sigla""",
+     "INSERT INTO Pais (sigla, nome) VALUES (?, ?) ON CONFLICT DO NOTHING"),
+    ("CREATE TABLE T (id_esporte SMALLINT UNSIGNED PRIMARY KEY AUTO_INCREMENT, nome VARCHAR(10))",
+     "CREATE TABLE T (id_esporte INTEGER PRIMARY KEY, nome VARCHAR(10))"),
+    ("CREATE TABLE T (id INT PRIMARY KEY AUTO_INCREMENT)",
+     "CREATE TABLE T (id INTEGER PRIMARY KEY)"),
+    ("CREATE TABLE T (em TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP)",
+     "CREATE TABLE T (em TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"),
+    ("CREATE TABLE T (x INT) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci",
+     "CREATE TABLE T (x INT)"),
+    ("""INSERT INTO Atleta (nome) VALUES (%s)
+        ON DUPLICATE KEY UPDATE id_atleta=LAST_INSERT_ID(id_atleta)""",
+     "INSERT INTO Atleta (nome) VALUES (?)"),
+    ("CREATE TABLE T (medalha ENUM('Ouro', 'NA') DEFAULT 'NA')",
+     "CREATE TABLE T (medalha TEXT CHECK (medalha IN ('Ouro', 'NA')) DEFAULT 'NA')"),
+]
+
+
+@pytest.mark.parametrize('mysql, sqlite', CASOS_TRADUCAO)
+def test_traducoes(mysql, sqlite):
+    assert [_normalizar(sql) for sql in traduzir_sql(mysql)] == [sqlite]
+
+
+def test_toda_traducao_tem_caso():
+    for padrao, _ in TRADUCOES_SQLITE:
+        assert any(padrao.search(' '.join(mysql.split())) for mysql, _ in CASOS_TRADUCAO), padrao.pattern
+
+
+def test_upsert_de_verdade_nao_vira_do_nothing():
+    sql = "INSERT INTO Pais (sigla, nome) VALUES (%s, %s) ON DUPLICATE KEY UPDATE nome = VALUES(nome)"
+    assert 'ON DUPLICATE KEY UPDATE nome = VALUES(nome)' in traduzir_sql(sql)[0]
+
+
+def test_on_update_cascade_e_mantido():
+    sql = "CREATE TABLE T (s VARCHAR(3), FOREIGN KEY (s) REFERENCES Pais(sigla) ON UPDATE CASCADE)"
+    assert 'ON UPDATE CASCADE' in traduzir_sql(sql)[0]
+
+
+def test_indices_em_linha():
+    comandos = traduzir_sql("""
+        CREATE TABLE IF NOT EXISTS Resumo (
+            sigla_pais VARCHAR(3) NOT NULL,
+            ano INT NOT NULL,
+            total INT NOT NULL,
+            PRIMARY KEY (sigla_pais, ano),
+            UNIQUE KEY unique_resumo (ano, sigla_pais),
+            INDEX idx_resumo_ano (ano, total),
+            KEY idx_resumo_total (total)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """)
+    tabela, *indices = comandos
+    assert 'UNIQUE (ano, sigla_pais)' in tabela
+    assert not re.search(r'\b(INDEX|KEY idx)', tabela)
+    assert re.search(r',\s*\)$', tabela) is None
+    assert indices == [
+        "CREATE INDEX IF NOT EXISTS idx_resumo_ano ON Resumo (ano, total)",
+        "CREATE INDEX IF NOT EXISTS idx_resumo_total ON Resumo (total)",
+    ]
+
+
+def test_alter_table_vira_um_comando_por_clausula():
+    comandos = traduzir_sql("""ALTER TABLE Compete
+        ADD COLUMN eh_medalha BOOLEAN AS (cod_medalha > 0) VIRTUAL NOT NULL,
+        ADD INDEX idx_compete_evento_cod (id_evento, eh_medalha, cod_medalha),
+        DROP INDEX idx_compete_evento_medalha,
+        ALGORITHM=INPLACE, LOCK=NONE""")
+    assert [_normalizar(sql) for sql in comandos] == [
+        "ALTER TABLE Compete ADD COLUMN eh_medalha BOOLEAN AS (cod_medalha > 0) VIRTUAL NOT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_compete_evento_cod ON Compete (id_evento, eh_medalha, cod_medalha)",
+        "DROP INDEX IF EXISTS idx_compete_evento_medalha",
+    ]
+    assert traduzir_sql("SET SESSION lock_wait_timeout = %s") == []
+
+
+def test_separar_restricoes_do_schema():
+    from popdados import OlimpiadasCSVToMySQL, SCHEMA_TABELAS
+    importador = OlimpiadasCSVToMySQL(host=None, database=None, user=None, password=None)
+    separadas = dict(zip(['Pais', 'Olimpiada', 'Atleta', 'Evento', 'Compete'],
+                         map(importador._separar_restricoes, SCHEMA_TABELAS)))
+
+    ddl, restricoes = separadas['Compete']
+    assert 'PRIMARY KEY (id_atleta, id_evento)' in ddl and 'FOREIGN KEY' not in ddl
+    assert "ENUM('Ouro', 'Prata', 'Bronze', 'Sem Medalha', 'Gold', 'Silver', 'NA')" in ddl
+    assert ddl.endswith(') ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci')
+    assert len(restricoes) == 2 and all(r.startswith('FOREIGN KEY') for r in restricoes)
+
+    assert separadas['Pais'][1] == ['UNIQUE KEY nome (nome)']
+    assert separadas['Olimpiada'][1] == ["CHECK (estacao IN ('Verão', 'Inverno', 'Summer', 'Winter'))"]
+    # Índices antes das FKs que os usam
+    assert [r.split()[0] for r in separadas['Evento'][1]] == ['UNIQUE', 'FOREIGN']
+    assert 'CHECK' not in separadas['Atleta'][0] and 'DECIMAL(5,2)' in separadas['Atleta'][0]
+
+
+# ==================== CONEXÃO SQLITE ====================
+
+@pytest.fixture
+def conexao(tmp_path):
+    conexao = conectar_sqlite(str(tmp_path / 'teste.sqlite3'))
+    yield conexao
+    conexao.close()
+
+
+def test_schema_e_migracoes_no_sqlite(conexao):
+    from migrar import aplicar_migracoes, listar_migracoes
+    from popdados import SCHEMA_TABELAS
+
+    cursor = conexao.cursor()
+    for sql in SCHEMA_TABELAS:
+        cursor.execute(sql)
+    assert aplicar_migracoes(conexao) == len(listar_migracoes())
+    assert aplicar_migracoes(conexao) == 0
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")
+    assert {nome for (nome,) in cursor.fetchall()} == {
+        'idx_atleta_nome', 'idx_atleta_pais_sexo_idade', 'idx_evento_ano_esporte', 'idx_compete_evento_cod'}
+
+    cursor.execute("INSERT INTO Pais (sigla, nome) VALUES ('BRA', 'Brasil')")
+    cursor.execute("INSERT INTO Olimpiada (ano, estacao, sede) VALUES (2016, 'Summer', 'Rio')")
+    cursor.execute("INSERT INTO Atleta (id_atleta, nome, sigla_pais) VALUES (1, 'Ana', 'BRA')")
+    cursor.execute("INSERT INTO Evento (id_evento, esporte, modalidade, ano_olimpiada) VALUES (1, 'Judo', 'Judo', 2016)")
+    cursor.execute("INSERT INTO Compete (id_atleta, id_evento, medalha) VALUES (1, 1, 'Gold')")
+    cursor.execute("SELECT cod_medalha, eh_medalha FROM Compete")
+    assert cursor.fetchone() == (1, 1)
+    # ENUM do MySQL: valor fora da lista é recusado
+    with pytest.raises(IntegrityError):
+        cursor.execute("UPDATE Compete SET medalha = 'Lata'")
+
+
+def test_resumos_criam_no_sqlite(conexao):
+    import resumos
+    cursor = conexao.cursor()
+    resumos.criar_dicionarios(cursor)
+    resumos.criar_tabelas_resumo(cursor)
+    resumos.criar_tabela_fato(cursor)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")
+    assert {'idx_resumo_ano', 'idx_resumo_esporte', 'idx_resumo_atleta_ano', 'idx_fato_ano'} <= \
+        {nome for (nome,) in cursor.fetchall()}
+    cursor.execute("SELECT COUNT(*) FROM Medalha")
+    assert cursor.fetchone()[0] == len(resumos.MEDALHAS)
+
+
+def test_cursor_dicionario_e_erros(conexao):
+    cursor = conexao.cursor(dictionary=True)
+    cursor.execute("CREATE TABLE Pais (sigla VARCHAR(3) PRIMARY KEY, nome VARCHAR(100) NOT NULL)")
+    cursor.execute("INSERT INTO Pais (sigla, nome) VALUES (%s, %s)", ('BRA', 'Brasil'))
+    cursor.execute("SELECT sigla, nome FROM Pais WHERE sigla = %s", ('BRA',))
+    assert cursor.fetchall() == [{'sigla': 'BRA', 'nome': 'Brasil'}]
+
+    with pytest.raises(IntegrityError):
+        cursor.execute("INSERT INTO Pais (sigla, nome) VALUES (%s, %s)", ('BRA', 'Brasil'))
+    with pytest.raises(Error):
+        cursor.execute("SELECT * FROM NaoExiste")
+
+
+def test_on_conflict_equivale_ao_on_duplicate_key(conexao):
+    """
+    Como o ON DUPLICATE KEY UPDATE col = col do MySQL: linhas repetidas (na
+    chave primária ou numa UNIQUE) são ignoradas sem erro, a primeira fica
+    """
+    from popdados import COMANDOS_INSERT
+
+    cursor = conexao.cursor()
+    cursor.execute("CREATE TABLE Pais (sigla VARCHAR(3) PRIMARY KEY, nome VARCHAR(100) NOT NULL UNIQUE)")
+    cursor.execute("CREATE TABLE Olimpiada (ano INT PRIMARY KEY, estacao VARCHAR(20), sede VARCHAR(100))")
+    cursor.executemany(COMANDOS_INSERT['Pais'], [('BRA', 'Brasil'), ('BRA', 'Outro'), ('XXX', 'Brasil')])
+    cursor.executemany(COMANDOS_INSERT['Olimpiada'], [(2016, 'Summer', 'Rio'), (2016, 'Winter', 'Outra')])
+    cursor.execute(COMANDOS_INSERT['Pais'], ('BRA', 'De novo'))
+    conexao.commit()
+
+    cursor.execute("SELECT sigla, nome FROM Pais")
+    assert cursor.fetchall() == [('BRA', 'Brasil')]
+    cursor.execute("SELECT ano, estacao, sede FROM Olimpiada")
+    assert cursor.fetchall() == [(2016, 'Summer', 'Rio')]
+
+
+# ==================== MAPA COMPACTO ====================
+
+def _lotes_de_atletas(semente=7, lotes=5, por_lote=400):
+    """Lotes de chaves (nome, sigla) únicas dentro do lote, repetindo chaves entre lotes"""
+    import numpy as np
+    gerador = np.random.default_rng(semente)
+    for _ in range(lotes):
+        numeros = gerador.choice(1500, size=por_lote, replace=False)
+        yield [(f"Atleta {n}", ('BRA', 'USA', 'ARG')[n % 3]) for n in numeros]
+
+
+@pytest.mark.parametrize('limite_pendentes', [1, 50, 100_000])
+def test_mapa_compacto_igual_ao_dict(limite_pendentes):
+    from popdados import MapaCompacto, MapaChaves, OlimpiadasCSVToMySQL
+    importador = OlimpiadasCSVToMySQL(host=None, database=None, user=None, password=None)
+
+    # Atletas já no banco, com uma chave repetida: vale o menor id
+    banco = [(('Atleta 1', 'BRA'), 10), (('Atleta 2', 'USA'), 11), (('Atleta 1', 'BRA'), 3)]
+    compacto, simples = MapaChaves(compacto=True), MapaChaves()
+    compacto.atletas = MapaCompacto(limite_pendentes=limite_pendentes)
+    compacto.atletas.carregar([chave for chave, _ in banco], [id_ for _, id_ in banco])
+    for chave, id_ in sorted(banco, key=lambda par: -par[1]):
+        simples.atletas[chave] = id_
+    compacto.proximo_atleta = simples.proximo_atleta = 12
+
+    for lote in _lotes_de_atletas():
+        ids_c, novos_c = importador._resolver_ids(lote, compacto.atletas, compacto, 'proximo_atleta')
+        ids_s, novos_s = importador._resolver_ids(lote, simples.atletas, simples, 'proximo_atleta')
+        assert ids_c.tolist() == ids_s.tolist()
+        assert novos_c.tolist() == novos_s.tolist()
+        assert compacto.proximo_atleta == simples.proximo_atleta
+
+    assert len(compacto.atletas) == len(simples.atletas)
+    for chave, id_ in simples.atletas.items():
+        assert compacto.atletas.get(chave) == id_
+        assert compacto.atletas[chave] == id_
+    assert compacto.atletas.get(('Ninguém', 'BRA')) is None
+    assert ('Ninguém', 'BRA') not in compacto.atletas
+
+
+def test_mapa_compacto_atribuicao_avulsa():
+    from popdados import MapaCompacto
+    mapa = MapaCompacto(limite_pendentes=2)
+    mapa[('A', 'BRA')] = 1
+    assert mapa.get(('A', 'BRA')) == 1          # ainda em pendentes
+    mapa[('B', 'BRA')] = 2                      # atinge o limite e consolida nos arrays
+    assert not mapa.pendentes
+    ids, novos, proximo = mapa.resolver([('B', 'BRA'), ('C', 'BRA')], 3)
+    assert ids.tolist() == [2, 3] and novos.tolist() == [False, True] and proximo == 4
+    assert len(mapa) == 3
+    with pytest.raises(KeyError):
+        mapa[('D', 'BRA')]
+
+
+# ==================== CACHE PARQUET ====================
+
+def test_cache_regrava_data_quando_o_hash_confere(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    import os
+    import pandas as pd
+    from popdados import OlimpiadasCSVToMySQL
+    importador = OlimpiadasCSVToMySQL(host=None, database=None, user=None, password=None)
+
+    csv_path = tmp_path / 'dados.csv'
+    csv_path.write_text('nome,ano\nA,2016\n')
+    cache = importador._caminho_cache(str(csv_path), 2000, 2020)
+    dados = pd.DataFrame({'nome': ['A'], 'ano': [2016]})
+    importador._gravar_cache(cache, importador._origem_cache(str(csv_path)), str(csv_path), dados)
+
+    # Cópia/checkout: mesmo conteúdo, outra data
+    os.utime(csv_path, ns=(1, 1))
+    hashes = []
+    original = importador._sha256
+    monkeypatch.setattr(importador, '_sha256', lambda caminho: hashes.append(caminho) or original(caminho))
+
+    for _ in range(2):
+        lidos = importador._ler_cache(cache, importador._origem_cache(str(csv_path)), str(csv_path))
+        assert lidos.to_dict('records') == [{'nome': 'A', 'ano': 2016}]
+    assert len(hashes) == 1
+
+    # Conteúdo diferente com o mesmo tamanho invalida o cache
+    csv_path.write_text('nome,ano\nB,2016\n')
+    assert importador._ler_cache(cache, importador._origem_cache(str(csv_path)), str(csv_path)) is None
+
+
+# ==================== DELTA: NOMES DE PAÍS ====================
+
+# Equivalente SQLite de COMANDOS_UPSERT['Pais']: sem alvo, o conflito em
+# qualquer chave (sigla ou nome) atualiza a linha existente, como no MySQL
+UPSERT_PAIS_SQLITE = "INSERT INTO Pais (sigla, nome) VALUES (%s, %s) ON CONFLICT DO UPDATE SET nome = excluded.nome"
+
+
+def _paises_do_delta(conexao, atuais, desejados, liberar):
+    import pandas as pd
+    from popdados import OlimpiadasCSVToMySQL
+    importador = OlimpiadasCSVToMySQL(host=None, database=None, user=None, password=None)
+
+    cursor = conexao.cursor()
+    cursor.execute("CREATE TABLE Pais (sigla VARCHAR(3) PRIMARY KEY, nome VARCHAR(100) NOT NULL UNIQUE)")
+    cursor.executemany("INSERT INTO Pais (sigla, nome) VALUES (%s, %s)", atuais)
+
+    atual = pd.DataFrame(atuais, columns=['sigla', 'nome'])
+    gravar, remover = importador._diferenca(pd.DataFrame(desejados, columns=['sigla', 'nome']), atual, ['sigla'])
+    if liberar:
+        importador._liberar_nomes_paises(cursor, gravar, atual)
+    cursor.executemany(UPSERT_PAIS_SQLITE, importador._linhas(gravar))
+    importador._remover_em_lotes(cursor, 'Pais', ['sigla'], importador._linhas(remover))
+    conexao.commit()
+
+    cursor.execute("SELECT sigla, nome FROM Pais ORDER BY sigla")
+    return cursor.fetchall()
+
+
+@pytest.mark.parametrize('atuais, desejados', [
+    # Sigla nova com o nome de uma sigla que sai
+    ([('URS', 'Soviet Union'), ('BRA', 'Brazil')], [('RUS', 'Soviet Union'), ('BRA', 'Brazil')]),
+    # Troca de nomes entre duas siglas
+    ([('AAA', 'Alfa'), ('BBB', 'Beta')], [('AAA', 'Beta'), ('BBB', 'Alfa')]),
+])
+def test_delta_pais_troca_de_nome(conexao, atuais, desejados):
+    assert _paises_do_delta(conexao, atuais, desejados, liberar=True) == sorted(desejados)
+
+
+def test_delta_pais_sem_liberar_perde_a_sigla_nova(conexao):
+    atuais = [('URS', 'Soviet Union')]
+    assert _paises_do_delta(conexao, atuais, [('RUS', 'Soviet Union')], liberar=False) == []
+
+
+# ==================== RECARGA POR ANO ====================
+
+def test_montar_tabelas_atualizar_atletas():
+    import pandas as pd
+    from popdados import MapaChaves, OlimpiadasCSVToMySQL
+    importador = OlimpiadasCSVToMySQL(host=None, database=None, user=None, password=None)
+
+    # Banco com BRA e um atleta de outra edição; o CSV corrige o peso dele
+    chaves = MapaChaves()
+    chaves.paises['BRA'] = 'Brazil'
+    chaves.olimpiadas.add(2012)
+    chaves.atletas[('Ana', 'BRA')] = 7
+    chaves.proximo_atleta = 8
+    dados = pd.DataFrame({
+        'nome': ['Ana', 'Bia'], 'sigla': ['BRA', 'BRA'], 'pais_nome': ['Brazil', 'Brazil'],
+        'ano': [2012, 2012], 'estacao': ['Summer'] * 2, 'sede': ['London'] * 2,
+        'esporte': ['Judo'] * 2, 'modalidade': ['Judo Women'] * 2, 'medalha': [None, 'Gold'],
+        'sexo': ['F', 'F'], 'peso': [61.0, 55.0], 'altura': [170.0, 160.0], 'idade': [25, 22],
+    })
+
+    tabelas, erros = importador._montar_tabelas(dados, chaves, atualizar_atletas=True)
+    assert erros == 0
+    assert tabelas['Pais'].empty and tabelas['Olimpiada'].empty
+    assert tabelas['Atleta'][['id_atleta', 'nome', 'peso']].values.tolist() == [[7, 'Ana', 61.0], [8, 'Bia', 55.0]]
+    assert sorted(tabelas['Compete']['id_atleta']) == [7, 8]
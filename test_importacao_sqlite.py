@@ -0,0 +1,274 @@
+import csv
+
+import pytest
+
+from migrar import aplicar_migracoes
+from popdados import OlimpiadasCSVToSQLite
+from resumos import atualizar_resumos, atualizar_fato, atualizar_derivadas, anos_do_evento, anos_do_atleta
+from benchmark_importacao import gerar_csv_sintetico
+
+COLUNAS_CSV = ['nome', 'equipe', 'sigla', 'ano', 'temporada', 'cidade', 'esporte', 'evento',
+               'medalha', 'peso', 'altura', 'idade', 'sexo']
+
+# Conteúdo das cinco tabelas pelas chaves naturais: os ids podem mudar de um modo para outro
+CONSULTAS_CONTEUDO = {
+    'Pais': "SELECT sigla, nome FROM Pais",
+    'Olimpiada': "SELECT ano, estacao, sede FROM Olimpiada",
+    'Atleta': "SELECT nome, sigla_pais, sexo, peso, altura, idade FROM Atleta",
+    'Evento': "SELECT esporte, modalidade, ano_olimpiada FROM Evento",
+    'Compete': """
+        SELECT A.nome, A.sigla_pais, E.esporte, E.modalidade, E.ano_olimpiada, C.medalha
+        FROM Compete C
+        JOIN Atleta A ON A.id_atleta = C.id_atleta
+        JOIN Evento E ON E.id_evento = C.id_evento
+    """,
+}
+
+
+@pytest.fixture(scope='module')
+def csv_path(tmp_path_factory):
+    """
+    CSV sintético pequeno mais os casos que os modos precisam tratar igual:
+    sigla nova com o nome de país de outra, registro reprovado na validação
+    e participação repetida com outra medalha (vale a primeira)
+    """
+    caminho = tmp_path_factory.mktemp('csv') / 'olimpiadas.csv'
+    gerar_csv_sintetico(str(caminho), escala=0.01)
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        primeira = next(csv.DictReader(arquivo))
+
+    repetida = dict(primeira, medalha='Bronze' if primeira['medalha'] != 'Bronze' else 'NA')
+    extras = [
+        repetida,
+        dict(primeira, nome='Atleta Sem País', sigla='ZZZ', equipe=f"País {primeira['sigla']}"),
+        dict(primeira, nome='Outro Sem País', sigla='ZZZ', equipe=f"País {primeira['sigla']}", ano='2016'),
+        dict(primeira, nome='Atleta Reprovado', sexo='X'),
+    ]
+    with open(caminho, 'a', encoding='utf-8', newline='') as arquivo:
+        csv.DictWriter(arquivo, fieldnames=COLUNAS_CSV).writerows(extras)
+    return caminho
+
+
+def importar(csv_path, caminho, modo, **opcoes):
+    """Importa o CSV num arquivo SQLite novo com o modo pedido, como o popdados.py faz"""
+    db = OlimpiadasCSVToSQLite(str(caminho))
+    db.cache_dados = False
+    assert db.conectar()
+    db.criar_schema()
+    if modo == 'vetorizado':
+        db.processar_csv_vetorizado(str(csv_path))
+    elif modo == 'streaming':
+        db.processar_csv_streaming(str(csv_path), chunksize=700, **opcoes)
+    else:
+        db.processar_csv_unico(str(csv_path), batch_size=300, **opcoes)
+    assert aplicar_migracoes(db.connection) is not None
+    return db
+
+
+def conteudo(conexao):
+    cursor = conexao.cursor()
+    tabelas = {}
+    for tabela, sql in CONSULTAS_CONTEUDO.items():
+        cursor.execute(sql)
+        tabelas[tabela] = sorted(cursor.fetchall(), key=lambda linha: tuple(map(str, linha)))
+    cursor.close()
+    return tabelas
+
+
+@pytest.fixture(scope='module')
+def vetorizado(csv_path, tmp_path_factory):
+    db = importar(csv_path, tmp_path_factory.mktemp('vetorizado') / 'o.sqlite3', 'vetorizado')
+    yield db
+    db.desconectar()
+
+
+def test_vetorizado_descarta_sigla_com_nome_de_outra(vetorizado, csv_path):
+    tabelas = conteudo(vetorizado.connection)
+    assert 'ZZZ' not in {sigla for sigla, _ in tabelas['Pais']}
+    assert vetorizado.siglas_descartadas == {'ZZZ': 2}
+    assert not any(nome == 'Atleta Reprovado' for nome, *_ in tabelas['Atleta'])
+    assert tabelas['Compete']
+
+
+def test_aviso_da_sigla_descartada_sai_uma_vez(csv_path, tmp_path, capsys):
+    db = importar(csv_path, tmp_path / 'o.sqlite3', 'streaming')
+    db.desconectar()
+    avisos = [linha for linha in capsys.readouterr().out.splitlines() if 'Sigla ZZZ descartada' in linha]
+    assert len(avisos) == 1 and 'já é da sigla' in avisos[0]
+    assert db.siglas_descartadas == {'ZZZ': 2}
+
+
+@pytest.mark.parametrize('modo, opcoes', [
+    ('streaming', {}),
+    ('linha', {}),
+    ('linha', {'ids_no_cliente': True}),
+])
+def test_modos_gravam_o_mesmo_que_o_vetorizado(vetorizado, csv_path, tmp_path, modo, opcoes):
+    db = importar(csv_path, tmp_path / 'o.sqlite3', modo, **opcoes)
+    try:
+        assert conteudo(db.connection) == conteudo(vetorizado.connection)
+    finally:
+        db.desconectar()
+
+
+def test_participacao_repetida_mantem_a_primeira(vetorizado, csv_path):
+    with open(csv_path, encoding='utf-8', newline='') as arquivo:
+        primeira = next(csv.DictReader(arquivo))
+    cursor = vetorizado.connection.cursor()
+    cursor.execute("""
+        SELECT C.medalha FROM Compete C
+        JOIN Atleta A ON A.id_atleta = C.id_atleta
+        JOIN Evento E ON E.id_evento = C.id_evento
+        WHERE A.nome = %s AND A.sigla_pais = %s AND E.modalidade = %s AND E.ano_olimpiada = %s
+    """, (primeira['nome'], primeira['sigla'], primeira['evento'], int(primeira['ano'])))
+    medalhas = cursor.fetchall()
+    cursor.close()
+    esperada = {'Gold': 'Ouro', 'Silver': 'Prata', 'Bronze': 'Bronze'}.get(primeira['medalha'], 'Sem Medalha')
+    assert medalhas == [(esperada,)]
+
+
+# As três tabelas derivadas, pelas colunas que as páginas leem
+CONSULTAS_DERIVADAS = {
+    'ResumoMedalhas': "SELECT sigla_pais, ano, id_esporte, id_modalidade, cod_medalha, eh_medalha, total "
+                      "FROM ResumoMedalhas",
+    'ResumoMedalhasAtleta': "SELECT id_atleta, ano, cod_medalha, eh_medalha, total FROM ResumoMedalhasAtleta",
+    'CompeteFato': "SELECT id_atleta, id_evento, ano, estacao, sigla_pais, id_esporte, id_modalidade, "
+                   "sexo, idade, peso, altura, cod_medalha, eh_medalha FROM CompeteFato",
+}
+
+
+def derivadas(conexao):
+    cursor = conexao.cursor()
+    tabelas = {}
+    for tabela, sql in CONSULTAS_DERIVADAS.items():
+        cursor.execute(sql)
+        tabelas[tabela] = sorted(cursor.fetchall(), key=lambda linha: tuple(map(str, linha)))
+    cursor.close()
+    return tabelas
+
+
+def consultar(conexao, sql, params=None):
+    cursor = conexao.cursor()
+    cursor.execute(sql, params)
+    linhas = cursor.fetchall()
+    cursor.close()
+    return linhas
+
+
+@pytest.fixture
+def com_derivadas(csv_path, tmp_path):
+    """Banco recém-importado com resumos e CompeteFato criados, para os testes que o alteram"""
+    db = importar(csv_path, tmp_path / 'o.sqlite3', 'vetorizado')
+    assert atualizar_resumos(db.connection)
+    assert atualizar_fato(db.connection, criar=True)
+    yield db
+    db.desconectar()
+
+
+@pytest.mark.parametrize('modo', ['vetorizado', 'streaming'])
+def test_resumos_e_fato_batem_com_o_compete(csv_path, tmp_path, modo):
+    db = importar(csv_path, tmp_path / 'o.sqlite3', modo)
+    try:
+        conexao = db.connection
+        assert atualizar_resumos(conexao)
+        assert atualizar_fato(conexao, criar=True)
+
+        esperado = consultar(conexao, """
+            SELECT A.sigla_pais, E.ano_olimpiada, E.esporte, E.modalidade, C.medalha, COUNT(*)
+            FROM Compete C
+            JOIN Atleta A ON A.id_atleta = C.id_atleta
+            JOIN Evento E ON E.id_evento = C.id_evento
+            GROUP BY A.sigla_pais, E.ano_olimpiada, E.esporte, E.modalidade, C.medalha
+        """)
+        resumo = consultar(conexao, """
+            SELECT R.sigla_pais, R.ano, S.esporte, M.modalidade, D.medalha, R.total
+            FROM ResumoMedalhas R
+            JOIN Esporte S ON S.id_esporte = R.id_esporte
+            JOIN Modalidade M ON M.id_modalidade = R.id_modalidade
+            JOIN Medalha D ON D.cod_medalha = R.cod_medalha
+        """)
+        assert sorted(resumo) == sorted(esperado)
+
+        esperado = consultar(conexao, """
+            SELECT C.id_atleta, E.ano_olimpiada, C.medalha, COUNT(*)
+            FROM Compete C
+            JOIN Evento E ON E.id_evento = C.id_evento
+            GROUP BY C.id_atleta, E.ano_olimpiada, C.medalha
+        """)
+        resumo = consultar(conexao, """
+            SELECT R.id_atleta, R.ano, D.medalha, R.total
+            FROM ResumoMedalhasAtleta R
+            JOIN Medalha D ON D.cod_medalha = R.cod_medalha
+        """)
+        assert sorted(resumo) == sorted(esperado)
+
+        (participacoes,), = consultar(conexao, "SELECT COUNT(*) FROM Compete")
+        (medalhas,), = consultar(conexao, "SELECT COUNT(*) FROM Compete WHERE medalha <> 'Sem Medalha'")
+        assert consultar(conexao, "SELECT COUNT(*), SUM(eh_medalha) FROM CompeteFato") == [(participacoes, medalhas)]
+        assert medalhas > 0
+    finally:
+        db.desconectar()
+
+
+def como_admin(conexao, sql, params, anos):
+    """
+    Mesma sequência das funções CRUD de pages/6_Admin.py: a escrita, as
+    derivadas das edições afetadas na mesma transação e um commit só
+    """
+    cursor = conexao.cursor()
+    cursor.execute(sql, params)
+    atualizar_derivadas(conexao, anos, commit=False)
+    conexao.commit()
+    cursor.close()
+
+
+def test_escritas_do_admin_mantem_as_derivadas(com_derivadas):
+    conexao = com_derivadas.connection
+    antes = derivadas(conexao)
+    cursor = conexao.cursor()
+    (ano_a,), (ano_b,) = consultar(conexao, "SELECT ano FROM Olimpiada ORDER BY ano LIMIT 2")
+    id_evento, = consultar(conexao, "SELECT MIN(id_evento) FROM Evento WHERE ano_olimpiada = %s", (ano_a,))[0]
+    sigla_a, sigla_b = [sigla for (sigla,) in consultar(conexao, "SELECT sigla FROM Pais ORDER BY sigla LIMIT 2")]
+
+    # Atleta novo com medalha; a medalha muda e o atleta troca de país
+    cursor.execute("INSERT INTO Atleta (nome, sexo, peso, altura, idade, sigla_pais) VALUES (%s, %s, %s, %s, %s, %s)",
+                   ('Atleta do Admin', 'F', 60, 1.70, 25, sigla_a))
+    conexao.commit()
+    (id_atleta,), = consultar(conexao, "SELECT id_atleta FROM Atleta WHERE nome = 'Atleta do Admin'")
+    como_admin(conexao, "INSERT INTO Compete (id_atleta, id_evento, medalha) VALUES (%s, %s, %s)",
+               (id_atleta, id_evento, 'Ouro'), anos_do_evento(cursor, id_evento))
+    como_admin(conexao, "UPDATE Compete SET medalha = %s WHERE id_atleta = %s AND id_evento = %s",
+               ('Prata', id_atleta, id_evento), anos_do_evento(cursor, id_evento))
+    como_admin(conexao, "UPDATE Atleta SET sigla_pais = %s, idade = %s WHERE id_atleta = %s",
+               (sigla_b, 26, id_atleta), anos_do_atleta(cursor, id_atleta))
+    assert (id_atleta, ano_a, 2, 1, 1) in derivadas(conexao)['ResumoMedalhasAtleta']
+
+    # Evento muda de edição e de esporte: saem da edição antiga e entram na nova
+    como_admin(conexao, "UPDATE Evento SET esporte = %s, modalidade = %s, ano_olimpiada = %s WHERE id_evento = %s",
+               ('Esporte do Admin', 'Modalidade do Admin', ano_b, id_evento),
+               anos_do_evento(cursor, id_evento) + [ano_b])
+    como_admin(conexao, "UPDATE Olimpiada SET estacao = %s, sede = %s WHERE ano = %s",
+               ('Inverno', 'Sede do Admin', ano_b), [ano_b])
+
+    # Exclusões: as edições afetadas são lidas antes do DELETE, como no Admin
+    id_outro, id_evento_outro = consultar(conexao, "SELECT id_atleta, id_evento FROM Compete "
+                                                   "WHERE id_atleta <> %s LIMIT 1", (id_atleta,))[0]
+    como_admin(conexao, "DELETE FROM Compete WHERE id_atleta = %s AND id_evento = %s",
+               (id_outro, id_evento_outro), anos_do_evento(cursor, id_evento_outro))
+    (id_medalhista,), = consultar(conexao, "SELECT MIN(id_atleta) FROM Compete WHERE medalha <> 'Sem Medalha'")
+    anos = anos_do_atleta(cursor, id_medalhista)
+    como_admin(conexao, "DELETE FROM Atleta WHERE id_atleta = %s", (id_medalhista,), anos)
+    (id_evento_apagado,), = consultar(conexao, "SELECT MAX(id_evento) FROM Compete")
+    anos = anos_do_evento(cursor, id_evento_apagado)
+    como_admin(conexao, "DELETE FROM Evento WHERE id_evento = %s", (id_evento_apagado,), anos)
+    cursor.close()
+
+    depois = derivadas(conexao)
+    assert depois != antes
+    assert not any(linha[0] == id_medalhista for linha in depois['ResumoMedalhasAtleta'])
+    assert not any(linha[1] == id_evento_apagado for linha in depois['CompeteFato'])
+
+    # Recalcular tudo do zero não pode mudar nada
+    assert atualizar_resumos(conexao)
+    assert atualizar_fato(conexao)
+    assert derivadas(conexao) == depois